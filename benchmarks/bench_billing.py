@@ -0,0 +1,51 @@
+"""
+Pricing closed sessions: Tariff.quote() per session vs price_batch() on arrays.
+
+Generates random stays of up to two days (a fifth of them EVs) and prices
+them both ways. Needs numpy.
+Run from the repo root:  python benchmarks/bench_billing.py [sessions]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from billing import KINDS, NO_CHARGE, Tariff  # noqa: E402
+
+SCALAR_SAMPLE = 100_000  # sessions priced one by one (the rest is extrapolated)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    entered = 1_714_521_600 + rng.uniform(0, 30 * 86_400, n)
+    exited = entered + rng.exponential(3 * 3600, n).clip(0, 2 * 86_400)
+    kind = rng.choice(len(KINDS), n, p=[0.8, 0.1, 0.05, 0.05])
+    ev = (rng.random(n) < 0.2) & (kind < 2)  # noqa: PLR2004 (EVs are cars or motorcycles)
+    charge = np.where(ev, rng.integers(0, 101, n), NO_CHARGE)
+    tariff = Tariff()
+
+    t0 = time.perf_counter()
+    fees = tariff.price_batch(entered, exited, kind, charge)
+    t_batch = time.perf_counter() - t0
+
+    m = min(n, SCALAR_SAMPLE)
+    e_list, x_list, c_list = entered[:m].tolist(), exited[:m].tolist(), charge[:m].tolist()
+    k_list = [KINDS[k] for k in kind[:m]]
+    t0 = time.perf_counter()
+    scalar = [tariff.quote(k_list[i], e_list[i], x_list[i], c_list[i]) for i in range(m)]
+    t_scalar = (time.perf_counter() - t0) * n / m
+
+    assert np.array_equal(np.array(scalar), fees[:m])
+    print(f"sessions      {n:,}  total {fees.sum():,.2f}")
+    print(f"quote() loop  {t_scalar * 1000:9.1f} ms  {n / t_scalar:12,.0f} sessions/s (extrapolated)")
+    print(f"price_batch   {t_batch * 1000:9.1f} ms  {n / t_batch:12,.0f} sessions/s")
+
+
+if __name__ == "__main__":
+    main()
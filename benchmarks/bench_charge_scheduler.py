@@ -0,0 +1,53 @@
+"""
+Charger scheduler rebalance cost under park/leave/charge churn.
+
+Run from the repo root:  python benchmarks/bench_charge_scheduler.py [ev_bays]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from charge_scheduler import ChargeScheduler  # noqa: E402
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rng = random.Random(11)
+    ev = [
+        {"regnum": f"E{i}", "make": "Tesla", "model": "3", "color": "Red", "fuel": "EV",
+         "kind": "CAR", "charge": rng.randint(0, 100)} if i % 10 else None
+        for i in range(n)
+    ]
+    svc = ParkingService.from_dict(
+        {"level": 1, "capacity": 0, "ev_capacity": n, "slots": [], "evSlots": ev}
+    )
+    t0 = time.perf_counter()
+    sched = ChargeScheduler(svc, site_limit_kw=n * 2.5, charger_kw=7.4)
+    print(f"initial schedule of {n} bays: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    ops = 20_000
+    occupied = [i for i, s in enumerate(svc.evSlots) if s.vehicle is not None]
+    t0 = time.perf_counter()
+    for k in range(ops):
+        r = rng.random()
+        if r < 0.3 and len(occupied) < n:  # noqa: PLR2004
+            res = svc.park(VehicleSpec(f"N{k}", "Tesla", "Y", "Blue", "EV", "CAR"))
+            occupied.append(res["slot_ui"] - 1)
+        elif r < 0.6 and occupied:  # noqa: PLR2004
+            i = occupied.pop(rng.randrange(len(occupied)))
+            svc.leave(i + 1, fuel="EV")
+        elif occupied:
+            svc.set_charge(rng.choice(occupied) + 1, rng.randint(0, 100))
+    dt = time.perf_counter() - t0
+    print(f"{ops} park/leave/charge events: {dt / ops * 1e6:.1f} us/event "
+          f"(allocated {sched.allocated_kw():,.1f} of {sched.site_limit_kw:,.1f} kW)")
+
+
+if __name__ == "__main__":
+    main()
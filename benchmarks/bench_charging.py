@@ -0,0 +1,41 @@
+"""
+Charging simulation: one day of 1-minute ticks over a full EV pool.
+
+Run from the repo root:  python benchmarks/bench_charging.py [chargers]
+Requires NumPy.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from charging import ChargingEngine  # noqa: E402
+from parking_service import ParkingService  # noqa: E402
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    ev = [
+        {"regnum": f"E{i}", "make": "Tesla", "model": "3", "color": "Red", "fuel": "EV",
+         "kind": "CAR" if i % 5 else "MOTORCYCLE", "charge": i % 60}
+        for i in range(n)
+    ]
+    svc = ParkingService.from_dict(
+        {"level": 1, "capacity": 0, "ev_capacity": n, "slots": [], "evSlots": ev}
+    )
+    eng = ChargingEngine(svc, charger_kw=[7.4 if i % 3 else 22.0 for i in range(n)])
+    t0 = time.perf_counter()
+    eng.step(minutes=1.0, ticks=24 * 60)
+    t_step = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    updated = eng.sync()
+    t_sync = time.perf_counter() - t0
+    print(f"{n} chargers x 1440 ticks: step {t_step * 1000:.1f} ms, sync {t_sync * 1000:.1f} ms "
+          f"({updated} vehicles updated, {eng.delivered_kwh.sum():,.0f} kWh delivered)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Analytics on a full lot: CSV export + re-parse vs NumPy columns.
+
+Answers "how many red vehicles per pool" both ways. Needs numpy.
+Run from the repo root:  python benchmarks/bench_columns.py [capacity]
+"""
+from __future__ import annotations
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_serialization import build  # noqa: E402
+
+from columns import load_columns, save_npz, vocab_code  # noqa: E402
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    svc = build(capacity)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, npz_path = os.path.join(tmp, "lot.csv"), os.path.join(tmp, "lot.npz")
+
+        t0 = time.perf_counter()
+        svc.save_csv(csv_path)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        red_csv = sum(1 for r in rows if r["color"] == "Red")
+        t_csv = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        save_npz(svc, npz_path)
+        cols, _ = load_columns(npz_path)
+        red_npz = int((cols["color"] == vocab_code(cols, "color", "Red")).sum())
+        t_npz = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        cols = svc.to_columns()
+        red_mem = int((cols["color"] == vocab_code(cols, "color", "Red")).sum())
+        t_mem = time.perf_counter() - t0
+
+    assert red_csv == red_npz == red_mem
+    n = 2 * capacity
+    for label, dt in (("csv+parse", t_csv), ("npz+load", t_npz), ("to_columns", t_mem)):
+        print(f"{label:<12} {dt * 1000:8.1f} ms  {n / dt:12,.0f} slots/s")
+
+
+if __name__ == "__main__":
+    main()
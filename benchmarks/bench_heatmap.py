@@ -0,0 +1,60 @@
+"""
+Heatmap repaint cost on a large lot (model side; the canvas needs a display).
+
+Times the full colour pass done when a lot is shown and the dirty-cell pass
+after a burst of park/leave events. With a display, pass --tk to also time
+creating the canvas items and a full itemconfigure pass.
+
+Run from the repo root:  python benchmarks/bench_heatmap.py [slots] [--tk]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_serialization import build  # noqa: E402
+
+from heatmap import HeatmapModel  # noqa: E402
+from parking_service import VehicleSpec  # noqa: E402
+
+
+def main() -> None:
+    slots = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 20_000
+    svc = build(slots // 2)
+    model = HeatmapModel(svc)
+
+    t0 = time.perf_counter()
+    model.colors()
+    print(f"full colour pass ({slots} cells) {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+    burst = 200
+    for i in range(1, burst + 1):
+        svc.leave(i)
+    t0 = time.perf_counter()
+    dirty = model.take_dirty()
+    print(f"dirty pass ({len(dirty)} cells)       {(time.perf_counter() - t0) * 1000:8.3f} ms")
+
+    if "--tk" in sys.argv:
+        import tkinter as tk  # noqa: PLC0415
+
+        from heatmap_tk import LotHeatmap  # noqa: PLC0415
+        root = tk.Tk()
+        view = LotHeatmap(root, columns=150, cell_px=4)
+        view.pack()
+        t0 = time.perf_counter()
+        view.show(svc)
+        root.update()
+        print(f"canvas show + draw               {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        for i in range(1, burst + 1):
+            svc.park_at(VehicleSpec(f"N{i}", "Ford", "Focus", "Red", "ICE", "CAR"), i)
+        t0 = time.perf_counter()
+        root.update()
+        print(f"canvas repaint after {burst} parks   {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Occupancy history: recording cost, point-in-time and hourly queries over a
+disk-backed history of many chunks.
+
+Run from the repo root:  python benchmarks/bench_history.py [events]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from history import HOUR_S, OccupancyHistory  # noqa: E402
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    bays = 500
+    rng = random.Random(9)
+    now = [0.0]
+    svc = ParkingService(capacity=bays, ev_capacity=0, level=1)
+    with tempfile.TemporaryDirectory() as d:
+        hist = OccupancyHistory(svc, d, chunk_size=50_000, clock=lambda: now[0])
+        occupied: list[int] = []
+        t0 = time.perf_counter()
+        for i in range(n):
+            now[0] += rng.expovariate(1 / 30)  # ~one event per 30 s, months of data
+            if occupied and (len(occupied) == bays or rng.random() < 0.5):  # noqa: PLR2004
+                svc.leave(occupied.pop(rng.randrange(len(occupied))) + 1)
+            else:
+                occupied.append(svc.park(VehicleSpec(f"R{i}", "VW", "Golf", "Red", "ICE", "CAR"))["slot_ui"] - 1)
+        dt = time.perf_counter() - t0
+        hist.close()
+        end = now[0]
+        print(f"{n} events over {end / 86400:.0f} days: {dt / n * 1e6:.1f} us/event (incl. park/leave)")
+
+        hist = OccupancyHistory(svc, d, chunk_size=50_000)
+        q = 2_000
+        t0 = time.perf_counter()
+        for _ in range(q):
+            hist.occupant_at("ICE", rng.randint(1, bays), rng.uniform(0, end))
+        print(f"{q} occupant_at queries: {(time.perf_counter() - t0) / q * 1e3:.2f} ms/query")
+        t0 = time.perf_counter()
+        day = hist.hourly(end / 2, end / 2 + 24 * HOUR_S)
+        print(f"hourly rollup for one day ({len(day)} rows): {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
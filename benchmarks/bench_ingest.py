@@ -0,0 +1,67 @@
+"""
+End-to-end latency of the gate-event pipeline under synthetic bursts.
+
+A producer submits camera reads at a target rate, in 10 ms bursts. Roughly
+10% are double reads, and vehicles leave after a while. The consumer applies
+them to a lot in micro-batches. Prints the ingest stats, including p50/p99
+queue-to-applied latency and how many events were shed.
+
+Run from the repo root:  python benchmarks/bench_ingest.py [events_per_s] [seconds]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ingest import GateEvent, Ingestor  # noqa: E402
+from parking_service import ParkingService  # noqa: E402
+
+TICK_S = 0.01
+
+
+async def produce(ing: Ingestor, rate: int, seconds: float) -> None:
+    rng = random.Random(7)
+    parked: list[str] = []
+    n = 0
+    per_tick = max(1, int(rate * TICK_S))
+    start = time.perf_counter()
+    ticks = int(seconds / TICK_S)
+    for tick in range(ticks):
+        for _ in range(per_tick):
+            ts = time.time()
+            if parked and rng.random() < 0.45:  # noqa: PLR2004
+                ev = GateEvent(ts, "out", parked.pop(rng.randrange(len(parked))))
+            else:
+                n += 1
+                ev = GateEvent(ts, "in", f"P{n:07d}")
+                parked.append(ev.regnum)
+            ing.submit(ev)
+            if rng.random() < 0.1:  # noqa: PLR2004
+                ing.submit(ev)  # camera double read
+        # sleep until the next burst is due
+        await asyncio.sleep(max(0.0, start + (tick + 1) * TICK_S - time.perf_counter()))
+
+
+async def main() -> None:
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0  # noqa: PLR2004
+    svc = ParkingService(capacity=int(rate * seconds), ev_capacity=0, level=1)
+    ing = Ingestor(svc)
+    consumer = asyncio.create_task(ing.run())
+    t0 = time.perf_counter()
+    await produce(ing, rate, seconds)
+    await ing.stop()
+    stats = await consumer
+    elapsed = time.perf_counter() - t0
+    print(f"{stats.received / elapsed:,.0f} events/s offered over {elapsed:.2f} s")
+    print(json.dumps(stats.report(), indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Nearest free bay to an entrance as the lot fills up.
+
+Parks and frees bays by entrance on a lot with a row layout, at several
+vacancy levels from half empty to a handful of free bays. Each lookup goes
+through VacancyTree.nearest(), and its cost should stay flat as vacancy
+drops.
+Run from the repo root:  python benchmarks/bench_layout.py [capacity]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from layout import Layout  # noqa: E402
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+
+OPS = 5_000  # park + leave pairs per vacancy level
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    layout = Layout.rows(capacity, 0, per_row=100, entrances={"main": (0.0, -6.0), "far": (250.0, 6000.0)})
+    svc = ParkingService(capacity=capacity, ev_capacity=0, level=1, layout=layout)
+    rng = random.Random(1)
+    order = list(range(1, capacity + 1))
+    rng.shuffle(order)
+    parked = 0
+    for free in (capacity // 2, capacity // 100, 100, 5):
+        while parked < capacity - free:  # fill random bays down to the target vacancy
+            svc.park_at(VehicleSpec(f"F{parked}", "VW", "Golf", "Red", "ICE", "CAR"), order[parked])
+            parked += 1
+        t0 = time.perf_counter()
+        for i in range(OPS):
+            res = svc.park(VehicleSpec(f"N{i}", "VW", "Golf", "Red", "ICE", "CAR"),
+                           entrance="main" if i % 2 else "far")
+            svc.leave(res["slot_ui"])
+        dt = (time.perf_counter() - t0) / OPS * 1e6
+        print(f"{free:>7,} of {capacity:,} free: {dt:7.1f} us per park-by-entrance + leave")
+
+
+if __name__ == "__main__":
+    main()
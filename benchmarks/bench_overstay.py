@@ -0,0 +1,62 @@
+"""
+Overstay checks: scanning every slot vs the timing wheel.
+
+Fills a lot with staggered entry times, then runs one check a minute for
+a simulated day. Each check is done two ways: a full scan of the lot for
+overdue vehicles, and OverstayMonitor.tick(), which only touches the
+deadlines that came due since the previous check.
+Run from the repo root:  python benchmarks/bench_overstay.py [capacity]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from overstay import OverstayMonitor  # noqa: E402
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+
+START = 1_714_521_600.0
+LIMIT_S = 4 * 3600
+CHECKS = 24 * 60  # one a minute for a day
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(0)
+    now = [START]
+    svc = ParkingService(capacity=capacity, ev_capacity=0, level=1, clock=lambda: now[0])
+    for i in range(capacity):
+        entered = START - rng.uniform(0, 20 * 3600)
+        svc.park(VehicleSpec(f"R{i:07d}", "VW", "Golf", "Red", "ICE", "CAR"), at=entered)
+
+    t0 = time.perf_counter()
+    monitor = OverstayMonitor(svc, {"*": LIMIT_S}, tick_s=1.0)
+    t_build = time.perf_counter() - t0
+
+    flagged: set[int] = set()
+    t_scan = t_wheel = 0.0
+    wheel_total = 0
+    for minute in range(CHECKS):
+        now[0] = START + minute * 60
+        t0 = time.perf_counter()
+        for s in svc.slots:
+            if s.entered_at is not None and now[0] - s.entered_at > LIMIT_S and s.index not in flagged:
+                flagged.add(s.index)
+        t_scan += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        wheel_total += len(monitor.tick())
+        t_wheel += time.perf_counter() - t0
+
+    assert wheel_total == len(flagged) == len(monitor.flagged)
+    print(f"capacity {capacity:,}  checks {CHECKS}  overdue {wheel_total:,}")
+    print(f"monitor build      {t_build * 1000:9.1f} ms")
+    print(f"full scan / check  {t_scan / CHECKS * 1000:9.3f} ms")
+    print(f"wheel tick / check {t_wheel / CHECKS * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Registration search latency (exact/prefix/substring/fuzzy) on a full lot.
+
+Run from the repo root:  python benchmarks/bench_reg_search.py [occupied]
+"""
+from __future__ import annotations
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from parking_service import ParkingService  # noqa: E402
+
+
+def plate(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_uppercase, k=3)) + "".join(rng.choices(string.digits, k=4))
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(7)
+    ice = [
+        {"regnum": plate(rng), "make": "Honda", "model": "Civic", "color": "Blue",
+         "fuel": "ICE", "kind": "CAR"}
+        for _ in range(n)
+    ]
+    svc = ParkingService.from_dict(
+        {"level": 1, "capacity": n, "ev_capacity": 0, "slots": ice, "evSlots": []}
+    )
+    target = ice[n // 2]["regnum"]
+    misread = target[:4] + ("0" if target[4] != "0" else "1") + target[5:]
+    cases = {
+        "exact": target,
+        "prefix": target[:4],
+        "substring": target[2:6],
+        "fuzzy (1 edit)": misread,
+    }
+    reps = 200
+    for label, q in cases.items():
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            res = svc.search_reg(q, limit=10)
+        us = (time.perf_counter() - t0) / reps * 1e6
+        print(f"{label:<16} {us:9.1f} us/query  top={res[0]['regnum'] if res else None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Reservation booking, availability checks, reserve-any (half-booked and
+fully booked lots, with and without a fitting slot) and park() under a
+large booking load. The one-off catch-up of due holds is timed apart from
+the steady park() cost.
+
+Run from the repo root:  python benchmarks/bench_reservations.py [bookings]
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+from reservations import ReservationBook  # noqa: E402
+
+HOUR = 3600.0
+
+
+def _fully_booked(rng: random.Random, q: int) -> None:
+    """reserve-any on a 20k-slot lot where every slot already has bookings."""
+    full_bays = 20_000
+    full_svc = ParkingService(capacity=full_bays, ev_capacity=0, level=1)
+    full = ReservationBook(full_svc, clock=lambda: -24 * HOUR)  # nothing expires during the run
+    for ui in range(1, full_bays + 1):  # every slot booked, ~10 bookings each over a year
+        for day in rng.sample(range(365), 10):
+            full.reserve("ICE", day * 24 * HOUR, (day * 24 + 8) * HOUR, slot_ui=ui)
+    t0 = time.perf_counter()
+    for _ in range(q):
+        s = rng.randrange(0, 24 * 365) * HOUR
+        res = full.reserve("ICE", s, s + 2 * HOUR)
+        assert res is not None
+        full.cancel(res.id)
+    print(f"{q} reserve-any + cancel, all {full_bays} slots booked: "
+          f"{(time.perf_counter() - t0) / q * 1e6:.2f} us/booking")
+    for ui in range(1, full_bays + 1):  # before and after every slot's bookings
+        full.reserve("ICE", -2 * HOUR, 0.0, slot_ui=ui)
+        full.reserve("ICE", 365 * 24 * HOUR, 366 * 24 * HOUR, slot_ui=ui)
+    t0 = time.perf_counter()
+    for _ in range(q // 10):
+        assert full.reserve("ICE", -HOUR, 365 * 24 * HOUR) is None
+    print(f"{q // 10} reserve-any, nothing free, no slot has a gap that long: "
+          f"{(time.perf_counter() - t0) / (q // 10) * 1e6:.2f} us/booking")
+    evening = 400 * 24 * HOUR + 18 * HOUR
+    for ui in range(1, full_bays + 1):  # a sold-out evening, arrivals spread over an hour
+        start = evening + rng.uniform(0, HOUR)
+        full.reserve("ICE", start, start + 2 * HOUR, slot_ui=ui)
+    t0 = time.perf_counter()
+    for _ in range(q // 10):
+        assert full.reserve("ICE", evening, evening + 3 * HOUR) is None
+    print(f"{q // 10} reserve-any, nothing free, sold-out evening: "
+          f"{(time.perf_counter() - t0) / (q // 10) * 1e6:.2f} us/booking")
+    t0 = time.perf_counter()
+    res = full.reserve("ICE", evening + 3 * HOUR, evening + 4 * HOUR)
+    assert res is not None and res.slot_ui == 1
+    print(f"reserve-any, every slot booked, first slot fits: {(time.perf_counter() - t0) * 1e6:.2f} us")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    bays = 2_000
+    rng = random.Random(3)
+    now = [0.0]
+    svc = ParkingService(capacity=bays, ev_capacity=bays // 4, level=1)
+    book = ReservationBook(svc, clock=lambda: now[0])
+
+    t0 = time.perf_counter()
+    made = 0
+    for _ in range(n):
+        start = rng.randrange(0, 24 * 365) * HOUR
+        fuel = "EV" if rng.random() < 0.2 else "ICE"  # noqa: PLR2004
+        cap = svc.ev_capacity if fuel == "EV" else svc.capacity
+        if book.reserve(fuel, start, start + 2 * HOUR, slot_ui=rng.randint(1, cap)):
+            made += 1
+    dt = time.perf_counter() - t0
+    print(f"{n} booking attempts ({made} made): {dt / n * 1e6:.1f} us/booking")
+
+    t0 = time.perf_counter()
+    q = 20_000
+    for _ in range(q):
+        s = rng.randrange(0, 24 * 365) * HOUR
+        book.is_available("EV", rng.randint(1, svc.ev_capacity), s, s + 2 * HOUR)
+    print(f"{q} slot availability checks: {(time.perf_counter() - t0) / q * 1e6:.2f} us/check")
+
+    half = ReservationBook(ParkingService(capacity=bays, ev_capacity=0, level=1), clock=lambda: 0.0)
+    for ui in range(1, bays // 2 + 1):  # leading slots booked, the rest unbooked
+        half.reserve("ICE", 100 * HOUR, 101 * HOUR, slot_ui=ui)
+    t0 = time.perf_counter()
+    for _ in range(q):
+        s = rng.randrange(0, 24 * 365) * HOUR
+        res = half.reserve("ICE", s, s + 2 * HOUR)
+        assert res is not None and res.slot_ui == bays // 2 + 1
+        half.cancel(res.id)
+    print(f"{q} reserve-any + cancel, first half booked: "
+          f"{(time.perf_counter() - t0) / q * 1e6:.2f} us/booking")
+
+    _fully_booked(rng, q)
+
+    now[0] = 24 * 180 * HOUR
+    t0 = time.perf_counter()
+    book.advance()  # one-off: apply half a year of hold/expire events
+    print(f"catch-up of due holds: {time.perf_counter() - t0:.2f} s")
+    t0 = time.perf_counter()
+    parked = sum(svc.park(VehicleSpec(f"W{i}", "VW", "Golf", "Red", "ICE", "CAR"))["ok"]
+                 for i in range(bays))
+    print(f"park() with holds applied: {parked} walk-ins, "
+          f"{(time.perf_counter() - t0) / bays * 1e6:.1f} us/park")
+
+
+if __name__ == "__main__":
+    main()
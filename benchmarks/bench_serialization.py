@@ -0,0 +1,54 @@
+"""
+Serialization throughput for to_dict/from_dict/to_csv_rows.
+
+Run from the repo root:  python benchmarks/bench_serialization.py [capacity]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from parking_service import ParkingService  # noqa: E402
+
+KINDS = ("CAR", "MOTORCYCLE", "BUS", "TRUCK")
+
+
+def build(capacity: int) -> ParkingService:
+    """Full ICE + EV lot, built through from_dict to keep setup linear."""
+    ice = [
+        {"regnum": f"R{i}", "make": "Honda", "model": "Civic", "color": "Blue",
+         "fuel": "ICE", "kind": KINDS[i % 4]}
+        for i in range(capacity)
+    ]
+    ev = [
+        {"regnum": f"E{i}", "make": "Tesla", "model": "3", "color": "Red",
+         "fuel": "EV", "kind": "CAR" if i % 2 else "MOTORCYCLE", "charge": i % 101}
+        for i in range(capacity)
+    ]
+    return ParkingService.from_dict(
+        {"level": 1, "capacity": capacity, "ev_capacity": capacity, "slots": ice, "evSlots": ev}
+    )
+
+
+def timeit(label: str, fn, n: int) -> None:  # noqa: ANN001
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<14} {dt * 1000:8.1f} ms  {n / dt:12,.0f} vehicles/s")
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    svc = build(capacity)
+    n = 2 * capacity
+    data = svc.to_dict()
+    timeit("to_dict", svc.to_dict, n)
+    timeit("from_dict", lambda: ParkingService.from_dict(data), n)
+    timeit("to_csv_rows", svc.to_csv_rows, n)
+
+
+if __name__ == "__main__":
+    main()
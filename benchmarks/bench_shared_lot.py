@@ -0,0 +1,70 @@
+"""
+Read workers in other processes: pickled service vs shared memory.
+
+Each worker task answers all_slots_by_color("Red") for a full lot. The
+baseline sends the service to the worker (pickled per task). With
+SharedLot, workers attach to the block once and query it in place. Needs
+numpy. Run from the repo root:  python benchmarks/bench_shared_lot.py [capacity] [tasks]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_serialization import build  # noqa: E402
+
+from parking_service import ParkingService  # noqa: E402
+from shared_lot import SharedLot, SharedLotView  # noqa: E402
+
+WORKERS = 4
+_view: SharedLotView | None = None
+
+
+def _attach(name: str) -> None:
+    global _view  # noqa: PLW0603
+    _view = SharedLotView(name)
+
+
+def _red_pickled(svc: ParkingService) -> int:
+    return len(svc.all_slots_by_color("Red"))
+
+
+def _red_shared(_: int) -> int:
+    assert _view is not None
+    return len(_view.all_slots_by_color("Red"))
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    tasks = int(sys.argv[2]) if len(sys.argv) > 2 else 20  # noqa: PLR2004
+    svc = build(capacity)
+    expected = len(svc.all_slots_by_color("Red"))
+
+    with ProcessPoolExecutor(WORKERS) as pool:
+        t0 = time.perf_counter()
+        counts = list(pool.map(_red_pickled, [svc] * tasks))
+        t_pickle = time.perf_counter() - t0
+    assert counts == [expected] * tasks
+
+    lot = SharedLot(svc)
+    try:
+        with ProcessPoolExecutor(WORKERS, initializer=_attach, initargs=(lot.name,)) as pool:
+            list(pool.map(_red_shared, range(WORKERS)))  # workers started and attached
+            t0 = time.perf_counter()
+            counts = list(pool.map(_red_shared, range(tasks)))
+            t_shared = time.perf_counter() - t0
+    finally:
+        lot.close()
+    assert counts == [expected] * tasks
+
+    print(f"slots {2 * capacity:,}  tasks {tasks}  workers {WORKERS}")
+    print(f"pickled service / task  {t_pickle / tasks * 1e3:9.2f} ms")
+    print(f"shared memory / task    {t_shared / tasks * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
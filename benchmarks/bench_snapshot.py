@@ -0,0 +1,63 @@
+"""
+Freezing a lot for export: to_dict() copy vs copy-on-write snapshot().
+
+Times how long the owner's thread is busy to freeze a full lot each way,
+then the park/leave cost right after a snapshot, while the first writes
+copy their chunks.
+Run from the repo root:  python benchmarks/bench_snapshot.py [capacity]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_serialization import build  # noqa: E402
+
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+
+CHURN = 10_000  # leave + park pairs
+
+
+def _churn(svc: ParkingService, capacity: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(CHURN):
+        slot = i * 7919 % capacity + 1
+        svc.leave(slot)
+        svc.park(VehicleSpec(f"N{i}", "VW", "Golf", "Red", "ICE", "CAR"))
+    return (time.perf_counter() - t0) / CHURN * 1e6
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    svc = build(capacity)
+    svc.to_dict()  # encode every record once, as the first save would
+
+    t0 = time.perf_counter()
+    svc.to_dict()
+    t_dict = time.perf_counter() - t0
+    baseline = _churn(svc, capacity)
+    svc.to_dict()
+
+    t0 = time.perf_counter()
+    snap = svc.snapshot()
+    t_snap = time.perf_counter() - t0
+    after = _churn(svc, capacity)
+
+    t0 = time.perf_counter()
+    data = snap.to_dict()
+    t_export = time.perf_counter() - t0
+    assert len(data["slots"]) == capacity
+
+    print(f"slots {2 * capacity:,}")
+    print(f"to_dict() on owner thread      {t_dict * 1e3:9.2f} ms")
+    print(f"snapshot() on owner thread     {t_snap * 1e3:9.3f} ms")
+    print(f"snapshot.to_dict() (any thread){t_export * 1e3:9.2f} ms")
+    print(f"leave+park, no snapshot        {baseline:9.2f} us")
+    print(f"leave+park after snapshot      {after:9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+SQLite store vs the JSON file path: per-operation persistence cost and
+status/finder reads straight from storage.
+
+Run from the repo root:  python benchmarks/bench_sqlite.py [capacity]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+from sqlite_store import SqliteStore  # noqa: E402
+
+COLORS = ("Red", "Blue", "White", "Black", "Grey")
+
+
+def _lot(n: int) -> ParkingService:
+    slots = [
+        {"regnum": f"R{i}", "make": "VW", "model": "Golf", "color": COLORS[i % 5], "fuel": "ICE",
+         "kind": "CAR"} if i % 4 else None
+        for i in range(n)
+    ]
+    return ParkingService.from_dict({"level": 1, "capacity": n, "ev_capacity": 0, "slots": slots, "evSlots": []})
+
+
+def _timed(label: str, ops: int, fn) -> None:  # noqa: ANN001
+    t0 = time.perf_counter()
+    for k in range(ops):
+        fn(k)
+    print(f"{label:<44} {(time.perf_counter() - t0) / ops * 1e3:8.2f} ms/op")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    ops = 50
+    with tempfile.TemporaryDirectory() as d:
+        js, db = os.path.join(d, "lot.json"), os.path.join(d, "lot.db")
+        svc = _lot(n)
+        svc.save_json(js)
+        store = SqliteStore(db)
+        store.save(svc)
+        print(f"lot of {n} slots, 75% occupied")
+
+        def json_park(k: int) -> None:
+            s = ParkingService.load_json(js)
+            s.leave(4 * k + 2)
+            s.park(VehicleSpec(f"J{k}", "VW", "Golf", "Red", "ICE", "CAR"))
+            s.save_json(js)
+
+        def db_park(k: int) -> None:
+            svc.leave(4 * k + 3)
+            svc.park(VehicleSpec(f"D{k}", "VW", "Golf", "Red", "ICE", "CAR"))
+
+        _timed("JSON load + leave/park + save", ops, json_park)
+        store.attach(svc)
+        _timed("SQLite write-through leave/park (2 txns)", ops, db_park)
+        store.detach()
+        _timed("JSON load + status_rows()", ops, lambda k: ParkingService.load_json(js).status_rows())
+        _timed("SQLite status_rows() pushdown", ops, lambda k: store.status_rows())
+        _timed("JSON load + all_slots_by_color()", ops, lambda k: ParkingService.load_json(js).all_slots_by_color("Red"))
+        _timed("SQLite find('color') pushdown", ops, lambda k: store.find("color", "Red"))
+        _timed("SQLite find('regnum') (indexed)", ops, lambda k: store.find("regnum", f"R{k * 7 + 1}"))
+        _timed("SQLite load() occupied rows", 5, lambda k: store.load())
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
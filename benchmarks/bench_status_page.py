@@ -0,0 +1,57 @@
+"""
+Sorted status pages vs rebuilding and sorting every row.
+
+Run from the repo root:  python benchmarks/bench_status_page.py [capacity]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from parking_service import ParkingService, VehicleSpec  # noqa: E402
+
+MAKES = ("Audi", "BMW", "Ford", "Honda", "Kia", "Tesla", "Toyota", "VW")
+
+
+def build(capacity: int) -> ParkingService:
+    ice = [
+        {"regnum": f"R{(i * 7919) % capacity:06d}", "make": MAKES[i % len(MAKES)], "model": "X",
+         "color": "Blue", "fuel": "ICE", "kind": "CAR"}
+        for i in range(capacity)
+    ]
+    return ParkingService.from_dict({"level": 1, "capacity": capacity, "ev_capacity": 0, "slots": ice})
+
+
+def main() -> None:
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    pages = 200
+    svc = build(capacity)
+
+    t0 = time.perf_counter()
+    svc.status_page("ICE", "make", limit=50)
+    print(f"first page (builds order) {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+    t0 = time.perf_counter()
+    after = None
+    for _ in range(pages):
+        after = svc.status_page("ICE", "make", after, limit=50)["next"]
+    print(f"page of 50                {(time.perf_counter() - t0) / pages * 1e6:8.1f} us")
+
+    t0 = time.perf_counter()
+    for i in range(pages):  # interleaved churn keeps the order maintained
+        svc.leave(i + 1)
+        svc.park(VehicleSpec(f"N{i}", MAKES[i % len(MAKES)], "X", "Red", "ICE", "CAR"))
+    print(f"leave+park (maintained)   {(time.perf_counter() - t0) / pages * 1e6:8.1f} us")
+
+    t0 = time.perf_counter()
+    for _ in range(5):
+        svc._views.clear()  # what every read cost before caching and paging
+        sorted(svc.status_rows(), key=lambda r: (r["make"], r["slot_ui"]))[:50]
+    print(f"full rebuild + sort       {(time.perf_counter() - t0) / 5 * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
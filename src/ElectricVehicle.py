@@ -1,6 +1,9 @@
 # src/ElectricVehicle.py
 from __future__ import annotations
 
+# Usable battery capacity by vehicle kind (kWh)
+DEFAULT_BATTERY_KWH: dict[str, float] = {"CAR": 60.0, "MOTORCYCLE": 15.0}
+
 
 class ElectricVehicle:
     def __init__(self, regnum: str, make: str, model: str, color: str) -> None:
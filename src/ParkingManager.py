@@ -7,12 +7,17 @@ Tkinter UI wired to a pure ParkingService façade.
 
 from __future__ import annotations
 
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from typing import Callable
 
+from autosave import DEFAULT_DELAY_S, Autosaver, SaveOutcome
+from heatmap_tk import LotHeatmap
 from parking_service import ParkingService, VehicleSpec
 
+MAX_OUTPUT_LINES = 5000  # output pane keeps this many newest lines
+AUTOSAVE_POLL_MS = 200  # how often the event loop checks whether an autosave is due
 
 # ----------------------------- UI Builders --------------------------------- #
 def build_lot_section(
@@ -203,6 +208,7 @@ def build_lookup_buttons(
 def build_status_section(
     root: tk.Tk,
     tfield: tk.Text,
+    charge_filter_value: tk.StringVar,
     on_show_charge: Callable[[], None],
     on_show_status: Callable[[], None],
 ) -> None:
@@ -229,6 +235,14 @@ def build_status_section(
         padx=5,
         pady=5,
     ).grid(column=0, row=15, padx=4, pady=4, sticky="w")
+
+    # Optional filter for EV Charge Status: "N" = lowest N, "LO-HI" = charge range
+    tk.Label(root, text="Charge filter (N or lo-hi)", font="Arial 10").grid(
+        column=1, row=15, padx=4, pady=4, sticky="e"
+    )
+    tk.Entry(root, textvariable=charge_filter_value, width=8, font="Arial 12").grid(
+        column=2, row=15, padx=4, pady=4, sticky="w"
+    )
     # NOTE: tfield is placed in main() to support a scrollbar next to it.
 
 
@@ -296,11 +310,42 @@ def build_persistence_buttons(
     return {"save": btn_save, "load": btn_load, "export": btn_export}
 
 
+def build_autosave_section(
+    root: tk.Tk,
+    delay_value: tk.StringVar,
+    status_value: tk.StringVar,
+    on_toggle: Callable[[], None],
+) -> tk.Button:
+    btn_autosave = tk.Button(
+        root,
+        command=on_toggle,
+        text="Autosave...",
+        font="Arial 11",
+        bg="LightSteelBlue1",
+        fg="black",
+        activebackground="LightSteelBlue3",
+        padx=5,
+        pady=5,
+    )
+    btn_autosave.grid(column=0, row=19, padx=4, pady=4, sticky="w")
+
+    tk.Label(root, text="after quiet (s)", font="Arial 10").grid(
+        column=1, row=19, padx=4, pady=4, sticky="e"
+    )
+    tk.Entry(root, textvariable=delay_value, width=8, font="Arial 12").grid(
+        column=2, row=19, padx=4, pady=4, sticky="w"
+    )
+    tk.Label(root, textvariable=status_value, font="Arial 10").grid(
+        column=0, row=20, padx=4, columnspan=3, sticky="w"
+    )
+    return btn_autosave
+
+
 # ----------------------------- Application --------------------------------- #
 def main() -> None:  # noqa: PLR0915
     # Tk root & state (locals, no globals)
     root = tk.Tk()
-    root.geometry("650x980")  # taller so bottom buttons are visible
+    root.geometry("1050x1040")  # taller so bottom buttons are visible; heatmap on the right
     root.resizable(False, False)
     root.title("Parking Lot Manager")
 
@@ -316,6 +361,9 @@ def main() -> None:  # noqa: PLR0915
     ev_car2_value = tk.IntVar(value=0)  # 1 = EV (for remove)
     ev_motor_value = tk.IntVar(value=0)  # 1 = Motorcycle
     slot_value = tk.StringVar()
+    charge_filter_value = tk.StringVar()  # "" = all, "N" = lowest N, "LO-HI" = range
+    autosave_delay_value = tk.StringVar(value=f"{DEFAULT_DELAY_S:g}")
+    autosave_status_value = tk.StringVar(value="Autosave off")
 
     # Text area + scrollbar (monospace for aligned columns)
     tfield = tk.Text(root, width=70, height=18, font=("Courier New", 10))
@@ -323,10 +371,15 @@ def main() -> None:  # noqa: PLR0915
     tfield.configure(yscrollcommand=scrollbar.set)
 
     svc: ParkingService | None = None
+    autosaver: Autosaver | None = None
 
     # ---------- Callbacks (service-backed) ----------
     def write(msg: str) -> None:
         tfield.insert(tk.INSERT, msg + ("\n" if not msg.endswith("\n") else ""))
+        # keep only the newest lines so a long session doesn't grow the buffer forever
+        lines = int(tfield.index("end-1c").split(".")[0])
+        if lines > MAX_OUTPUT_LINES:
+            tfield.delete("1.0", f"{lines - MAX_OUTPUT_LINES + 1}.0")
         tfield.see(tk.END)
 
     def clearOutput() -> None:
@@ -339,6 +392,8 @@ def main() -> None:  # noqa: PLR0915
             evc = int(ev_value.get() or "0")
             lvl = int(level_value.get() or "1")
             svc = ParkingService(capacity=cap, ev_capacity=evc, level=lvl)
+            stopAutosave()
+            heatmap.show(svc)
             write(
                 f"Created a parking lot with {cap} regular slots and {evc} EV slots on level {lvl}"
             )
@@ -392,9 +447,22 @@ def main() -> None:  # noqa: PLR0915
         if svc is None:
             write("Please create the parking lot first.")
             return
-        write("Electric Vehicle Charge Levels\nSlot\tFloor\tReg No.\t\tCharge %")
-        for r in svc.ev_charge_rows():
-            write(f"{r['slot_ui']}\t{r['level']}\t{r['regnum']}\t\t{r['charge']}")
+        text = charge_filter_value.get().strip()
+        lo, sep, hi = text.partition("-")
+        try:
+            if not text:
+                rows = svc.ev_charge_rows()
+            elif sep:
+                rows = svc.charge_between(int(lo), int(hi))
+            else:
+                rows = svc.lowest_charge(int(text))
+        except ValueError:
+            write("Charge filter must be a count (e.g. 5) or a range (e.g. 20-50).")
+            return
+        write("Electric Vehicle Charge Levels\nSlot\tFloor\tReg No.\t\tCharge %\tkW")
+        for r in rows:
+            kw = f"{r['power_kw']:.1f}" if "power_kw" in r else "-"
+            write(f"{r['slot_ui']}\t{r['level']}\t{r['regnum']}\t\t{r['charge']}\t\t{kw}")
 
     # --------- Lookups ---------
     def lookupSlotByReg() -> None:
@@ -406,15 +474,15 @@ def main() -> None:  # noqa: PLR0915
         if not reg:
             write("Enter a registration number in the form above, then click the button.")
             return
-        slots: list[int] = []
-        for row in svc.status_rows():
-            if row["regnum"] == reg:
-                slots.append(row["slot_ui"])
-        for row in svc.ev_status_rows():
-            if row["regnum"] == reg:
-                slots.append(row["slot_ui"])
+        slots = svc.all_slots_by_reg(reg)
         if slots:
             write(f"Registration {reg} found in slot(s): {', '.join(map(str, slots))}")
+            return
+        # Partial or misread plate: offer ranked close matches
+        candidates = svc.search_reg(reg, limit=5)
+        if candidates:
+            hints = ", ".join(f"{c['regnum']} ({c['fuel']} slot {c['slot_ui']})" for c in candidates)
+            write(f"No exact match for {reg}. Closest: {hints}")
         else:
             write(f"No slot found for registration {reg}")
 
@@ -473,13 +541,71 @@ def main() -> None:  # noqa: PLR0915
         if not path:
             return
         try:
+            stopAutosave()  # flush first: path may be the autosave file itself
             svc = ParkingService.load_json(path)
+            heatmap.show(svc)
             write(f"Loaded lot from {path}")
             set_buttons_enabled(True)
             showStatus()
         except Exception as e:  # noqa: BLE001
             messagebox.showerror("Load JSON failed", str(e))
 
+    # --------- Autosave (snapshot on this thread, write on a worker) ---------
+    def toggleAutosave() -> None:
+        nonlocal autosaver
+        if autosaver is not None:
+            stopAutosave()
+            return
+        if svc is None:
+            messagebox.showinfo("Parking Manager", "Create or load a lot first.")
+            return
+        try:
+            delay = float(autosave_delay_value.get() or DEFAULT_DELAY_S)
+            if delay < 0:
+                raise ValueError
+        except ValueError:
+            write("Autosave delay must be a number of seconds (e.g. 2).")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Autosave lot to JSON",
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        autosaver = Autosaver(svc, path, delay_s=delay, max_delay_s=max(delay, 30.0))
+        autosave_status_value.set(f"Autosave on: {path}")
+        autosave_btn.config(text="Stop Autosave")
+        write(f"Autosaving to {path} after {delay:g}s without changes")
+
+    def stopAutosave() -> None:
+        """Write pending changes, then stop (the lot is about to be replaced or closed)."""
+        nonlocal autosaver
+        if autosaver is None:
+            return
+        saver, autosaver = autosaver, None
+        report(saver.close())
+        autosave_status_value.set("Autosave off")
+        autosave_btn.config(text="Autosave...")
+
+    def report(outcome: SaveOutcome | None) -> None:
+        if outcome is None:
+            return
+        if outcome["ok"]:
+            stamp = time.strftime("%H:%M:%S")
+            autosave_status_value.set(f"Autosaved rev {outcome['revision']} at {stamp}: {outcome['path']}")
+        else:
+            write(f"Autosave failed: {outcome['error']}")
+
+    def pollAutosave() -> None:
+        if autosaver is not None:
+            report(autosaver.poll())
+        root.after(AUTOSAVE_POLL_MS, pollAutosave)
+
+    def onClose() -> None:
+        stopAutosave()
+        root.destroy()
+
     def exportCsv() -> None:
         if svc is None:
             messagebox.showinfo("Parking Manager", "Create or load a lot first.")
@@ -511,7 +637,7 @@ def main() -> None:  # noqa: PLR0915
     )
     build_remove_section(root, slot_value, ev_car2_value, removeCar)
     lookup_btns = build_lookup_buttons(root, lookupSlotByReg, lookupSlotByColor, lookupRegByColor)
-    build_status_section(root, tfield, showChargeStatus, showStatus)
+    build_status_section(root, tfield, charge_filter_value, showChargeStatus, showStatus)
     build_util_buttons(root, clearOutput)
 
     # Place text area & scrollbar (kept here for layout control)
@@ -519,6 +645,13 @@ def main() -> None:  # noqa: PLR0915
     scrollbar.grid(column=3, row=16, sticky="nsw", padx=(0, 10))
 
     persist_btns = build_persistence_buttons(root, saveJson, loadJson, exportCsv)
+    autosave_btn = build_autosave_section(
+        root, autosave_delay_value, autosave_status_value, toggleAutosave
+    )
+
+    # Occupancy heatmap (recolours only changed slots after park/leave/charge)
+    heatmap = LotHeatmap(root)
+    heatmap.grid(column=4, row=0, rowspan=18, padx=10, pady=10, sticky="n")
 
     # Enable/disable buttons depending on whether a lot exists
     def set_buttons_enabled(enabled: bool) -> None:
@@ -527,11 +660,14 @@ def main() -> None:  # noqa: PLR0915
             lookup_btns[key].config(state=state)
         persist_btns["save"].config(state=state)
         persist_btns["export"].config(state=state)
+        autosave_btn["state"] = state
         persist_btns["load"].config(state=tk.NORMAL)  # Load is always available
 
     # Initially disabled until a lot is created or loaded
     set_buttons_enabled(False)
 
+    root.protocol("WM_DELETE_WINDOW", onClose)  # flush a pending autosave on exit
+    root.after(AUTOSAVE_POLL_MS, pollAutosave)
     root.mainloop()
 
 
@@ -0,0 +1,180 @@
+"""
+Slot allocation over runs of free bays.
+
+FreeRuns is a segment tree over one pool's bays. Each node stores the free
+run touching its left edge, the one touching its right edge, its longest
+free run and how many separate runs it contains, so "first/last run of k
+adjacent free bays" and occupy/free are O(log n) and fragmentation
+statistics are read from the root in O(1).
+
+An allocation policy is any callable (FreeRuns, bays) -> start index or
+None; ParkingService accepts one of POLICIES by name or a custom callable.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TypedDict
+
+# Bays taken by each vehicle kind when a site enables multi-bay placement
+# (ParkingService(..., bays_per_kind=LARGE_VEHICLE_BAYS)). Kinds not listed use 1.
+LARGE_VEHICLE_BAYS: dict[str, int] = {"BUS": 3, "TRUCK": 2}
+
+
+class FragmentationStats(TypedDict):
+    free: int
+    free_runs: int
+    largest_free_run: int
+    fragmentation: float  # 1 - largest_free_run / free (0.0 = one contiguous run)
+
+
+class FreeRuns:
+    """Segment tree of free/occupied bays (all free initially)."""
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        size = 1
+        while size < max(n, 1):
+            size *= 2
+        self._size = size
+        self._free = n
+        # per node: free prefix run, free suffix run, longest run, number of runs
+        self._pre = [0] * (2 * size)
+        self._suf = [0] * (2 * size)
+        self._best = [0] * (2 * size)
+        self._runs = [0] * (2 * size)
+        for i in range(n):  # padding leaves past n stay "occupied"
+            leaf = size + i
+            self._pre[leaf] = self._suf[leaf] = self._best[leaf] = self._runs[leaf] = 1
+        width = 1
+        level_start = size
+        while level_start > 1:
+            level_start //= 2
+            width *= 2
+            for node in range(level_start, 2 * level_start):
+                self._pull(node, width)
+
+    def _pull(self, node: int, width: int) -> None:
+        left, right = 2 * node, 2 * node + 1
+        half = width // 2
+        pre_l, suf_l, pre_r, suf_r = self._pre[left], self._suf[left], self._pre[right], self._suf[right]
+        self._pre[node] = pre_l + pre_r if pre_l == half else pre_l
+        self._suf[node] = suf_r + suf_l if suf_r == half else suf_r
+        self._best[node] = max(self._best[left], self._best[right], suf_l + pre_r)
+        joined = 1 if suf_l and pre_r else 0
+        self._runs[node] = self._runs[left] + self._runs[right] - joined
+
+    def _set(self, idx: int, free: bool) -> None:
+        node = self._size + idx
+        v = 1 if free else 0
+        self._free += v - self._pre[node]
+        self._pre[node] = self._suf[node] = self._best[node] = self._runs[node] = v
+        width = 1
+        while node > 1:
+            node //= 2
+            width *= 2
+            self._pull(node, width)
+
+    # ---------- updates ----------
+    def occupy(self, start: int, bays: int = 1) -> None:
+        for i in range(start, start + bays):
+            self._set(i, False)
+
+    def release(self, start: int, bays: int = 1) -> None:
+        for i in range(start, start + bays):
+            self._set(i, True)
+
+    # ---------- queries ----------
+    @property
+    def free(self) -> int:
+        """Number of free bays."""
+        return self._free
+
+    def is_free(self, idx: int, bays: int = 1) -> bool:
+        """True if bays idx..idx+bays-1 exist and are all free."""
+        if idx < 0 or idx + bays > self.n:
+            return False
+        return all(self._pre[self._size + i] for i in range(idx, idx + bays))
+
+    @property
+    def largest(self) -> int:
+        """Length of the longest run of free bays."""
+        return self._best[1]
+
+    def next_free(self, start: int = 0) -> int | None:
+        """Lowest free bay at or after start, else None."""
+        if start >= self.n:
+            return None
+        node = self._size + max(start, 0)
+        if self._pre[node]:
+            return node - self._size
+        while node > 1:  # climb to the nearest right sibling holding a free bay
+            if not node & 1 and self._best[node + 1]:
+                node += 1
+                break
+            node //= 2
+        else:
+            return None
+        while node < self._size:
+            node = 2 * node if self._best[2 * node] else 2 * node + 1
+        return node - self._size
+
+    def first_fit(self, bays: int) -> int | None:
+        """Lowest start index of a run of `bays` free bays, else None."""
+        if bays <= 0 or self._best[1] < bays:
+            return None
+        node, lo, width = 1, 0, self._size
+        while node < self._size:
+            left, right = 2 * node, 2 * node + 1
+            half = width // 2
+            if self._best[left] >= bays:
+                node, width = left, half
+            elif self._suf[left] + self._pre[right] >= bays:
+                return lo + half - self._suf[left]
+            else:
+                node, lo, width = right, lo + half, half
+        return lo
+
+    def last_fit(self, bays: int) -> int | None:
+        """Highest start index of a run of `bays` free bays, else None."""
+        if bays <= 0 or self._best[1] < bays:
+            return None
+        node, lo, width = 1, 0, self._size
+        while node < self._size:
+            left, right = 2 * node, 2 * node + 1
+            half = width // 2
+            if self._best[right] >= bays:
+                node, lo, width = right, lo + half, half
+            elif self._suf[left] + self._pre[right] >= bays:
+                return lo + half + self._pre[right] - bays
+            else:
+                node, width = left, half
+        return lo
+
+    def stats(self) -> FragmentationStats:
+        free = self.free
+        largest = self._best[1]
+        return {
+            "free": free,
+            "free_runs": self._runs[1],
+            "largest_free_run": largest,
+            "fragmentation": round(1.0 - largest / free, 4) if free else 0.0,
+        }
+
+
+Policy = Callable[[FreeRuns, int], int | None]
+
+
+def first_fit(runs: FreeRuns, bays: int) -> int | None:
+    """Lowest-numbered run that fits (the historic first-free-slot behaviour)."""
+    return runs.first_fit(bays)
+
+
+def large_from_end(runs: FreeRuns, bays: int) -> int | None:
+    """
+    Single bays fill from the front, multi-bay vehicles from the back, so
+    cars and buses don't interleave and break up long runs.
+    """
+    return runs.first_fit(bays) if bays == 1 else runs.last_fit(bays)
+
+
+POLICIES: dict[str, Policy] = {"first_fit": first_fit, "large_from_end": large_from_end}
@@ -0,0 +1,158 @@
+"""
+Debounced background autosave for an interactive lot.
+
+Autosaver subscribes to a ParkingService and marks the lot dirty on every
+park/leave/charge. The owner (the Tk UI) calls poll() from its event loop.
+Once no change has arrived for delay_s, or changes have kept coming for
+max_delay_s, poll() takes svc.snapshot() on the calling thread. This is
+cheap (records are shared copy-on-write), and it is consistent because
+nothing else mutates the service meanwhile. A worker thread then builds the
+dict from the snapshot, JSON-encodes it and writes it with
+lot_file.atomic_write_json (temp file, fsync, rename).
+At most one save is in flight; changes made during it are kept for the next
+one. Outcomes are reported back through poll(), on the owner's thread, so
+callers can touch widgets directly.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from lot_file import atomic_write_json
+
+if TYPE_CHECKING:
+    from parking_service import ParkingService
+    from snapshot import LotSnapshot
+
+DEFAULT_DELAY_S = 2.0  # quiet time before a save
+DEFAULT_MAX_DELAY_S = 30.0  # longest a change waits under a steady stream of mutations
+
+
+class SaveOutcome(TypedDict):
+    ok: bool
+    path: str
+    revision: int
+    seconds: float  # time spent encoding and writing on the worker
+    error: str | None
+
+
+class Autosaver:
+    """Coalesces lot changes and writes snapshots atomically on a worker thread."""
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        path: str | os.PathLike[str],
+        delay_s: float = DEFAULT_DELAY_S,
+        max_delay_s: float = DEFAULT_MAX_DELAY_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if delay_s < 0 or max_delay_s < delay_s:
+            raise ValueError("need 0 <= delay_s <= max_delay_s")
+        self._svc = svc
+        self.path = os.fspath(path)
+        self.delay_s = delay_s
+        self.max_delay_s = max_delay_s
+        self._clock = clock
+        self._first_change: float | None = None  # set while dirty
+        self._last_change = 0.0
+        self._worker: threading.Thread | None = None
+        self._outcome: SaveOutcome | None = None  # written by the worker, read by poll()
+        self.saves = 0
+        self.failures = 0
+        self._unsubscribe = svc.subscribe(self._on_event)
+
+    @property
+    def dirty(self) -> bool:
+        return self._first_change is not None
+
+    @property
+    def saving(self) -> bool:
+        return self._worker is not None
+
+    def _on_event(self, *_: Any) -> None:
+        now = self._clock()
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+
+    def due(self) -> bool:
+        if self._first_change is None:
+            return False
+        now = self._clock()
+        return now - self._last_change >= self.delay_s or now - self._first_change >= self.max_delay_s
+
+    def poll(self) -> SaveOutcome | None:
+        """
+        Collect a finished save and start the next one if it is due.
+        Returns the outcome of the save that finished since the last call, if any.
+        """
+        outcome = self._collect()
+        if self._worker is None and self.due():
+            self._start()
+        return outcome
+
+    def flush(self, timeout: float | None = None) -> SaveOutcome | None:
+        """
+        Wait for the save in flight, then write any pending changes before
+        returning (e.g. when the window closes). Returns the last outcome.
+        """
+        if self._worker is not None:
+            self._worker.join(timeout)
+        outcome = self._collect()
+        if self._worker is None and self.dirty:
+            self._start().join(timeout)
+            outcome = self._collect() or outcome
+        return outcome
+
+    def close(self, timeout: float | None = None) -> SaveOutcome | None:
+        """flush() and stop listening to the service."""
+        outcome = self.flush(timeout)
+        self._unsubscribe()
+        return outcome
+
+    def _start(self) -> threading.Thread:
+        svc = self._svc
+        svc.revision += 1  # same numbering as save_json()
+        snapshot = svc.snapshot()
+        self._first_change = None
+        worker = self._worker = threading.Thread(
+            target=self._write, args=(snapshot, svc.revision), name="autosave", daemon=True
+        )
+        worker.start()
+        return worker
+
+    def _write(self, snapshot: LotSnapshot, revision: int) -> None:
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            atomic_write_json(self.path, snapshot.to_dict())
+        except Exception as e:  # noqa: BLE001 - reported to the owner via poll()
+            error = f"{type(e).__name__}: {e}"
+        self._outcome = {
+            "ok": error is None,
+            "path": self.path,
+            "revision": revision,
+            "seconds": time.perf_counter() - started,
+            "error": error,
+        }
+
+    def _collect(self) -> SaveOutcome | None:
+        worker = self._worker
+        if worker is None or worker.is_alive():
+            return None
+        worker.join()
+        self._worker = None
+        outcome, self._outcome = self._outcome, None
+        if outcome is not None:
+            if outcome["ok"]:
+                self.saves += 1
+            else:
+                self.failures += 1
+                # keep the changes pending so the next poll retries
+                if self._first_change is None:
+                    self._first_change = self._last_change = self._clock()
+        return outcome
@@ -0,0 +1,279 @@
+"""
+Parking tariffs and session billing.
+
+A Session is one closed stay, returned by ParkingService.leave(). A Tariff
+prices it from daily time bands: each Band charges `rate` per hour between
+start_h and end_h local time, scaled by a per-kind factor (by default a bus
+pays three car rates). EVs also pay kwh_rate per kWh charged. The energy
+is the exit charge percent of the kind's battery, since vehicles enter
+uncharged in this model, unless a metered figure is passed. Stays no longer
+than grace_s pay for energy only.
+
+Time in a band: a band [a, b) repeats every day, so the seconds it covers
+from the epoch up to time t are
+    F(t) = floor(t / DAY) * (b - a) + clip(t mod DAY - a, 0, b - a)
+and a stay [s, e) spends F(e) - F(s) seconds in it, however many days it
+spans. price() evaluates this per band in plain Python at exit.
+price_batch() evaluates the same expression over NumPy arrays (optional
+dependency), a few whole-array operations per band, so end-of-day
+invoicing has no Python loop per session.
+
+SessionLog collects closed sessions in columns through the service's
+on_session hook and appends them to a JSONL file for invoicing.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from array import array
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, TypedDict, get_args
+
+from ElectricVehicle import DEFAULT_BATTERY_KWH
+from parking_service import Kind
+
+if TYPE_CHECKING:
+    from parking_service import ParkingService, Session
+
+DAY_S = 86_400
+HOUR_S = 3600
+KINDS: tuple[str, ...] = get_args(Kind)  # kind codes in SessionLog columns (columns.KINDS order)
+FUELS = ("ICE", "EV")
+NO_CHARGE = -1  # charge column for ICE sessions
+
+
+@dataclass(frozen=True)
+class Band:
+    start_h: float  # hour of day the band starts (inclusive)
+    end_h: float  # hour of day it ends (exclusive, <= 24)
+    rate: float  # per hour, for a CAR
+
+
+DEFAULT_BANDS = (Band(0, 7, 1.0), Band(7, 19, 3.0), Band(19, 24, 1.5))
+DEFAULT_KIND_FACTOR: dict[str, float] = {"CAR": 1.0, "MOTORCYCLE": 0.5, "BUS": 3.0, "TRUCK": 2.5}
+DEFAULT_KWH_RATE = 0.35
+DEFAULT_GRACE_S = 600.0
+
+
+class InvoiceSummary(TypedDict):
+    sessions: int
+    hours: float  # total stay time
+    kwh: float
+    total: float
+    by_kind: dict[str, float]  # fees per vehicle kind
+
+
+def _round_cents(amount: float) -> float:
+    return math.floor(amount * 100 + 0.5) / 100
+
+
+@dataclass(frozen=True)
+class Tariff:
+    """Time-banded hourly rates with per-kind factors and an EV energy surcharge."""
+
+    bands: tuple[Band, ...] = DEFAULT_BANDS
+    kind_factor: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_KIND_FACTOR))
+    kwh_rate: float = DEFAULT_KWH_RATE
+    grace_s: float = DEFAULT_GRACE_S
+    utc_offset_h: float = 0.0  # bands are in local time = UTC + offset
+    battery_kwh: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_BATTERY_KWH))
+
+    def __post_init__(self) -> None:
+        end = 0.0
+        for band in sorted(self.bands, key=lambda b: b.start_h):
+            if not 0 <= band.start_h < band.end_h <= 24 or band.start_h < end:  # noqa: PLR2004
+                raise ValueError(f"bands must lie in [0, 24) without overlapping: {band}")
+            end = band.end_h
+
+    # ---------- single session ----------
+    def quote(
+        self,
+        kind: str,
+        entered: float | None,
+        exited: float,
+        charge: int | None = None,
+        kwh: float | None = None,
+    ) -> float:
+        """
+        Fee for one stay. Unknown entry times (None) are charged for energy only.
+        kwh overrides the energy derived from the exit charge.
+        """
+        start = exited if entered is None else entered
+        offset = self.utc_offset_h * HOUR_S
+        days_s, sod_s = divmod(start + offset, DAY_S)
+        days_e, sod_e = divmod(exited + offset, DAY_S)
+        weighted = 0.0  # rate-weighted hours
+        for band in self.bands:
+            a, width = band.start_h * HOUR_S, (band.end_h - band.start_h) * HOUR_S
+            covered = (
+                (days_e - days_s) * width
+                + min(max(sod_e - a, 0.0), width)
+                - min(max(sod_s - a, 0.0), width)
+            )
+            weighted += band.rate * covered / HOUR_S
+        parking = self.kind_factor.get(kind, 1.0) * weighted if exited - start > self.grace_s else 0.0
+        if kwh is None:
+            kwh = max(charge or 0, 0) / 100 * self.battery_kwh.get(kind, 0.0)
+        return _round_cents(parking + kwh * self.kwh_rate)
+
+    def price(self, session: Session, kwh: float | None = None) -> float:
+        return self.quote(session["kind"], session["entered"], session["exited"], session["charge"], kwh)
+
+    # ---------- many sessions ----------
+    def price_batch(
+        self,
+        entered: Any,
+        exited: Any,
+        kind: Any,
+        charge: Any = None,
+        kwh: Any = None,
+    ) -> Any:
+        """
+        Fees for arrays of sessions (same rules as quote(), NumPy required).
+        kind holds codes into KINDS; entered may be NaN for unknown entries;
+        charge uses NO_CHARGE for ICE. Returns a float64 array.
+        """
+        import numpy as np  # noqa: PLC0415 (numpy is optional)
+
+        exited = np.asarray(exited, dtype=np.float64)
+        entered = np.asarray(entered, dtype=np.float64)
+        start = np.where(np.isnan(entered), exited, entered)
+        kind = np.asarray(kind, dtype=np.intp)
+        offset = self.utc_offset_h * HOUR_S
+        days_s, sod_s = np.divmod(start + offset, DAY_S)
+        days_e, sod_e = np.divmod(exited + offset, DAY_S)
+        weighted = np.zeros(len(exited), dtype=np.float64)
+        for band in self.bands:
+            a, width = band.start_h * HOUR_S, (band.end_h - band.start_h) * HOUR_S
+            covered = (
+                (days_e - days_s) * width
+                + np.clip(sod_e - a, 0.0, width)
+                - np.clip(sod_s - a, 0.0, width)
+            )
+            weighted += band.rate * covered / HOUR_S
+        factor = np.array([self.kind_factor.get(k, 1.0) for k in KINDS])[kind]
+        parking = np.where(exited - start > self.grace_s, factor * weighted, 0.0)
+        if kwh is None:
+            if charge is None:
+                kwh = np.zeros(len(exited))
+            else:
+                battery = np.array([self.battery_kwh.get(k, 0.0) for k in KINDS])[kind]
+                kwh = np.maximum(np.asarray(charge, dtype=np.float64), 0) / 100 * battery
+        amount = parking + np.asarray(kwh, dtype=np.float64) * self.kwh_rate
+        return np.floor(amount * 100 + 0.5) / 100
+
+    def invoice(self, log: SessionLog) -> InvoiceSummary:
+        """Price every session in a log at once and total the fees."""
+        import numpy as np  # noqa: PLC0415 (numpy is optional)
+
+        cols = log.to_arrays()
+        fees = self.price_batch(cols["entered"], cols["exited"], cols["kind"], cols["charge"])
+        known = ~np.isnan(cols["entered"])
+        stay = (cols["exited"][known] - cols["entered"][known]).sum()
+        battery = np.array([self.battery_kwh.get(k, 0.0) for k in KINDS])[cols["kind"]]
+        kwh = (np.maximum(cols["charge"], 0) / 100 * battery).sum()
+        by_kind = np.bincount(cols["kind"], weights=fees, minlength=len(KINDS))
+        return {
+            "sessions": len(log),
+            "hours": round(float(stay) / HOUR_S, 2),
+            "kwh": round(float(kwh), 2),
+            "total": round(float(fees.sum()), 2),
+            "by_kind": {k: round(float(v), 2) for k, v in zip(KINDS, by_kind, strict=True) if v},
+        }
+
+    # ---------- persistence ----------
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["bands"] = [asdict(b) for b in self.bands]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Tariff:
+        """Tariff from a to_dict()-style mapping; missing keys keep their defaults."""
+        options = dict(data)
+        if "bands" in options:
+            options["bands"] = tuple(Band(**b) for b in options["bands"])
+        return cls(**options)
+
+    @classmethod
+    def load_json(cls, path: str | os.PathLike[str]) -> Tariff:
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class SessionLog:
+    """Closed sessions stored column by column (one row per leave)."""
+
+    def __init__(self, svc: ParkingService | None = None) -> None:
+        self.regnum: list[str] = []
+        self.fuel = array("b")
+        self.kind = array("b")
+        self.slot = array("l")
+        self.entered = array("d")  # NaN when unknown
+        self.exited = array("d")
+        self.charge = array("b")  # NO_CHARGE for ICE
+        self._svc = svc
+        if svc is not None:
+            svc.on_session = self.append
+
+    def close(self) -> None:
+        """Stop collecting from the service."""
+        if self._svc is not None and self._svc.on_session == self.append:
+            self._svc.on_session = None
+
+    def __len__(self) -> int:
+        return len(self.exited)
+
+    def append(self, session: Session) -> None:
+        entered = session["entered"]
+        charge = session["charge"]
+        self.regnum.append(session["regnum"])
+        self.fuel.append(FUELS.index(session["fuel"]))
+        self.kind.append(KINDS.index(session["kind"]))
+        self.slot.append(session["slot_ui"])
+        self.entered.append(math.nan if entered is None else entered)
+        self.exited.append(session["exited"])
+        self.charge.append(NO_CHARGE if charge is None else charge)
+
+    def sessions(self) -> Iterator[Session]:
+        for i in range(len(self)):
+            entered, charge = self.entered[i], self.charge[i]
+            yield {
+                "regnum": self.regnum[i],
+                "fuel": "EV" if self.fuel[i] else "ICE",
+                "kind": KINDS[self.kind[i]],
+                "slot_ui": self.slot[i],
+                "entered": None if math.isnan(entered) else entered,
+                "exited": self.exited[i],
+                "charge": None if charge == NO_CHARGE else charge,
+            }
+
+    def to_arrays(self) -> dict[str, Any]:
+        """NumPy views of the columns (kind is copied to an index dtype)."""
+        import numpy as np  # noqa: PLC0415 (numpy is optional)
+
+        return {
+            "fuel": np.asarray(self.fuel),
+            "kind": np.asarray(self.kind).astype(np.intp),  # usable as an index
+            "slot": np.asarray(self.slot),
+            "entered": np.asarray(self.entered),
+            "exited": np.asarray(self.exited),
+            "charge": np.asarray(self.charge),
+        }
+
+    def save_jsonl(self, path: str | os.PathLike[str]) -> None:
+        """Append every session to a JSONL file, one object per line."""
+        with open(path, "a", encoding="utf-8") as f:
+            for s in self.sessions():
+                f.write(json.dumps(s) + "\n")
+
+    @classmethod
+    def load_jsonl(cls, path: str | os.PathLike[str]) -> SessionLog:
+        log = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    log.append(json.loads(line))
+        return log
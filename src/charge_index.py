@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+
+MAX_CHARGE = 100
+
+
+class ChargeIndex:
+    """
+    EV slots ordered by charge percent, maintained by ParkingService on
+    park/leave/set_charge. Charge is an integer 0..100, so the index is a
+    fixed array of 101 buckets, each a sorted list of 0-based slot indexes:
+    ordered scans visit at most 101 buckets plus the k results returned.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: list[list[int]] = [[] for _ in range(MAX_CHARGE + 1)]
+        self._charge: dict[int, int] = {}  # idx -> bucket it is filed under
+
+    def __len__(self) -> int:
+        return len(self._charge)
+
+    @staticmethod
+    def _bucket(charge: int) -> int:
+        return min(max(int(charge), 0), MAX_CHARGE)
+
+    def add(self, idx: int, charge: int) -> None:
+        b = self._charge[idx] = self._bucket(charge)
+        insort(self._buckets[b], idx)
+
+    def remove(self, idx: int) -> None:
+        b = self._charge.pop(idx, None)
+        if b is None:
+            return
+        bucket = self._buckets[b]
+        del bucket[bisect_left(bucket, idx)]
+
+    def update(self, idx: int, charge: int) -> None:
+        if self._charge.get(idx) != self._bucket(charge):
+            self.remove(idx)
+            self.add(idx, charge)
+
+    def ascending(self, lo: int = 0, hi: int = MAX_CHARGE) -> Iterator[int]:
+        """
+        Slot indexes with lo <= charge <= hi, lowest charge (then slot) first.
+        The range is intersected with 0..100, so a range outside it yields nothing.
+        """
+        for b in range(max(int(lo), 0), min(int(hi), MAX_CHARGE) + 1):
+            yield from self._buckets[b]
@@ -0,0 +1,207 @@
+"""
+Site-power-capped charger scheduling for the EV pool.
+
+The site limit buys floor(limit / charger_kw) full-power chargers; any
+remainder trickles to the next vehicle in line. Priority is lowest state of
+charge first, then earliest expected departure, then slot number.
+
+Two lazily-cleaned heaps keep the split between "active" (full power) and
+"waiting" vehicles: a max-heap of active keys (worst active on top) and a
+min-heap of waiting keys (best waiting on top). Every park/leave/charge
+change is a constant number of heap operations, i.e. O(log n).
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from charging import ChargingEngine
+    from parking_service import Fuel, ParkingService, SlotEvent
+
+DEFAULT_CHARGER_KW = 7.4
+
+Key = tuple[float, float, int]  # (charge %, departure ts or inf, slot idx)
+
+
+class ChargeScheduler:
+    """Assign kW to occupied EV slots under a shared site limit."""
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        site_limit_kw: float,
+        charger_kw: float = DEFAULT_CHARGER_KW,
+        engine: ChargingEngine | None = None,
+    ) -> None:
+        if site_limit_kw < 0 or charger_kw <= 0:
+            raise ValueError("site_limit_kw must be >= 0 and charger_kw > 0")
+        self._svc = svc
+        self.site_limit_kw = float(site_limit_kw)
+        self.charger_kw = float(charger_kw)
+        self._full_slots = int(site_limit_kw // charger_kw)
+        self._remainder_kw = self.site_limit_kw - self._full_slots * self.charger_kw
+        self._engine = engine
+
+        self._keys: dict[int, Key] = {}  # current key per occupied idx
+        self._departure: dict[int, float] = {}
+        self._active: set[int] = set()
+        self._active_heap: list[tuple[float, float, int]] = []  # negated keys
+        self._waiting_heap: list[Key] = []
+        self._trickle: int | None = None  # waiting idx receiving the remainder
+
+        if engine is not None:
+            engine.power_kw[:] = 0.0
+        for i, s in enumerate(svc.evSlots):
+            if s.vehicle is not None:
+                self._add(i, s.vehicle)
+        self._unsubscribe = svc.subscribe(self._on_event)
+        svc.charge_power = self.power_for
+
+    def close(self) -> None:
+        """Detach from the service (ev_charge_rows stops reporting power)."""
+        self._unsubscribe()
+        if self._svc.charge_power == self.power_for:
+            self._svc.charge_power = None
+
+    # ---------- public API ----------
+    def power_for(self, idx: int) -> float:
+        """kW currently assigned to a 0-based EV slot (0 when not charging)."""
+        if idx in self._active:
+            return self.charger_kw
+        if idx == self._trickle:
+            return self._remainder_kw
+        return 0.0
+
+    def set_departure(self, slot_ui: int, ts: float | None) -> None:
+        """Record (or clear) the expected departure time of an occupied EV slot."""
+        idx = slot_ui - 1
+        if idx not in self._keys:
+            raise ValueError(f"EV slot {slot_ui} is not occupied")
+        if ts is None:
+            self._departure.pop(idx, None)
+        else:
+            self._departure[idx] = float(ts)
+        self._reprioritize(idx, self._keys[idx][0])
+
+    def active_slots(self) -> list[int]:
+        """1-based EV slots charging at full power, best priority first."""
+        return [idx + 1 for *_, idx in sorted(self._keys[i] for i in self._active)]
+
+    def allocated_kw(self) -> float:
+        """Total kW handed out (never above site_limit_kw)."""
+        trickle = self._remainder_kw if self._trickle is not None else 0.0
+        return len(self._active) * self.charger_kw + trickle
+
+    # ---------- event handling ----------
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        if fuel != "EV":
+            return
+        if event == "park":
+            self._add(idx, vehicle)
+        elif event == "leave":
+            self._remove(idx)
+            self._departure.pop(idx, None)
+        elif idx in self._keys:
+            self._reprioritize(idx, float(vehicle.charge))
+
+    def _key(self, idx: int, charge: float) -> Key:
+        return (charge, self._departure.get(idx, math.inf), idx)
+
+    def _add(self, idx: int, vehicle: Any) -> None:
+        key = self._keys[idx] = self._key(idx, float(vehicle.charge))
+        if len(self._active) < self._full_slots:
+            self._activate(key)
+        else:
+            worst = self._peek_active()
+            if worst is not None and key < worst:
+                self._active.discard(worst[2])
+                heapq.heappop(self._active_heap)
+                self._wait(worst)
+                self._activate(key)
+            else:
+                self._wait(key)
+        self._refresh_trickle()
+        self._compact()
+
+    def _remove(self, idx: int) -> None:
+        if self._keys.pop(idx, None) is None:
+            return
+        if idx in self._active:
+            self._active.discard(idx)
+            self._set_power(idx)
+            best = self._pop_waiting()
+            if best is not None:
+                self._activate(best)
+        else:
+            self._set_power(idx)
+        self._refresh_trickle()
+
+    def _reprioritize(self, idx: int, charge: float) -> None:
+        if self._key(idx, charge) != self._keys.get(idx):
+            vehicle = self._svc.evSlots[idx].vehicle
+            self._remove(idx)
+            self._add(idx, vehicle)
+
+    # ---------- heap helpers (entries are stale once their key is replaced) ----------
+    def _activate(self, key: Key) -> None:
+        idx = key[2]
+        self._active.add(idx)
+        heapq.heappush(self._active_heap, (-key[0], -key[1], -idx))
+        self._set_power(idx)
+
+    def _wait(self, key: Key) -> None:
+        heapq.heappush(self._waiting_heap, key)
+        self._set_power(key[2])
+
+    def _peek_active(self) -> Key | None:
+        heap = self._active_heap
+        while heap:
+            c, d, i = heap[0]
+            key = (-c, -d, -i)
+            if -i in self._active and self._keys.get(-i) == key:
+                return key
+            heapq.heappop(heap)
+        return None
+
+    def _peek_waiting(self) -> Key | None:
+        heap = self._waiting_heap
+        while heap:
+            key = heap[0]
+            idx = key[2]
+            if idx not in self._active and self._keys.get(idx) == key:
+                return key
+            heapq.heappop(heap)
+        return None
+
+    def _pop_waiting(self) -> Key | None:
+        key = self._peek_waiting()
+        if key is not None:
+            heapq.heappop(self._waiting_heap)
+        return key
+
+    def _compact(self) -> None:
+        """Drop stale heap entries once they outnumber live ones."""
+        live = len(self._keys)
+        if len(self._active_heap) + len(self._waiting_heap) > 2 * live + 64:
+            self._active_heap = [
+                (-k[0], -k[1], -k[2]) for i, k in self._keys.items() if i in self._active
+            ]
+            self._waiting_heap = [k for i, k in self._keys.items() if i not in self._active]
+            heapq.heapify(self._active_heap)
+            heapq.heapify(self._waiting_heap)
+
+    def _refresh_trickle(self) -> None:
+        best = self._peek_waiting() if self._remainder_kw > 0 else None
+        new = best[2] if best is not None else None
+        if new != self._trickle:
+            old, self._trickle = self._trickle, new
+            if old is not None:
+                self._set_power(old)
+            if new is not None:
+                self._set_power(new)
+
+    def _set_power(self, idx: int) -> None:
+        if self._engine is not None:
+            self._engine.power_kw[idx] = self.power_for(idx) if idx in self._keys else 0.0
@@ -0,0 +1,134 @@
+"""
+Vectorized EV charging simulation over a ParkingService's EV pool.
+
+Requires NumPy (optional dependency: `pip install parking-lot-manager[analytics]`).
+State lives in per-slot arrays (charger power, battery capacity, state of
+charge); a tick is a handful of whole-array operations, so cost per tick does
+not depend on Python-level loops over vehicles. Integer charge percentages
+are written back to the ElectricVehicle objects on sync().
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from ElectricVehicle import DEFAULT_BATTERY_KWH
+from vehicle_codec import codec_for
+
+if TYPE_CHECKING:
+    from parking_service import Fuel, ParkingService, SlotEvent
+
+DEFAULT_CHARGER_KW = 7.4
+
+
+class ChargingEngine:
+    """
+    Advance the state of charge of every occupied EV slot per time step.
+    Charging is constant-power up to taper_from percent, then power falls
+    linearly towards min_taper of the charger rating at 100% (CC/CV shape).
+    power_kw is public so schedulers can write per-slot allocations into it.
+    """
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        charger_kw: float | Sequence[float] = DEFAULT_CHARGER_KW,
+        battery_kwh: dict[str, float] | None = None,
+        taper_from: float = 80.0,
+        min_taper: float = 0.1,
+    ) -> None:
+        if not 0.0 <= taper_from < 100.0:  # noqa: PLR2004
+            raise ValueError("taper_from must be in [0, 100)")
+        n = svc.ev_capacity
+        self._svc = svc
+        self._battery_kwh = {**DEFAULT_BATTERY_KWH, **(battery_kwh or {})}
+        self._taper_from = float(taper_from)
+        self._min_taper = float(min_taper)
+
+        self.power_kw = np.empty(n, dtype=np.float64)
+        self.power_kw[:] = charger_kw  # scalar or one rating per slot
+        self.capacity_kwh = np.zeros(n, dtype=np.float64)  # 0 = vacant
+        self.soc = np.zeros(n, dtype=np.float64)  # percent, fractional
+        self.occupied = np.zeros(n, dtype=bool)
+        self.delivered_kwh = np.zeros(n, dtype=np.float64)  # since the vehicle parked
+        self._synced = np.zeros(n, dtype=np.int64)  # last charge written back
+        self._syncing = False
+
+        for i, s in enumerate(svc.evSlots):
+            if s.vehicle is not None:
+                self._load(i, s.vehicle)
+        self._unsubscribe = svc.subscribe(self._on_event)
+
+    # ---------- occupancy tracking ----------
+    def _load(self, idx: int, vehicle: Any) -> None:
+        self.occupied[idx] = True
+        self.capacity_kwh[idx] = self._battery_kwh[codec_for(vehicle).kind]
+        self.soc[idx] = self._synced[idx] = int(vehicle.charge)
+        self.delivered_kwh[idx] = 0.0
+
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        if fuel != "EV":
+            return
+        if event == "park":
+            self._load(idx, vehicle)
+        elif event == "leave":
+            self.occupied[idx] = False
+            self.capacity_kwh[idx] = 0.0
+            self.soc[idx] = self._synced[idx] = 0
+        elif not self._syncing:  # external set_charge overrides the simulation
+            self.soc[idx] = self._synced[idx] = int(vehicle.charge)
+
+    def close(self) -> None:
+        """Stop following the service's park/leave/charge events."""
+        self._unsubscribe()
+
+    # ---------- simulation ----------
+    def step(self, minutes: float = 1.0, ticks: int = 1) -> None:
+        """Advance ticks steps of the given length (minutes) without syncing."""
+        occupied = self.occupied
+        kwh_per_pct = self.capacity_kwh / 100.0
+        # percent gained per minute at full power (0 for vacant slots)
+        rate = np.zeros_like(self.soc)
+        np.divide(self.power_kw / 60.0, kwh_per_pct, out=rate, where=occupied)
+        per_tick = rate * minutes
+        span = 100.0 - self._taper_from
+        soc, delivered = self.soc, self.delivered_kwh
+        new = np.empty_like(soc)
+        gain = np.empty_like(soc)
+        for _ in range(ticks):
+            # taper factor, then the new SoC, all in preallocated buffers
+            np.subtract(100.0, soc, out=new)
+            new /= span
+            np.clip(new, self._min_taper, 1.0, out=new)
+            new *= per_tick
+            new += soc
+            np.minimum(new, 100.0, out=new)
+            np.subtract(new, soc, out=gain)
+            gain *= kwh_per_pct
+            delivered += gain
+            soc[:] = new
+
+    def sync(self) -> int:
+        """
+        Write integer charge percentages back to the vehicles (via
+        ParkingService.set_charge, so listeners see the change). Only slots
+        whose whole-percent value moved are touched. Returns how many.
+        """
+        # floor, tolerating float drift just below a whole percent
+        levels = np.floor(self.soc + 1e-9).astype(np.int64)
+        changed = np.flatnonzero(self.occupied & (levels != self._synced))
+        self._syncing = True
+        try:
+            for idx in changed.tolist():
+                self._svc.set_charge(idx + 1, int(levels[idx]))
+        finally:
+            self._syncing = False
+        self._synced[changed] = levels[changed]
+        return int(changed.size)
+
+    def run(self, minutes: float, tick_minutes: float = 1.0) -> int:
+        """Simulate a span of time in fixed ticks, then sync. Returns slots updated."""
+        self.step(tick_minutes, ticks=round(minutes / tick_minutes))
+        return self.sync()
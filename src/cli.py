@@ -2,11 +2,37 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
 import json
 import sys
+from collections.abc import Callable
+from datetime import datetime
 from pathlib import Path
-
-from parking_service import ParkingService, VehicleSpec
+from typing import TypeVar
+
+from allocation import LARGE_VEHICLE_BAYS
+from billing import SessionLog, Tariff
+from fleet import Fleet
+from history import OccupancyHistory
+from ingest import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_DEDUPE_WINDOW_S,
+    DEFAULT_QUEUE_SIZE,
+    Ingestor,
+    ingest_jsonl,
+    serve,
+)
+from layout import Layout
+from lot_file import update_lot
+from overstay import OverstayMonitor
+from parking_service import Fuel, ParkingService, ParkResult, VehicleSpec
+from snapshot import LotSnapshot
+from soak import DEFAULT_MAX_ALLOC_SLOPE, DEFAULT_MAX_RSS_SLOPE, run_soak
+from sort_index import SORT_KEYS
+from sqlite_store import SqliteStore
+
+T = TypeVar("T")
 
 
 def die(msg: str, code: int = 2) -> None:
@@ -17,8 +43,14 @@ def die(msg: str, code: int = 2) -> None:
 def _service_from_args(args: argparse.Namespace) -> ParkingService:
     """
     Helper: either create a fresh lot (if --create* flags are present)
-    or load an existing one with --load.
+    or load an existing one with --load (JSON) or --db (SQLite, write-through).
     """
+    if getattr(args, "db", None):
+        store = _open_db(args)
+        svc = store.load()
+        store.attach(svc)  # park/leave below commit their row immediately
+        return svc
+
     if getattr(args, "load", None):
         p = Path(args.load)
         if not p.exists():
@@ -35,15 +67,103 @@ def _service_from_args(args: argparse.Namespace) -> ParkingService:
     die("No lot loaded or created. Pass --load FILE or --capacity/--ev-capacity/--level.")
 
 
+def _open_db(args: argparse.Namespace) -> SqliteStore:
+    """Open --db once per command (closed by main() when the command finishes)."""
+    if getattr(args, "store", None) is not None:
+        return args.store
+    if not Path(args.db).exists():
+        die(f"File not found: {args.db}")
+    store = args.store = SqliteStore(args.db)
+    if not store.exists():
+        die(f"No lot stored in {args.db} (create one with: create --db FILE)")
+    return store
+
+
+def _history_from_args(
+    args: argparse.Namespace, svc: ParkingService
+) -> tuple[OccupancyHistory, LotSnapshot] | None:
+    """
+    With --history DIR, record the attempt's events in memory, together with
+    the lot as it was before them, for _save_history() once it commits.
+    """
+    if not getattr(args, "history", None):
+        return None
+    return OccupancyHistory(svc), svc.snapshot()
+
+
+def _save_history(directory: str, recorded: OccupancyHistory, before: LotSnapshot) -> None:
+    """Append recorded events to the on-disk history (call with the lot's lock held)."""
+    recorded.close()
+    events = list(recorded.events(float("-inf"), float("inf")))
+    if not events:
+        return
+    disk = OccupancyHistory(ParkingService.from_dict(before.to_dict()), directory)
+    for e in events:
+        disk.record(e["event"], e["fuel"], e["slot_ui"] - 1, e["regnum"], e["ts"])
+    disk.close()
+
+
+def _billing_from_args(args: argparse.Namespace, svc: ParkingService) -> SessionLog | None:
+    """Price leaves with --tariff FILE and collect closed sessions for --sessions FILE."""
+    if getattr(args, "tariff", None):
+        try:
+            svc.tariff = Tariff.load_json(args.tariff)
+        except (OSError, ValueError, TypeError) as e:
+            die(f"Bad tariff file {args.tariff}: {e}")
+    if not getattr(args, "sessions", None):
+        return None
+    return SessionLog(svc)
+
+
+def _timestamp(text: str) -> float:
+    """ISO date/time (local time unless an offset is given) -> POSIX seconds."""
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError as e:
+        print(f"Bad timestamp (expected ISO format, e.g. 2024-05-01T09:30): {text}", file=sys.stderr)
+        raise SystemExit(2) from e
+
+
 def cmd_create(args: argparse.Namespace) -> None:
-    svc = ParkingService(capacity=args.capacity, ev_capacity=args.ev_capacity, level=args.level)
+    svc = ParkingService(
+        capacity=args.capacity,
+        ev_capacity=args.ev_capacity,
+        level=args.level,
+        bays_per_kind=LARGE_VEHICLE_BAYS if args.multi_bay else None,
+    )
+    if args.layout:
+        try:
+            layout = Layout.from_dict(json.loads(Path(args.layout).read_text(encoding="utf-8")))
+            svc.set_layout(layout)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            die(f"Bad layout file {args.layout}: {e}")
     print(f"Created lot: capacity={svc.capacity} ev_capacity={svc.ev_capacity} level={svc.level}")
     if args.save:
         svc.save_json(args.save)
         print(f"Saved lot to {args.save}")
+    if args.db:
+        with SqliteStore(args.db) as store:
+            store.save(svc)
+        print(f"Saved lot to {args.db}")
 
 
 def cmd_status(args: argparse.Namespace) -> None:
+    fuel: Fuel = "EV" if args.ev else "ICE"
+    if args.sort or args.limit is not None or args.after:
+        source = _open_db(args) if args.db else _service_from_args(args)
+        page = source.status_page(fuel, args.sort or "slot", args.after, args.limit or 50)
+        print("EV Slots" if args.ev else "ICE Slots")
+        for r in page["rows"]:
+            print(f"{r['slot_ui']}\tL{r['level']}\t{r['regnum']}\t{r['color']}\t{r['make']}\t{r['model']}")
+        if page["next"] is not None:
+            print(f"next: --after '{page['next']}'")
+        return
+    if args.db:  # answered in SQL, no service is built
+        store = _open_db(args)
+        print("EV Slots" if args.ev else "ICE Slots")
+        for r in store.status_rows("EV" if args.ev else "ICE"):
+            print(f"{r['slot_ui']}\tL{r['level']}\t{r['regnum']}\t{r['color']}\t{r['make']}\t{r['model']}")
+        return
     svc = _service_from_args(args)
     if args.ev:
         print("EV Slots")
@@ -55,8 +175,97 @@ def cmd_status(args: argparse.Namespace) -> None:
             print(f"{r['slot_ui']}\tL{r['level']}\t{r['regnum']}\t{r['color']}\t{r['make']}\t{r['model']}")
 
 
-def cmd_park(args: argparse.Namespace) -> None:
+def cmd_summary(args: argparse.Namespace) -> None:
+    svc = _service_from_args(args)
+    print(json.dumps(svc.summary(histograms=not args.counts_only), indent=2))
+
+
+def cmd_query(args: argparse.Namespace) -> None:
+    svc = _service_from_args(args)
+    rows = svc.query(
+        fuel=args.fuel,
+        kind=args.kind,
+        make=args.make,
+        color=args.color,
+        model=args.model,
+        regnum_prefix=args.reg_prefix,
+    )
+    for r in rows:
+        print(
+            f"{r['slot_ui']}\t{r['fuel']}\tL{r['level']}\t{r['regnum']}\t{r['color']}"
+            f"\t{r['make']}\t{r['model']}\t{r['kind']}"
+        )
+
+
+def cmd_ev_charge(args: argparse.Namespace) -> None:
     svc = _service_from_args(args)
+    if args.lowest is not None:
+        rows = svc.lowest_charge(args.lowest)
+    elif args.min is not None or args.max is not None:
+        lo = 0 if args.min is None else args.min
+        hi = 100 if args.max is None else args.max
+        rows = svc.charge_between(lo, hi)
+    else:
+        rows = svc.ev_charge_rows()
+    for r in rows:
+        print(f"{r['slot_ui']}\tL{r['level']}\t{r['regnum']}\t{r['charge']}%")
+
+
+def _same_file(a: str | None, b: str | None) -> bool:
+    return bool(a and b) and Path(a).resolve() == Path(b).resolve()  # type: ignore[arg-type]
+
+
+def _mutate(args: argparse.Namespace, op: Callable[[ParkingService], T]) -> T:
+    """
+    Run a park/leave style operation. With --db it runs inside one SQLite
+    write transaction (SqliteStore.update). With --load F --save F (the same
+    file) the change is committed with compare-and-swap (lot_file.update_lot)
+    and re-applied if another process saved the lot in between; otherwise
+    load, apply, then save if asked. History events (--history) and closed
+    sessions (--sessions) are written only for the attempt that commits,
+    under the lot's lock, so concurrent writers can't drop each other's rows.
+    """
+    hist: list[tuple[OccupancyHistory, LotSnapshot]] = []
+    logs: list[SessionLog] = []
+    out: T
+
+    def run(svc: ParkingService) -> T:
+        h = _history_from_args(args, svc)
+        hist[:] = [h] if h is not None else []  # keep only the attempt that commits
+        log = _billing_from_args(args, svc)
+        logs[:] = [log] if log is not None else []
+        return op(svc)
+
+    def commit(_: ParkingService | None = None) -> None:
+        for recorded, before in hist:
+            _save_history(args.history, recorded, before)
+        for log in logs:
+            log.save_jsonl(args.sessions)
+        hist.clear()
+        logs.clear()
+
+    if getattr(args, "db", None):
+        def run_db(svc: ParkingService) -> T:
+            result = run(svc)
+            if args.save:
+                svc.save_json(args.save)
+            return result
+
+        out = _open_db(args).update(run_db)
+    elif _same_file(args.load, args.save):
+        if not Path(args.load).exists():
+            die(f"File not found: {args.load}")
+        out = update_lot(args.load, run, on_commit=commit)
+    else:
+        svc = _service_from_args(args)
+        out = run(svc)
+        if args.save:
+            svc.save_json(args.save)
+    commit()  # no-op after update_lot; unlocked writes for the other paths
+    return out
+
+
+def cmd_park(args: argparse.Namespace) -> None:
     spec = VehicleSpec(
         regnum=args.reg.strip().upper(),
         make=args.make.strip(),
@@ -65,18 +274,156 @@ def cmd_park(args: argparse.Namespace) -> None:
         fuel="EV" if args.ev else "ICE",
         kind=args.kind,
     )
-    res = svc.park(spec)
-    if args.save:
-        svc.save_json(args.save)
-    print(json.dumps(res))
+
+    def park(svc: ParkingService) -> ParkResult:
+        try:
+            return svc.park(spec, entrance=args.entrance)
+        except ValueError as e:
+            die(str(e))
+            raise
+
+    print(json.dumps(_mutate(args, park)))
 
 
 def cmd_leave(args: argparse.Namespace) -> None:
+    fuel: Fuel = "EV" if args.ev else "ICE"
+    if args.reg:
+        reg = args.reg.strip().upper()
+        print(json.dumps(_mutate(args, lambda svc: svc.leave_by_reg(reg))))
+        return
+    if args.slot_ui is None:
+        die("leave needs --slot-ui N or --reg PLATE")
+    print(json.dumps(_mutate(args, lambda svc: svc.leave(args.slot_ui, fuel=fuel))))
+
+
+def cmd_ingest(args: argparse.Namespace) -> None:
+    options = {"queue_size": args.queue, "batch_size": args.batch, "dedupe_window_s": args.window}
+    if args.events:
+        stats = _mutate(args, lambda svc: asyncio.run(ingest_jsonl(svc, args.events, **options)))
+        print(json.dumps(stats.report()))
+        return
+    # A lot other commands may change meanwhile (--db, or --load F --save F):
+    # commit every batch on its own instead of saving a stale copy at the end
+    shared = bool(getattr(args, "db", None)) or _same_file(args.load, args.save)
     svc = _service_from_args(args)
-    out = svc.leave(args.slot_ui, fuel=("EV" if args.ev else "ICE"))
-    if args.save:
+    log = None if shared else _billing_from_args(args, svc)
+    ingestor = Ingestor(svc, **options, commit=(lambda op: _mutate(args, op)) if shared else None)
+
+    async def listen() -> None:
+        server = await serve(ingestor, args.host, args.port)
+        print(f"Listening on {args.host}:{server.sockets[0].getsockname()[1]} (Ctrl-C to stop)")
+        consumer = asyncio.create_task(ingestor.run())
+        try:
+            await server.serve_forever()
+        finally:  # Ctrl-C: stop accepting, then apply what is already queued
+            server.close()
+            await ingestor.stop()
+            await consumer
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(listen())
+    if args.save and not shared:
         svc.save_json(args.save)
-    print(json.dumps(out))
+    if log is not None:
+        log.save_jsonl(args.sessions)
+    print(json.dumps({**ingestor.stats.report(), "unapplied": ingestor.pending}))
+
+
+def cmd_invoice(args: argparse.Namespace) -> None:
+    if not Path(args.sessions).exists():
+        die(f"File not found: {args.sessions}")
+    tariff = Tariff()
+    if args.tariff:
+        try:
+            tariff = Tariff.load_json(args.tariff)
+        except (OSError, ValueError, TypeError) as e:
+            die(f"Bad tariff file {args.tariff}: {e}")
+    log = SessionLog.load_jsonl(args.sessions)
+    print(json.dumps(tariff.invoice(log), indent=2))
+
+
+def _limits(items: list[str]) -> dict[str, float]:
+    """--limit KEY=HOURS values (KEY: a kind, ICE, EV or *) -> seconds per key."""
+    limits: dict[str, float] = {}
+    for item in items:
+        key, _, hours = item.partition("=")
+        try:
+            limits[key.strip().upper()] = float(hours) * 3600
+        except ValueError:
+            die(f"Bad --limit {item!r} (expected KEY=HOURS, e.g. BUS=12 or '*=4')")
+    return limits
+
+
+def cmd_overstays(args: argparse.Namespace) -> None:
+    svc = _service_from_args(args)
+    limits = _limits(args.limit)
+    if not limits:
+        die("Pass at least one --limit KEY=HOURS")
+    now = _timestamp(args.at) if args.at else svc.clock()
+    try:
+        monitor = OverstayMonitor(svc, limits, start=now)
+    except ValueError as e:
+        die(str(e))
+        raise
+    rows = monitor.overstays(now)
+    for r in rows:
+        entered = datetime.fromtimestamp(r["entered"]).isoformat(timespec="minutes")
+        over_min = int((now - r["deadline"]) // 60)
+        print(f"{r['fuel']}\t{r['slot_ui']}\t{r['regnum']}\t{r['kind']}\tin {entered}\tover {over_min // 60}h{over_min % 60:02d}m")
+    if not rows:
+        print("No overstays")
+
+
+def cmd_history(args: argparse.Namespace) -> None:
+    if not Path(args.dir, "index.json").exists():
+        die(f"No history found in {args.dir}")
+    # the history only needs a service to follow; queries read the chunk files
+    hist = OccupancyHistory(ParkingService(capacity=1, ev_capacity=0), args.dir)
+    if args.hourly:
+        if not (args.start and args.end):
+            die("--hourly needs --from and --to")
+        start, end = _timestamp(args.start), _timestamp(args.end)
+        for r in hist.hourly(start, end):
+            hour = datetime.fromtimestamp(r["hour"]).isoformat(timespec="minutes")
+            print(f"{hour}\tICE {r['ice_peak']}\tEV {r['ev_peak']}\tin {r['parks']}\tout {r['leaves']}")
+        return
+    if not args.at:
+        die("Pass --at TIME or --hourly --from TIME --to TIME")
+    ts = _timestamp(args.at)
+    if args.slot is not None:
+        print(hist.occupant_at("EV" if args.ev else "ICE", args.slot, ts) or "-")
+        return
+    for (fuel, slot_ui), regnum in sorted(hist.snapshot_at(ts).items()):
+        print(f"{fuel}\t{slot_ui}\t{regnum}")
+
+
+def cmd_fleet_find(args: argparse.Namespace) -> None:
+    fleet = Fleet(args.dir)
+    for m in fleet.find_reg(args.reg.strip().upper(), workers=args.workers):
+        print(f"{m['lot_id']}\t{m['fuel']}\t{m['slot_ui']}")
+
+
+def cmd_soak(args: argparse.Namespace) -> None:
+    result = run_soak(
+        cycles=args.cycles,
+        capacity=args.capacity,
+        ev_capacity=args.ev_capacity,
+        sample_every=args.sample_every,
+        reload_every=args.reload_every,
+        max_alloc_slope=args.max_alloc_slope,
+        max_rss_slope=args.max_rss_slope,
+        seed=args.seed,
+    )
+    print(json.dumps({
+        "cycles": result.cycles,
+        "alloc_slope_bytes_per_kcycle": round(result.alloc_slope, 1),
+        "rss_slope_bytes_per_kcycle": None if result.rss_slope is None else round(result.rss_slope, 1),
+        "memory": result.report,
+        "growth": result.growth,
+        "failures": result.failures,
+    }, indent=2))
+    if not result.ok:
+        die("Soak failed: " + "; ".join(result.failures), code=1)
 
 
 def cmd_save(args: argparse.Namespace) -> None:
@@ -99,6 +446,22 @@ def cmd_export_csv(args: argparse.Namespace) -> None:
     print(f"Exported CSV to {args.path}")
 
 
+def cmd_export_npz(args: argparse.Namespace) -> None:
+    from columns import save_npz  # noqa: PLC0415 (numpy is optional)
+    svc = _service_from_args(args)
+    save_npz(svc, args.path)
+    print(f"Exported columns to {args.path}")
+
+
+def cmd_import_npz(args: argparse.Namespace) -> None:
+    from columns import load_npz  # noqa: PLC0415 (numpy is optional)
+    svc = load_npz(args.path)
+    print(f"Loaded lot: capacity={svc.capacity} ev_capacity={svc.ev_capacity} level={svc.level}")
+    if args.out:
+        svc.save_json(args.out)
+        print(f"Saved lot to {args.out}")
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="parking", description="Parking lot CLI")
     sub = p.add_subparsers(required=True, dest="cmd")
@@ -109,6 +472,11 @@ def build_parser() -> argparse.ArgumentParser:
     sp.add_argument("--ev-capacity", type=int, required=True)
     sp.add_argument("--level", type=int, required=True)
     sp.add_argument("--save", type=str, help="Save to JSON after creating")
+    sp.add_argument(
+        "--multi-bay", action="store_true", help="Buses and trucks take several adjacent ICE slots"
+    )
+    sp.add_argument("--layout", type=str, help="JSON with slot coordinates and entrances")
+    sp.add_argument("--db", type=str, help="Also store the lot in this SQLite file")
     sp.set_defaults(func=cmd_create)
 
     # status (ICE or EV)
@@ -118,8 +486,46 @@ def build_parser() -> argparse.ArgumentParser:
     sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
     sp.add_argument("--level", type=int, help="(alt) create level if not loading")
     sp.add_argument("--ev", action="store_true", help="Show EV slots instead of ICE")
+    sp.add_argument("--db", type=str, help="Read the lot from this SQLite file instead")
+    sp.add_argument("--sort", choices=list(SORT_KEYS), help="Page ordered by this field (then slot)")
+    sp.add_argument("--limit", type=int, help="Rows per page (default 50 when paging)")
+    sp.add_argument("--after", type=str, metavar="CURSOR", help="Continue from a previous page's cursor")
     sp.set_defaults(func=cmd_status)
 
+    # summary (occupancy counters + histograms, JSON for dashboards)
+    sp = sub.add_parser("summary", help="Print occupancy summary as JSON")
+    sp.add_argument("--load", type=str, help="Load lot JSON first")
+    sp.add_argument("--capacity", type=int, help="(alt) create capacity if not loading")
+    sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
+    sp.add_argument("--level", type=int, help="(alt) create level if not loading")
+    sp.add_argument("--counts-only", action="store_true", help="Omit per-attribute histograms")
+    sp.set_defaults(func=cmd_summary)
+
+    # query (compound filters over both pools)
+    sp = sub.add_parser("query", help="Find parked vehicles matching all given filters")
+    sp.add_argument("--load", type=str, help="Load lot JSON first")
+    sp.add_argument("--capacity", type=int, help="(alt) create capacity if not loading")
+    sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
+    sp.add_argument("--level", type=int, help="(alt) create level if not loading")
+    sp.add_argument("--fuel", choices=["ICE", "EV"], help="Restrict to one pool")
+    sp.add_argument("--kind", choices=["CAR", "MOTORCYCLE", "TRUCK", "BUS"])
+    sp.add_argument("--make", type=str)
+    sp.add_argument("--model", type=str)
+    sp.add_argument("--color", type=str)
+    sp.add_argument("--reg-prefix", dest="reg_prefix", type=str, help="Registration starts with")
+    sp.set_defaults(func=cmd_query)
+
+    # ev-charge (charge-ordered EV views)
+    sp = sub.add_parser("ev-charge", help="List EV charge levels (lowest first with filters)")
+    sp.add_argument("--load", type=str, help="Load lot JSON first")
+    sp.add_argument("--capacity", type=int, help="(alt) create capacity if not loading")
+    sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
+    sp.add_argument("--level", type=int, help="(alt) create level if not loading")
+    sp.add_argument("--lowest", type=int, metavar="K", help="Only the K least-charged EVs")
+    sp.add_argument("--min", type=int, metavar="PCT", help="Minimum charge percent")
+    sp.add_argument("--max", type=int, metavar="PCT", help="Maximum charge percent")
+    sp.set_defaults(func=cmd_ev_charge)
+
     # park
     sp = sub.add_parser("park", help="Park a vehicle")
     sp.add_argument("--load", type=str, help="Load lot JSON first")
@@ -132,6 +538,9 @@ def build_parser() -> argparse.ArgumentParser:
     sp.add_argument("--color", required=True, type=str)
     sp.add_argument("--ev", action="store_true", help="Fuel is EV (default ICE)")
     sp.add_argument("--kind", choices=["CAR", "MOTORCYCLE", "TRUCK", "BUS"], default="CAR")
+    sp.add_argument("--entrance", type=str, help="Pick the free slot nearest this entrance (needs a layout)")
+    sp.add_argument("--history", type=str, metavar="DIR", help="Append the event to this history")
+    sp.add_argument("--db", type=str, help="Use this SQLite lot (changes are written immediately)")
     sp.add_argument("--save", type=str, help="Save lot JSON after action")
     sp.set_defaults(func=cmd_park)
 
@@ -141,11 +550,82 @@ def build_parser() -> argparse.ArgumentParser:
     sp.add_argument("--capacity", type=int, help="(alt) create capacity if not loading")
     sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
     sp.add_argument("--level", type=int, help="(alt) create level if not loading")
-    sp.add_argument("--slot-ui", dest="slot_ui", type=int, required=True, help="UI slot number (1-based)")
+    sp.add_argument("--slot-ui", dest="slot_ui", type=int, help="UI slot number (1-based)")
+    sp.add_argument("--reg", type=str, help="Free the slot holding this registration instead")
     sp.add_argument("--ev", action="store_true", help="Operate on EV pool")
+    sp.add_argument("--history", type=str, metavar="DIR", help="Append the event to this history")
+    sp.add_argument("--tariff", type=str, metavar="FILE", help="Tariff JSON; adds the fee to the result")
+    sp.add_argument("--sessions", type=str, metavar="FILE", help="Append the closed session to this JSONL log")
+    sp.add_argument("--db", type=str, help="Use this SQLite lot (changes are written immediately)")
     sp.add_argument("--save", type=str, help="Save lot JSON after action")
     sp.set_defaults(func=cmd_leave)
 
+    # ingest (ANPR gate events -> park/leave)
+    sp = sub.add_parser("ingest", help="Apply ANPR gate events (JSONL file or local socket)")
+    sp.add_argument("--load", type=str, help="Load lot JSON first")
+    sp.add_argument("--capacity", type=int, help="(alt) create capacity if not loading")
+    sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
+    sp.add_argument("--level", type=int, help="(alt) create level if not loading")
+    src = sp.add_mutually_exclusive_group(required=True)
+    src.add_argument("--events", type=str, metavar="FILE", help="JSONL file of gate events")
+    src.add_argument("--port", type=int, help="Listen for JSONL events on this TCP port (0 = any)")
+    sp.add_argument("--host", type=str, default="127.0.0.1", help="Listen address for --port")
+    sp.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE, help="Queue bound before shedding")
+    sp.add_argument("--batch", type=int, default=DEFAULT_BATCH_SIZE, help="Max events per micro-batch")
+    sp.add_argument("--window", type=float, default=DEFAULT_DEDUPE_WINDOW_S, help="Double-read window (s)")
+    sp.add_argument("--sessions", type=str, metavar="FILE", help="Append closed sessions to this JSONL log")
+    sp.add_argument("--db", type=str, help="Use this SQLite lot (changes are written immediately)")
+    sp.add_argument("--save", type=str, help="Save lot JSON afterwards")
+    sp.set_defaults(func=cmd_ingest)
+
+    # invoice (price a session log in one vectorized pass, needs numpy)
+    sp = sub.add_parser("invoice", help="Price a JSONL session log and print totals")
+    sp.add_argument("--sessions", required=True, type=str, metavar="FILE", help="Session log (see leave --sessions)")
+    sp.add_argument("--tariff", type=str, metavar="FILE", help="Tariff JSON (default: built-in tariff)")
+    sp.set_defaults(func=cmd_invoice)
+
+    # overstays (vehicles parked longer than a per-kind / per-pool limit)
+    sp = sub.add_parser("overstays", help="List vehicles parked longer than the given limits")
+    sp.add_argument("--load", type=str, help="Load lot JSON first")
+    sp.add_argument("--db", type=str, help="Read the lot from this SQLite file instead")
+    sp.add_argument("--limit", action="append", default=[], metavar="KEY=HOURS",
+                    help="Max stay for a kind (BUS=12), a pool (EV=4) or everything ('*=24'); repeatable")
+    sp.add_argument("--at", type=str, help="ISO time to check at (default: now)")
+    sp.set_defaults(func=cmd_overstays)
+
+    # history (point-in-time and hourly rollups from an occupancy history dir)
+    sp = sub.add_parser("history", help="Query an occupancy history directory")
+    sp.add_argument("--dir", required=True, type=str, help="History directory (see park/leave --history)")
+    sp.add_argument("--at", type=str, help="ISO time for a snapshot (or one slot with --slot)")
+    sp.add_argument("--slot", type=int, help="1-based slot for --at")
+    sp.add_argument("--ev", action="store_true", help="--slot is an EV slot")
+    sp.add_argument("--hourly", action="store_true", help="Hourly peaks between --from and --to")
+    sp.add_argument("--from", dest="start", type=str)
+    sp.add_argument("--to", dest="end", type=str)
+    sp.set_defaults(func=cmd_history)
+
+    # fleet-find (registration search across a directory of lot files)
+    sp = sub.add_parser("fleet-find", help="Find a registration across all lots in a directory")
+    sp.add_argument("--dir", required=True, type=str, help="Directory of <lot_id>.json files")
+    sp.add_argument("--reg", required=True, type=str)
+    sp.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    sp.set_defaults(func=cmd_fleet_find)
+
+    # soak (long randomized run with memory-growth limits)
+    sp = sub.add_parser("soak", help="Randomized park/leave/save/load soak with memory checks")
+    sp.add_argument("--cycles", type=int, default=1_000_000)
+    sp.add_argument("--capacity", type=int, default=1000)
+    sp.add_argument("--ev-capacity", type=int, default=100)
+    sp.add_argument("--sample-every", type=int, default=10_000, help="Cycles between memory samples")
+    sp.add_argument("--reload-every", type=int, default=5_000, help="Cycles between save/load round trips")
+    sp.add_argument("--max-alloc-slope", type=float, default=DEFAULT_MAX_ALLOC_SLOPE,
+                    help="Fail above this tracemalloc growth (bytes per 1000 cycles); "
+                         "the default assumes at least 50 cycles per slot")
+    sp.add_argument("--max-rss-slope", type=float, default=DEFAULT_MAX_RSS_SLOPE,
+                    help="Fail above this RSS growth (bytes per 1000 cycles)")
+    sp.add_argument("--seed", type=int, default=0)
+    sp.set_defaults(func=cmd_soak)
+
     # save
     sp = sub.add_parser("save", help="Save current lot to JSON")
     sp.add_argument("--load", type=str, help="Load lot JSON first")
@@ -171,6 +651,20 @@ def build_parser() -> argparse.ArgumentParser:
     sp.add_argument("--ice-only", action="store_true", help="Export only ICE rows")
     sp.set_defaults(func=cmd_export_csv)
 
+    # export-npz / import-npz (typed columns for analytics, needs numpy)
+    sp = sub.add_parser("export-npz", help="Export the lot as NumPy columns (.npz)")
+    sp.add_argument("--load", type=str, help="Load lot JSON first")
+    sp.add_argument("--capacity", type=int, help="(alt) create capacity if not loading")
+    sp.add_argument("--ev-capacity", type=int, help="(alt) create ev capacity if not loading")
+    sp.add_argument("--level", type=int, help="(alt) create level if not loading")
+    sp.add_argument("path", type=str)
+    sp.set_defaults(func=cmd_export_npz)
+
+    sp = sub.add_parser("import-npz", help="Load a lot from an .npz export (and optionally save JSON)")
+    sp.add_argument("path", type=str)
+    sp.add_argument("--out", type=str, help="Write the lot to this JSON path")
+    sp.set_defaults(func=cmd_import_npz)
+
     return p
 
 
@@ -184,6 +678,10 @@ def main(argv: list[str] | None = None) -> int:
         raise
     except Exception as e:  # noqa: BLE001
         die(f"Error: {e}")
+    finally:
+        store = getattr(args, "store", None)
+        if store is not None:
+            store.close()
 
 
 if __name__ == "__main__":
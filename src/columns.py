@@ -0,0 +1,173 @@
+"""
+Columnar (NumPy) view of a lot for analytics.
+
+Requires NumPy (optional dependency:
+`pip install parking-lot-manager[analytics]`).
+
+to_columns() returns one array per attribute, one row per slot (ICE slots
+first, then EV). Strings with few distinct values (make, model, color) are
+dictionary-coded: an int32 code column plus a sorted vocabulary array, with
+-1 for empty slots. Fuel and kind are small integer codes into FUELS/KINDS.
+Whole-lot questions then become array expressions, e.g.
+    (cols["color"] == vocab_code(cols, "color", "Red")).sum()
+
+save_npz()/load_npz() store the same arrays in a .npz archive, so the lot
+round-trips with its types intact instead of going through CSV.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from parking_service import ParkingService
+
+if TYPE_CHECKING:
+    from parking_service import Fuel
+
+FUELS: tuple[Fuel, ...] = ("ICE", "EV")
+KINDS = ("CAR", "MOTORCYCLE", "BUS", "TRUCK")
+CODED = ("make", "model", "color")  # dictionary-coded string columns
+NO_CHARGE = -1  # charge column for ICE and empty slots
+
+Columns = dict[str, np.ndarray]
+
+
+def _code(values: list[str | None]) -> tuple[np.ndarray, np.ndarray]:
+    """Dictionary-code a column: (int32 codes with -1 for None, sorted vocabulary)."""
+    vocab = sorted({v for v in values if v is not None})
+    lookup = {v: i for i, v in enumerate(vocab)}
+    codes = np.fromiter((-1 if v is None else lookup[v] for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, np.array(vocab, dtype=np.str_)
+
+
+def to_columns(svc: ParkingService) -> Columns:
+    """
+    Arrays for every slot of the lot:
+    slot (1-based), level, fuel, kind, occupied, bays (run length at the
+    head slot, 0 elsewhere), charge, entered (POSIX seconds, NaN when vacant
+    or unknown), regnum, and make/model/color codes with their <name>_vocab
+    arrays. Bays held by a multi-bay vehicle count as
+    occupied but carry no vehicle attributes.
+    """
+    n_ice, n_ev = svc.capacity, svc.ev_capacity
+    n = n_ice + n_ev
+    fuel = np.zeros(n, dtype=np.uint8)
+    fuel[n_ice:] = FUELS.index("EV")
+    slot = np.concatenate([np.arange(1, n_ice + 1), np.arange(1, n_ev + 1)]).astype(np.int32)
+    kind = np.full(n, -1, dtype=np.int8)
+    occupied = np.zeros(n, dtype=bool)
+    bays = np.zeros(n, dtype=np.uint8)
+    charge = np.full(n, NO_CHARGE, dtype=np.int8)
+    entered = np.full(n, np.nan, dtype=np.float64)
+    regnum: list[str] = [""] * n
+    strings: dict[str, list[str | None]] = {name: [None] * n for name in CODED}
+
+    row = 0
+    for f in FUELS:
+        records = svc.records(f)
+        for head, run in svc.spans(f).items():
+            occupied[row + head + 1:row + head + run] = True
+        for i, rec in enumerate(records):
+            if rec is None:
+                continue
+            r = row + i
+            occupied[r] = True
+            kind[r] = KINDS.index(rec["kind"])
+            bays[r] = rec.get("bays", 1)
+            regnum[r] = rec["regnum"]
+            entered[r] = rec.get("entered", np.nan)
+            for name in CODED:
+                strings[name][r] = rec[name]
+            if f == "EV":
+                charge[r] = svc.vehicle_at(f, i).charge
+        row += len(records)
+
+    cols: Columns = {
+        "slot": slot,
+        "level": np.full(n, svc.level, dtype=np.int16),
+        "fuel": fuel,
+        "kind": kind,
+        "occupied": occupied,
+        "bays": bays,
+        "charge": charge,
+        "entered": entered,
+        "regnum": np.array(regnum, dtype=np.str_),
+    }
+    for name in CODED:
+        cols[name], cols[f"{name}_vocab"] = _code(strings[name])
+    return cols
+
+
+def vocab_code(cols: Columns, name: str, value: str) -> int:
+    """Code of value in a dictionary-coded column (-2 if absent, so it matches nothing)."""
+    vocab = cols[f"{name}_vocab"]
+    pos = int(np.searchsorted(vocab, value))
+    return pos if pos < len(vocab) and vocab[pos] == value else -2
+
+
+def from_columns(cols: Columns, config: dict[str, Any] | None = None) -> ParkingService:
+    """
+    Rebuild a lot from to_columns() output. config carries what the columns
+    don't (revision, bays_per_kind, layout, and level for a lot with no
+    slots), as written by save_npz().
+    """
+    ev = cols["fuel"] == FUELS.index("EV")
+    level = int(cols["level"][0]) if len(cols["level"]) else 1
+    data: dict[str, Any] = {
+        "level": level,
+        **(config or {}),
+        "capacity": int((~ev).sum()),
+        "ev_capacity": int(ev.sum()),
+    }
+    pools: dict[str, list[dict[str, Any] | None]] = {
+        "slots": [None] * data["capacity"],
+        "evSlots": [None] * data["ev_capacity"],
+    }
+    vocab = {name: cols[f"{name}_vocab"] for name in CODED}
+    for r in np.flatnonzero(cols["bays"] > 0):
+        f = FUELS[int(cols["fuel"][r])]
+        rec: dict[str, Any] = {
+            "regnum": str(cols["regnum"][r]),
+            "fuel": f,
+            "kind": KINDS[int(cols["kind"][r])],
+        }
+        for name in CODED:
+            rec[name] = str(vocab[name][cols[name][r]])
+        if int(cols["bays"][r]) > 1:
+            rec["bays"] = int(cols["bays"][r])
+        if f == "EV":
+            rec["charge"] = int(cols["charge"][r])
+        if "entered" in cols and not np.isnan(cols["entered"][r]):  # absent in older exports
+            rec["entered"] = float(cols["entered"][r])
+        pools["evSlots" if f == "EV" else "slots"][int(cols["slot"][r]) - 1] = rec
+    data.update(pools)
+    return ParkingService.from_dict(data)
+
+
+def save_npz(svc: ParkingService, path: str | os.PathLike[str]) -> None:
+    """Write the lot's columns (plus its config as JSON) to a compressed .npz file."""
+    config: dict[str, Any] = {"revision": svc.revision, "level": svc.level}
+    if svc.bays_per_kind:
+        config["bays_per_kind"] = dict(svc.bays_per_kind)
+    if svc.layout is not None:
+        config["layout"] = svc.layout.to_dict()
+    arrays: dict[str, Any] = {"config": np.array(json.dumps(config)), **to_columns(svc)}
+    np.savez_compressed(path, **arrays)
+
+
+def load_columns(path: str | os.PathLike[str]) -> tuple[Columns, dict[str, Any]]:
+    """(columns, config) from a save_npz() file, without building a service."""
+    with np.load(path, allow_pickle=False) as npz:
+        cols = {k: npz[k] for k in npz.files if k != "config"}
+        config = json.loads(str(npz["config"])) if "config" in npz.files else {}
+    return cols, config
+
+
+def load_npz(path: str | os.PathLike[str]) -> ParkingService:
+    """Read a lot written by save_npz()."""
+    cols, config = load_columns(path)
+    return from_columns(cols, config)
@@ -0,0 +1,303 @@
+"""
+Many lots, one JSON file each, addressed by lot_id.
+
+Fleet keeps recently used ParkingService instances in an LRU cache bounded
+by a lot count and a memory budget. A lot's size is estimated when it is
+loaded and again after it changes. Lots are marked dirty by their
+park/leave/charge events and written back when evicted or on flush().
+
+Write-back goes through lot_file, so other processes may share the files.
+The slots a lot's events touched are replayed onto a fresh load with
+update_lot(); a slot that someone else changed in the meantime raises
+ConflictError. Lots that are new or were flagged with mark_dirty() (changes
+without events) are written whole with replace_lot(), which fails if the file
+moved on since it was loaded.
+Fleet-wide registration search answers cached lots from memory and fans the
+rest out over a process pool. Workers scan the raw JSON records instead of
+rebuilding services.
+"""
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, TypedDict
+
+from lot_file import ConflictError, replace_lot, update_lot
+from parking_service import Fuel, ParkingService, VehicleSpec
+from vehicle_codec import codec_for
+
+DEFAULT_MAX_LOTS = 64
+# Rough per-object costs used by estimate_bytes() (CPython, 64-bit)
+SLOT_BYTES = 120
+VEHICLE_BYTES = 900
+FILES_PER_TASK = 16  # lot files handed to one worker task
+
+
+class FleetMatch(TypedDict):
+    lot_id: str
+    fuel: Fuel
+    slot_ui: int
+
+
+def estimate_bytes(svc: ParkingService) -> int:
+    """Approximate resident size of a loaded lot (slots plus parked vehicles)."""
+    slots = len(svc.slots) + len(svc.evSlots)
+    occupied = sum(1 for s in svc.slots if s.vehicle is not None)
+    occupied += sum(1 for s in svc.evSlots if s.vehicle is not None)
+    return slots * SLOT_BYTES + occupied * VEHICLE_BYTES
+
+
+def _scan_files(paths: list[str], regnum: str) -> list[FleetMatch]:
+    """Worker: find regnum in lot files without constructing services."""
+    out: list[FleetMatch] = []
+    pools: tuple[tuple[Fuel, str], ...] = (("ICE", "slots"), ("EV", "evSlots"))
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        lot_id = Path(path).stem
+        for fuel, key in pools:
+            for i, rec in enumerate(data.get(key, [])):
+                if rec and rec.get("regnum") == regnum:
+                    out.append({"lot_id": lot_id, "fuel": fuel, "slot_ui": i + 1})
+    return out
+
+
+class _Entry:
+    __slots__ = ("base", "size", "stale", "svc", "touched", "unsubscribe", "whole")
+
+    def __init__(self, svc: ParkingService, size: int, loaded: bool) -> None:
+        self.svc = svc
+        self.size = size
+        self.stale = False  # size needs re-estimating
+        self.base: int | None = svc.revision if loaded else None  # None: not on disk yet
+        self.whole = not loaded  # has changes that events don't describe
+        # (fuel, idx) -> regnum in the slot before the first event since write-back
+        self.touched: dict[tuple[Fuel, int], str | None] = {}
+        self.unsubscribe: Callable[[], None] = lambda: None
+
+    @property
+    def dirty(self) -> bool:
+        return self.whole or bool(self.touched)
+
+    def on_change(self, event: str, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        self.stale = True
+        self.touched.setdefault((fuel, idx), None if event == "park" else str(vehicle.regnum))
+
+    def replay(self, disk: ParkingService, lot_id: str) -> None:
+        """Copy the touched slots onto disk, a fresh load of the same lot."""
+        for (fuel, idx), was in self.touched.items():
+            if fuel == "EV":
+                pool, theirs = self.svc.evSlots, disk.evSlots
+            else:
+                pool, theirs = self.svc.slots, disk.slots
+            if idx >= len(theirs):
+                raise ConflictError(f"lot {lot_id!r} was resized on disk since it was loaded")
+            ours, other = pool[idx].vehicle, theirs[idx].vehicle
+            if (None if other is None else str(other.regnum)) != was:
+                raise ConflictError(
+                    f"{fuel} slot {idx + 1} of lot {lot_id!r} changed on disk since it was loaded"
+                )
+            if other is not None and (ours is None or str(ours.regnum) != was):
+                disk.leave(idx + 1, fuel)
+            if ours is None:
+                continue
+            if theirs[idx].is_vacant:
+                spec = VehicleSpec(
+                    str(ours.regnum), ours.make, ours.model, ours.color, fuel, codec_for(ours).kind
+                )
+                if not disk.park_at(spec, idx + 1, at=pool[idx].entered_at)["ok"]:
+                    raise ConflictError(f"{fuel} slot {idx + 1} of lot {lot_id!r} is taken on disk")
+            if fuel == "EV" and disk.evSlots[idx].vehicle.charge != ours.charge:
+                disk.set_charge(idx + 1, int(ours.charge))
+
+
+class Fleet:
+    """LRU cache of ParkingService instances over a directory of <lot_id>.json files."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        max_lots: int = DEFAULT_MAX_LOTS,
+        memory_budget: int | None = None,
+        sizer: Callable[[ParkingService], int] = estimate_bytes,
+    ) -> None:
+        if max_lots < 1:
+            raise ValueError("max_lots must be >= 1")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_lots = max_lots
+        self.memory_budget = memory_budget
+        self._sizer = sizer
+        self._lots: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+
+    # ---------- addressing ----------
+    def path(self, lot_id: str) -> Path:
+        if not lot_id or "/" in lot_id or "\\" in lot_id or lot_id.startswith("."):
+            raise ValueError(f"invalid lot_id {lot_id!r}")
+        return self.directory / f"{lot_id}.json"
+
+    def lot_ids(self) -> list[str]:
+        """All lots on disk or in memory, sorted."""
+        return sorted({p.stem for p in self.directory.glob("*.json")} | set(self._lots))
+
+    def cached(self) -> list[str]:
+        """Loaded lot ids, least recently used first."""
+        return list(self._lots)
+
+    @property
+    def cached_bytes(self) -> int:
+        self._resize()
+        return self._bytes
+
+    # ---------- access ----------
+    def get(self, lot_id: str) -> ParkingService:
+        """
+        The lot's service, loading it from disk if needed. Mutations through it
+        are saved on eviction or flush().
+        Raises:
+            KeyError: if the lot doesn't exist.
+        """
+        entry = self._lots.get(lot_id)
+        if entry is not None:
+            self._lots.move_to_end(lot_id)
+            return entry.svc
+        p = self.path(lot_id)
+        if not p.exists():
+            raise KeyError(lot_id)
+        return self._admit(lot_id, ParkingService.load_json(str(p)), loaded=True)
+
+    def create(self, lot_id: str, capacity: int, ev_capacity: int, level: int = 1) -> ParkingService:
+        """
+        Add a new lot (written on the next flush/eviction).
+        Raises:
+            ValueError: if the lot already exists.
+        """
+        if lot_id in self._lots or self.path(lot_id).exists():
+            raise ValueError(f"lot {lot_id!r} already exists")
+        return self._admit(lot_id, ParkingService(capacity, ev_capacity, level), loaded=False)
+
+    def mark_dirty(self, lot_id: str) -> None:
+        """
+        Flag a cached lot for write-back (for changes that emit no event).
+        The whole lot is written, so it conflicts with any other writer.
+        """
+        entry = self._lots[lot_id]
+        entry.whole = entry.stale = True
+
+    def _admit(self, lot_id: str, svc: ParkingService, loaded: bool) -> ParkingService:
+        entry = _Entry(svc, self._sizer(svc), loaded)
+        entry.unsubscribe = svc.subscribe(entry.on_change)
+        self._lots[lot_id] = entry
+        self._bytes += entry.size
+        self._evict(keep=lot_id)
+        return svc
+
+    def _resize(self) -> None:
+        """Re-estimate the lots that changed since they were last sized."""
+        for entry in self._lots.values():
+            if entry.stale:
+                size = self._sizer(entry.svc)
+                self._bytes += size - entry.size
+                entry.size, entry.stale = size, False
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used lots until both limits hold (never `keep`)."""
+        def over() -> bool:
+            if len(self._lots) > self.max_lots:
+                return True
+            return self.memory_budget is not None and self._bytes > self.memory_budget
+
+        self._resize()
+        while over() and len(self._lots) > 1:
+            lot_id = next(iter(self._lots))
+            if lot_id == keep:
+                self._lots.move_to_end(keep)
+                continue
+            self.evict(lot_id)
+
+    def evict(self, lot_id: str) -> None:
+        """
+        Write back (if dirty) and drop one cached lot.
+        Raises:
+            ConflictError: if the write-back lost to another writer (the lot stays cached).
+        """
+        entry = self._lots.get(lot_id)
+        if entry is None:
+            return
+        if entry.dirty:
+            self._write_back(lot_id, entry)
+        del self._lots[lot_id]
+        self._bytes -= entry.size
+        entry.unsubscribe()
+
+    def flush(self) -> int:
+        """
+        Write every dirty cached lot. Returns how many were written.
+        Raises:
+            ConflictError: if a write-back lost to another writer.
+        """
+        written = 0
+        for lot_id, entry in self._lots.items():
+            if entry.dirty:
+                self._write_back(lot_id, entry)
+                written += 1
+        return written
+
+    def _write_back(self, lot_id: str, entry: _Entry) -> None:
+        path = self.path(lot_id)
+        if entry.whole:
+            replace_lot(path, entry.svc, entry.base)
+            entry.base = entry.svc.revision
+        else:
+            seen: list[ParkingService] = []
+
+            def replay(disk: ParkingService) -> None:
+                seen[:] = [disk] if disk.revision == entry.base else []
+                entry.replay(disk, lot_id)
+
+            update_lot(path, replay)
+            if seen:  # nobody else wrote in between: the cached lot is the file
+                entry.base = entry.svc.revision = seen[0].revision
+        entry.whole = False
+        entry.touched.clear()
+
+    def close(self) -> None:
+        """Write back and drop everything."""
+        for lot_id in list(self._lots):
+            self.evict(lot_id)
+
+    # ---------- fleet-wide ----------
+    def find_reg(self, regnum: str, workers: int | None = None) -> list[FleetMatch]:
+        """
+        Every slot across all lots holding regnum, sorted by lot then slot.
+        Cached lots answer from their in-memory index; the others are scanned
+        by a process pool (workers=1 scans in-process).
+        """
+        regnum = regnum.strip()
+        if not regnum:
+            return []
+        found: list[FleetMatch] = [
+            {"lot_id": lot_id, "fuel": fuel, "slot_ui": slot_ui}
+            for lot_id, entry in self._lots.items()
+            for fuel, slot_ui in entry.svc.reg_slots(regnum)
+        ]
+        paths = [str(self.path(i)) for i in self.lot_ids() if i not in self._lots]
+        batches = [paths[i:i + FILES_PER_TASK] for i in range(0, len(paths), FILES_PER_TASK)]
+        for batch_matches in self._map(batches, regnum, workers):
+            found.extend(batch_matches)
+        found.sort(key=lambda m: (m["lot_id"], m["fuel"] != "ICE", m["slot_ui"]))
+        return found
+
+    @staticmethod
+    def _map(batches: list[list[str]], regnum: str, workers: int | None) -> Iterable[list[FleetMatch]]:
+        if not batches:
+            return []
+        if workers == 1 or len(batches) == 1:
+            return [_scan_files(b, regnum) for b in batches]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_scan_files, batches, [regnum] * len(batches)))
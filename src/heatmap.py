@@ -0,0 +1,90 @@
+"""
+Occupancy heatmap model for the Tk UI (the widget is heatmap_tk.LotHeatmap).
+
+HeatmapModel maps every slot (ICE first, then EV) to a cell colour and, by
+subscribing to the service, collects the cells that changed since the last
+flush. A multi-bay vehicle repaints its whole run. It does not import
+tkinter, so it works on headless installs.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from vehicle_codec import codec_for
+
+if TYPE_CHECKING:
+    from parking_service import Fuel, ParkingService, SlotEvent
+
+VACANT = "gray85"
+KIND_COLORS = {"CAR": "RoyalBlue", "MOTORCYCLE": "DarkTurquoise", "BUS": "MediumOrchid", "TRUCK": "sienna"}
+# EV cells by charge percent: (upper bound exclusive, colour); the last band covers 100
+CHARGE_BANDS = ((20, "#d73027"), (40, "#fc8d59"), (60, "#fee08b"), (80, "#91cf60"), (101, "#1a9850"))
+LEGEND = "grey free | blue car | turquoise motorcycle | purple bus | brown truck | EV: red (low) -> green (full)"
+
+
+def charge_color(charge: int) -> str:
+    for bound, color in CHARGE_BANDS:
+        if charge < bound:
+            return color
+    return CHARGE_BANDS[-1][1]
+
+
+def vehicle_color(vehicle: Any, fuel: Fuel) -> str:
+    if fuel == "EV":
+        return charge_color(int(vehicle.charge))
+    return KIND_COLORS.get(codec_for(vehicle).kind, KIND_COLORS["CAR"])
+
+
+class HeatmapModel:
+    """Cell colours of one lot plus the cells changed since take_dirty()."""
+
+    def __init__(self, svc: ParkingService, on_dirty: Callable[[], None] | None = None) -> None:
+        self._svc = svc
+        self._offset: dict[str, int] = {"ICE": 0, "EV": svc.capacity}
+        self.size = svc.capacity + svc.ev_capacity
+        self._on_dirty = on_dirty
+        self._dirty: set[int] = set()
+        # run length of each multi-bay head, remembered so leave can repaint the run
+        self._spans: dict[tuple[str, int], int] = {}
+        for fuel in ("ICE", "EV"):
+            for idx, bays in svc.spans(fuel).items():
+                self._spans[(fuel, idx)] = bays
+        self._unsubscribe = svc.subscribe(self._on_event)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def cell(self, fuel: Fuel, idx: int) -> int:
+        return self._offset[fuel] + idx
+
+    def color(self, cell: int) -> str:
+        fuel: Fuel = "EV" if cell >= self._offset["EV"] else "ICE"
+        idx = cell - self._offset[fuel]
+        # trailing bays of a run take their vehicle's colour
+        vehicle = self._svc.vehicle_at(fuel, self._svc.run_head(fuel, idx))
+        return VACANT if vehicle is None else vehicle_color(vehicle, fuel)
+
+    def colors(self) -> list[str]:
+        return [self.color(c) for c in range(self.size)]
+
+    def take_dirty(self) -> list[tuple[int, str]]:
+        """(cell, colour) for every cell changed since the last call, in cell order."""
+        cells = sorted(self._dirty)
+        self._dirty.clear()
+        return [(c, self.color(c)) for c in cells]
+
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        if event == "park":
+            bays = self._svc.bays_at(idx + 1, fuel)
+            if bays > 1:
+                self._spans[(fuel, idx)] = bays
+        elif event == "leave":
+            bays = self._spans.pop((fuel, idx), 1)
+        else:
+            bays = 1
+        start = self.cell(fuel, idx)
+        was_clean = not self._dirty
+        self._dirty.update(range(start, start + bays))
+        if was_clean and self._on_dirty is not None:
+            self._on_dirty()
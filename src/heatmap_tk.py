@@ -0,0 +1,79 @@
+"""
+Tk canvas for heatmap.HeatmapModel.
+
+LotHeatmap draws one canvas rectangle per slot, created once per lot.
+After a park, leave or charge it recolours only the dirty cells. Repaints
+are coalesced with after_idle, so a burst of changes costs one pass.
+"""
+from __future__ import annotations
+
+import math
+import tkinter as tk
+from typing import TYPE_CHECKING
+
+from heatmap import LEGEND, VACANT, HeatmapModel
+
+if TYPE_CHECKING:
+    from parking_service import ParkingService
+
+
+class LotHeatmap(tk.Frame):
+    """Scrollable canvas grid of slots, coloured by occupancy, kind and EV charge."""
+
+    def __init__(self, parent: tk.Misc, columns: int = 40, cell_px: int = 9, height: int = 560) -> None:
+        super().__init__(parent)
+        self.columns = columns
+        self.cell_px = cell_px
+        width = columns * cell_px + 2
+        self.canvas = tk.Canvas(self, width=width, height=height, bg="white", highlightthickness=0)
+        scroll = tk.Scrollbar(self, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=scroll.set)
+        self.canvas.grid(row=0, column=0, sticky="ns")
+        scroll.grid(row=0, column=1, sticky="ns")
+        tk.Label(self, text=LEGEND, font="Arial 8", wraplength=width, justify="left").grid(
+            row=1, column=0, columnspan=2, sticky="w"
+        )
+        self._items: list[int] = []
+        self._split = -1  # ICE capacity the current items were laid out for
+        self._model: HeatmapModel | None = None
+        self._pending = False
+
+    def show(self, svc: ParkingService) -> None:
+        """Draw a lot, replacing the previous one (items are reused when the size matches)."""
+        if self._model is not None:
+            self._model.close()
+        self._model = HeatmapModel(svc, on_dirty=self._schedule)
+        if len(self._items) != self._model.size or self._split != svc.capacity:
+            self._create_items(svc.capacity, svc.ev_capacity)
+        itemconfigure = self.canvas.itemconfigure
+        for item, color in zip(self._items, self._model.colors(), strict=True):
+            itemconfigure(item, fill=color)
+
+    def _create_items(self, capacity: int, ev_capacity: int) -> None:
+        """One rectangle per slot: ICE rows, a gap row, then EV rows."""
+        self.canvas.delete("all")
+        self._split = capacity
+        px, cols = self.cell_px, self.columns
+        items: list[int] = []
+        ev_row0 = math.ceil(capacity / cols) + 1 if capacity else 0
+        for pool_size, row0 in ((capacity, 0), (ev_capacity, ev_row0)):
+            for i in range(pool_size):
+                x = (i % cols) * px + 1
+                y = (row0 + i // cols) * px + 1
+                items.append(self.canvas.create_rectangle(x, y, x + px - 1, y + px - 1, width=0, fill=VACANT))
+        self._items = items
+        rows = ev_row0 + math.ceil(ev_capacity / cols)
+        self.canvas.configure(scrollregion=(0, 0, cols * px + 2, rows * px + 2))
+
+    def _schedule(self) -> None:
+        if not self._pending:
+            self._pending = True
+            self.after_idle(self._flush)
+
+    def _flush(self) -> None:
+        self._pending = False
+        if self._model is None:
+            return
+        itemconfigure, items = self.canvas.itemconfigure, self._items
+        for cell, color in self._model.take_dirty():
+            itemconfigure(items[cell], fill=color)
@@ -0,0 +1,341 @@
+"""
+Append-only occupancy history for a ParkingService.
+
+Every park/leave becomes a row (timestamp, pool, slot, regnum, event) in a
+columnar chunk. A chunk is sealed once it has chunk_size rows. Each chunk
+also stores a checkpoint: who occupied which slot when the chunk started.
+With a directory, chunks are JSON files (chunk-000001.json, ...) plus an
+index.json of their time spans, and sealed chunks are read back through a
+small cache. Without one, everything stays in memory.
+
+Queries locate the chunk by bisecting chunk start times, then bisect the
+timestamp column inside it:
+- occupant_at / snapshot_at: checkpoint plus a replay of at most one chunk
+- events: range scan over the overlapping chunks only
+- hourly: per-hour peak occupancy and park/leave counts
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypedDict
+
+if TYPE_CHECKING:
+    from parking_service import Fuel, ParkingService, SlotEvent
+
+DEFAULT_CHUNK_SIZE = 65_536
+CACHED_CHUNKS = 8  # sealed chunks kept decoded in memory (disk-backed histories)
+HOUR_S = 3600
+
+POOLS: tuple[Fuel, ...] = ("ICE", "EV")
+EVENTS = ("park", "leave")
+SlotKey = tuple[int, int]  # (pool code, 0-based slot)
+
+
+class HistoryEvent(TypedDict):
+    ts: float
+    fuel: Fuel
+    slot_ui: int
+    regnum: str
+    event: str  # "park" | "leave"
+
+
+class HourlyRollup(TypedDict):
+    hour: int  # POSIX timestamp of the hour start
+    ice_peak: int
+    ev_peak: int
+    parks: int
+    leaves: int
+
+
+class _Chunk:
+    """One block of rows, stored column by column."""
+
+    def __init__(self, checkpoint: dict[SlotKey, str]) -> None:
+        self.checkpoint = checkpoint
+        self.ts = array("d")
+        self.pool = array("b")
+        self.slot = array("l")
+        self.event = array("b")
+        self.regnum: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def append(self, ts: float, pool: int, slot: int, regnum: str, event: int) -> None:
+        self.ts.append(ts)
+        self.pool.append(pool)
+        self.slot.append(slot)
+        self.regnum.append(regnum)
+        self.event.append(event)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "checkpoint": [[p, s, r] for (p, s), r in self.checkpoint.items()],
+            "ts": self.ts.tolist(),
+            "pool": self.pool.tolist(),
+            "slot": self.slot.tolist(),
+            "regnum": self.regnum,
+            "event": self.event.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> _Chunk:
+        chunk = cls({(p, s): r for p, s, r in data["checkpoint"]})
+        chunk.ts.extend(data["ts"])
+        chunk.pool.extend(data["pool"])
+        chunk.slot.extend(data["slot"])
+        chunk.event.extend(data["event"])
+        chunk.regnum = list(data["regnum"])
+        return chunk
+
+    def replay(self, state: dict[SlotKey, str], upto: int) -> None:
+        """Apply rows [0, upto) to an occupancy map in place."""
+        for i in range(upto):
+            key = (self.pool[i], self.slot[i])
+            if self.event[i] == 0:
+                state[key] = self.regnum[i]
+            else:
+                state.pop(key, None)
+
+
+class OccupancyHistory:
+    """Record park/leave events of a ParkingService and query them by time."""
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        directory: str | os.PathLike[str] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self._svc = svc
+        self._dir = Path(directory) if directory is not None else None
+        self.chunk_size = chunk_size
+        self._clock = clock
+        # sealed chunks: start ts per chunk, plus the chunk itself or its file name
+        self._starts: list[float] = []
+        self._sealed: list[_Chunk | str] = []
+        self._cache: OrderedDict[str, _Chunk] = OrderedDict()
+        self._live: dict[SlotKey, str] = {}  # current occupancy as seen by the history
+        for code, fuel in enumerate(POOLS):
+            for i, vehicle in svc.occupied(fuel):
+                self._live[(code, i)] = str(vehicle.regnum)
+        self._active = _Chunk(dict(self._live))
+        self._active_start: float | None = None
+        self._last_ts = float("-inf")
+        if self._dir is not None:
+            self._open_directory()
+        self._unsubscribe = svc.subscribe(self._on_event)
+
+    # ---------- recording ----------
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        if event != "charge":
+            self.record(event, fuel, idx, str(vehicle.regnum))
+
+    def record(
+        self, event: str, fuel: Fuel, idx: int, regnum: str, ts: float | None = None
+    ) -> None:
+        """
+        Add one "park"/"leave" row for 0-based slot idx (ts defaults to the
+        clock). Used for events seen by another service, e.g. when a
+        committed change is copied into an on-disk history.
+        """
+        ts = max(self._clock() if ts is None else ts, self._last_ts)  # keep the ts column sorted
+        self._last_ts = ts
+        code = POOLS.index(fuel)
+        if event == "park":
+            self._live[(code, idx)] = regnum
+        else:
+            self._live.pop((code, idx), None)
+        if self._active_start is None:
+            self._active_start = ts
+        self._active.append(ts, code, idx, regnum, EVENTS.index(event))
+        if len(self._active) >= self.chunk_size:
+            self._seal()
+
+    def _seal(self) -> None:
+        chunk, start = self._active, self._active_start
+        if start is None:
+            return
+        self._sealed.append(
+            chunk if self._dir is None else self._write_chunk(len(self._sealed) + 1, chunk)
+        )
+        self._starts.append(start)
+        self._active = _Chunk(dict(self._live))
+        self._active_start = None
+        if self._dir is not None:
+            self._write_index()
+
+    def flush(self) -> None:
+        """Write the partial active chunk to disk (no-op for in-memory histories)."""
+        if self._dir is not None and self._active_start is not None:
+            self._write_chunk(len(self._sealed) + 1, self._active)
+            self._write_index()
+
+    def close(self) -> None:
+        """Flush and stop recording."""
+        self.flush()
+        self._unsubscribe()
+
+    # ---------- disk layout ----------
+    def _open_directory(self) -> None:
+        assert self._dir is not None
+        self._dir.mkdir(parents=True, exist_ok=True)
+        index = self._dir / "index.json"
+        if not index.exists():
+            return
+        entries = json.loads(index.read_text(encoding="utf-8"))["chunks"]
+        for name, start, _size in entries:
+            self._starts.append(float(start))
+            self._sealed.append(name)
+            self._last_ts = max(self._last_ts, float(start))
+        if entries and entries[-1][2] < self.chunk_size:
+            # reopen the partial tail chunk and keep appending to it
+            name = self._sealed.pop()
+            assert isinstance(name, str)
+            self._active_start = self._starts.pop()
+            self._active = self._load(name)
+            self._cache.pop(name, None)  # now mutable again
+            if len(self._active):
+                self._last_ts = self._active.ts[-1]
+
+    def _write_chunk(self, number: int, chunk: _Chunk) -> str:
+        assert self._dir is not None
+        name = f"chunk-{number:06d}.json"
+        tmp = self._dir / (name + ".tmp")
+        tmp.write_text(json.dumps(chunk.to_dict(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self._dir / name)
+        self._cache.pop(name, None)
+        return name
+
+    def _write_index(self) -> None:
+        assert self._dir is not None
+        entries: list[list[Any]] = [
+            [name, start, self.chunk_size] for name, start in zip(self._sealed, self._starts, strict=True)
+        ]
+        if self._active_start is not None:
+            entries.append([f"chunk-{len(self._sealed) + 1:06d}.json", self._active_start, len(self._active)])
+        tmp = self._dir / "index.json.tmp"
+        tmp.write_text(json.dumps({"chunks": entries}), encoding="utf-8")
+        os.replace(tmp, self._dir / "index.json")
+
+    def _load(self, name: str) -> _Chunk:
+        chunk = self._cache.get(name)
+        if chunk is not None:
+            self._cache.move_to_end(name)
+            return chunk
+        assert self._dir is not None
+        chunk = _Chunk.from_dict(json.loads((self._dir / name).read_text(encoding="utf-8")))
+        self._cache[name] = chunk
+        if len(self._cache) > CACHED_CHUNKS:
+            self._cache.popitem(last=False)
+        return chunk
+
+    # ---------- chunk navigation ----------
+    def __len__(self) -> int:
+        return len(self._sealed) * self.chunk_size + len(self._active)
+
+    def _chunk(self, i: int) -> _Chunk:
+        if i == len(self._sealed):
+            return self._active
+        c = self._sealed[i]
+        return self._load(c) if isinstance(c, str) else c
+
+    def _chunk_for(self, ts: float, before: bool = False) -> int:
+        """
+        Index of the chunk whose span covers ts (the active chunk counts last).
+        With before=True, the chunk holding the last row strictly before ts:
+        rows at ts may end the previous chunk when the next one starts at ts.
+        """
+        starts = self._starts
+        if self._active_start is not None and (
+            ts > self._active_start or (ts == self._active_start and not before)
+        ):
+            return len(self._sealed)
+        pos = (bisect_left(starts, ts) if before else bisect_right(starts, ts)) - 1
+        return max(pos, 0) if starts else len(self._sealed)
+
+    def _state_at(self, ts: float, before: bool = False) -> dict[SlotKey, str]:
+        """Occupancy after every row with ts' <= ts (before=True: ts' < ts)."""
+        chunk = self._chunk(self._chunk_for(ts, before))
+        state = dict(chunk.checkpoint)
+        chunk.replay(state, bisect_left(chunk.ts, ts) if before else bisect_right(chunk.ts, ts))
+        return state
+
+    # ---------- queries ----------
+    def snapshot_at(self, ts: float) -> dict[tuple[Fuel, int], str]:
+        """Occupancy at ts as {(fuel, slot_ui): regnum}."""
+        return {(POOLS[p], s + 1): r for (p, s), r in self._state_at(ts).items()}
+
+    def occupant_at(self, fuel: Fuel, slot_ui: int, ts: float) -> str | None:
+        """Registration parked in a slot at ts, else None."""
+        key = (POOLS.index(fuel), slot_ui - 1)
+        chunk = self._chunk(self._chunk_for(ts))
+        for j in range(bisect_right(chunk.ts, ts) - 1, -1, -1):
+            if (chunk.pool[j], chunk.slot[j]) == key:
+                return chunk.regnum[j] if chunk.event[j] == 0 else None
+        return chunk.checkpoint.get(key)
+
+    def events(
+        self,
+        start: float,
+        end: float,
+        fuel: Fuel | None = None,
+        slot_ui: int | None = None,
+    ) -> Iterator[HistoryEvent]:
+        """Rows with start <= ts < end, oldest first, optionally for one pool/slot."""
+        pool = None if fuel is None else POOLS.index(fuel)
+        slot = None if slot_ui is None else slot_ui - 1
+        for i in range(self._chunk_for(start, before=True), len(self._sealed) + 1):
+            chunk = self._chunk(i)
+            lo = bisect_left(chunk.ts, start)
+            hi = bisect_left(chunk.ts, end)
+            for j in range(lo, hi):
+                if (pool is None or chunk.pool[j] == pool) and (slot is None or chunk.slot[j] == slot):
+                    yield {
+                        "ts": chunk.ts[j],
+                        "fuel": POOLS[chunk.pool[j]],
+                        "slot_ui": chunk.slot[j] + 1,
+                        "regnum": chunk.regnum[j],
+                        "event": EVENTS[chunk.event[j]],
+                    }
+            if hi < len(chunk):
+                break
+
+    def hourly(self, start: float, end: float) -> list[HourlyRollup]:
+        """Per-hour peak occupancy (per pool) and park/leave counts over [start, end)."""
+        first = int(start // HOUR_S) * HOUR_S
+        counts = [0, 0]
+        for p, _ in self._state_at(first, before=True):  # rows at `first` are replayed below
+            counts[p] += 1
+        rollups: list[HourlyRollup] = []
+        row: HourlyRollup | None = None
+        for ev in self.events(first, end):
+            hour = int(ev["ts"] // HOUR_S) * HOUR_S
+            while row is None or row["hour"] < hour:
+                nxt = first if row is None else row["hour"] + HOUR_S
+                row = {"hour": nxt, "ice_peak": counts[0], "ev_peak": counts[1], "parks": 0, "leaves": 0}
+                rollups.append(row)
+            code = POOLS.index(ev["fuel"])
+            if ev["event"] == "park":
+                counts[code] += 1
+                row["parks"] += 1
+            else:
+                counts[code] -= 1
+                row["leaves"] += 1
+            row["ice_peak"] = max(row["ice_peak"], counts[0])
+            row["ev_peak"] = max(row["ev_peak"], counts[1])
+        nxt = first if row is None else row["hour"] + HOUR_S
+        while nxt < end:
+            rollups.append({"hour": nxt, "ice_peak": counts[0], "ev_peak": counts[1], "parks": 0, "leaves": 0})
+            nxt += HOUR_S
+        return rollups
@@ -0,0 +1,291 @@
+"""
+ANPR gate event ingestion.
+
+Entry/exit cameras emit one JSON object per plate read, e.g.
+    {"ts": 1714550400.12, "dir": "in", "reg": "KA01AB1234", "gate": "north",
+     "make": "VW", "model": "Golf", "color": "Red", "fuel": "ICE", "kind": "CAR"}
+Only ts, dir ("in"/"out") and reg are required. Entries without vehicle
+details park as an unknown ICE car.
+
+Ingestor keeps a bounded asyncio queue in front of the lot. One consumer
+task drains whatever is queued (up to batch_size) and applies it as one
+micro-batch. Producers never block: when the queue is full the incoming
+event is shed and counted, so a burst costs dropped reads instead of
+unbounded memory and latency. A camera reading the same plate in the same
+direction again within dedupe_window_s (camera time) is a double read and
+is dropped before it reaches the lot. Entries go through park(spec,
+entrance=gate) when the lot's layout knows the gate, and exits go through
+leave_by_reg(). Both are stamped with the camera time, so replayed files
+bill the real stay.
+
+By default batches change the Ingestor's own service. For a lot that other
+processes also write, pass commit=: each batch is then handed over as an
+operation, e.g. `lambda op: lot_file.update_lot(path, op)`, so it lands on
+the latest saved lot. The operation may run more than once on a conflict.
+Double-read filtering happens before it, and the stats count only the
+attempt that committed.
+
+Sources: read_jsonl() replays a file; serve() accepts newline-delimited
+JSON over a local TCP socket.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from parking_service import VehicleSpec
+
+if TYPE_CHECKING:
+    from parking_service import ParkingService
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_DEDUPE_WINDOW_S = 2.0
+LATENCY_SAMPLES = 100_000  # most recent per-event latencies kept for percentiles
+DIRECTIONS = ("in", "out")
+
+Outcome = tuple[int, int, int]  # (parked, left, rejected) for one batch
+BatchOp = Callable[["ParkingService"], Outcome]
+
+
+@dataclass(frozen=True)
+class GateEvent:
+    ts: float
+    direction: str  # "in" | "out"
+    regnum: str
+    gate: str = ""
+    make: str = "UNKNOWN"
+    model: str = "UNKNOWN"
+    color: str = "UNKNOWN"
+    fuel: str = "ICE"
+    kind: str = "CAR"
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> GateEvent:
+        """
+        Build an event from a camera record.
+        Raises:
+            ValueError: if ts/dir/reg are missing or invalid.
+        """
+        try:
+            ts = float(data["ts"])
+            direction = str(data["dir"]).lower()
+            regnum = str(data["reg"]).strip().upper()
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"bad gate event {data!r}") from e
+        if direction not in DIRECTIONS or not regnum:
+            raise ValueError(f"bad gate event {data!r}")
+        extras = {k: str(data[k]) for k in ("gate", "make", "model", "color", "fuel", "kind") if data.get(k)}
+        return cls(ts, direction, regnum, **extras)
+
+    def spec(self) -> VehicleSpec:
+        return VehicleSpec(
+            self.regnum, self.make, self.model, self.color,
+            "EV" if self.fuel.upper() == "EV" else "ICE",
+            self.kind.upper(),
+        )
+
+
+class Deduper:
+    """Drops repeat reads of (plate, direction) within window_s of the previous read."""
+
+    def __init__(self, window_s: float = DEFAULT_DEDUPE_WINDOW_S) -> None:
+        self.window_s = window_s
+        self._last: dict[tuple[str, str], float] = {}
+        self._order: deque[tuple[float, tuple[str, str]]] = deque()
+
+    def is_duplicate(self, ev: GateEvent) -> bool:
+        key = (ev.regnum, ev.direction)
+        prev = self._last.get(key)
+        self._last[key] = ev.ts
+        self._order.append((ev.ts, key))
+        # forget reads that fell out of the window (bounded by the window, not the run)
+        horizon = ev.ts - self.window_s
+        while self._order and self._order[0][0] < horizon:
+            ts, old = self._order.popleft()
+            if self._last.get(old) == ts:
+                del self._last[old]
+        return prev is not None and ev.ts - prev <= self.window_s
+
+
+@dataclass
+class IngestStats:
+    received: int = 0
+    malformed: int = 0
+    shed: int = 0  # dropped because the queue was full
+    duplicates: int = 0
+    parked: int = 0
+    left: int = 0
+    rejected: int = 0  # lot full, already parked, or exit of an unknown plate
+    batches: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def latency_ms(self, pct: float) -> float:
+        """Queue-to-applied latency percentile (0..100) over recent events, in ms."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+    def report(self) -> dict[str, float]:
+        counts = {k: v for k, v in vars(self).items() if isinstance(v, int)}
+        return {
+            **counts,
+            "p50_ms": round(self.latency_ms(50), 3),
+            "p99_ms": round(self.latency_ms(99), 3),
+            "max_ms": round(self.latency_ms(100), 3),
+        }
+
+
+class Ingestor:
+    """Bounded, load-shedding queue of gate events applied to one lot in micro-batches."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        svc: ParkingService,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dedupe_window_s: float = DEFAULT_DEDUPE_WINDOW_S,
+        clock: Callable[[], float] = time.perf_counter,
+        *,
+        commit: Callable[[BatchOp], Outcome] | None = None,
+    ) -> None:
+        if queue_size < 1 or batch_size < 1:
+            raise ValueError("queue_size and batch_size must be >= 1")
+        self._svc = svc
+        self._commit = commit
+        self._queue: asyncio.Queue[tuple[float, GateEvent] | None] = asyncio.Queue(queue_size)
+        self.batch_size = batch_size
+        self._dedupe = Deduper(dedupe_window_s)
+        self._clock = clock
+        self.stats = IngestStats()
+
+    # ---------- producer side ----------
+    def submit(self, ev: GateEvent) -> bool:
+        """Enqueue without blocking. False if the event was shed."""
+        self.stats.received += 1
+        try:
+            self._queue.put_nowait((self._clock(), ev))
+        except asyncio.QueueFull:
+            self.stats.shed += 1
+            return False
+        return True
+
+    def submit_line(self, line: str | bytes) -> bool:
+        """Parse one JSON line and submit it. Blank lines are ignored; bad ones are counted."""
+        if not line.strip():
+            return False
+        try:
+            ev = GateEvent.from_dict(json.loads(line))
+        except ValueError:  # includes json.JSONDecodeError
+            self.stats.malformed += 1
+            return False
+        return self.submit(ev)
+
+    async def stop(self) -> None:
+        """Ask run() to finish once everything queued before this call is applied."""
+        await self._queue.put(None)
+
+    @property
+    def pending(self) -> int:
+        """Events accepted into the queue but not applied (yet)."""
+        s = self.stats
+        return s.received - s.shed - s.duplicates - s.parked - s.left - s.rejected
+
+    # ---------- consumer side ----------
+    async def run(self) -> IngestStats:
+        """Apply queued events until stop(). Returns the final stats."""
+        queue = self._queue
+        while True:
+            item = await queue.get()
+            batch: list[tuple[float, GateEvent]] = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size or queue.empty():
+                    break
+                item = queue.get_nowait()
+            if batch:
+                self._apply(batch)
+            if item is None:
+                return self.stats
+            await asyncio.sleep(0)  # let producers run between batches
+
+    def _apply(self, batch: list[tuple[float, GateEvent]]) -> None:
+        stats = self.stats
+        events = []
+        for _, ev in batch:
+            if self._dedupe.is_duplicate(ev):
+                stats.duplicates += 1
+            else:
+                events.append(ev)
+        if events:
+            def op(svc: ParkingService) -> Outcome:
+                return _apply_events(svc, events)
+
+            parked, left, rejected = op(self._svc) if self._commit is None else self._commit(op)
+            stats.parked += parked
+            stats.left += left
+            stats.rejected += rejected
+        done = self._clock()
+        stats.latencies.extend(done - t for t, _ in batch)
+        stats.batches += 1
+
+
+def _apply_events(svc: ParkingService, events: list[GateEvent]) -> Outcome:
+    parked = left = rejected = 0
+    layout = svc.layout
+    for ev in events:
+        if ev.direction == "out":
+            if svc.leave_by_reg(ev.regnum, at=ev.ts)["ok"]:
+                left += 1
+            else:
+                rejected += 1
+        elif svc.all_slots_by_reg(ev.regnum):
+            rejected += 1  # entry seen twice without an exit
+        else:
+            gate = ev.gate if layout is not None and ev.gate in layout.entrances else None
+            try:
+                ok = svc.park(ev.spec(), entrance=gate, at=ev.ts)["ok"]
+            except ValueError:  # e.g. a kind the EV pool doesn't take
+                ok = False
+            parked += ok
+            rejected += not ok
+    return parked, left, rejected
+
+
+# ---------- sources ----------
+async def read_jsonl(path: str | os.PathLike[str], ingestor: Ingestor, yield_every: int = 256) -> None:
+    """Submit every line of a JSONL file, yielding to the consumer every yield_every lines."""
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            ingestor.submit_line(line)
+            if n % yield_every == 0:
+                await asyncio.sleep(0)
+
+
+async def serve(ingestor: Ingestor, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+    """Accept newline-delimited gate events from local TCP clients (port 0 picks one)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async for line in reader:
+                ingestor.submit_line(line)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def ingest_jsonl(svc: ParkingService, path: str | os.PathLike[str], **options: Any) -> IngestStats:
+    """Replay a JSONL file of gate events into svc and return the stats."""
+    ingestor = Ingestor(svc, **options)
+    consumer = asyncio.create_task(ingestor.run())
+    await read_jsonl(path, ingestor)
+    await ingestor.stop()
+    return await consumer
@@ -0,0 +1,163 @@
+"""
+Optional lot geometry: slot coordinates and named entrances.
+
+A Layout gives every ICE and EV slot an (x, y) position (metres, any
+origin) plus entrances by name. VacancyTree is a k-d tree over one pool's
+slot positions, built once, with the number of vacant slots kept per node.
+occupy/release update the counts on one leaf-to-root path in O(log n).
+nearest() visits nodes closest-box-first and skips every subtree with no
+vacant slot or a box farther than the best slot found so far. It stays
+logarithmic whether the lot is nearly empty or nearly full.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Any
+
+Point = tuple[float, float]
+
+BAY_WIDTH = 2.5  # metres between bay centres in Layout.rows()
+ROW_GAP = 6.0  # metres between rows (aisle included)
+LEAF_SIZE = 8  # slots per k-d tree leaf
+
+
+@dataclass
+class Layout:
+    """Slot positions per pool (index-aligned with the pools) and named entrances."""
+    slots: list[Point] = field(default_factory=list)
+    evSlots: list[Point] = field(default_factory=list)
+    entrances: dict[str, Point] = field(default_factory=dict)
+
+    @classmethod
+    def rows(
+        cls,
+        capacity: int,
+        ev_capacity: int,
+        per_row: int = 10,
+        entrances: dict[str, Point] | None = None,
+    ) -> Layout:
+        """Bays in rows of per_row (ICE rows first, then EV rows), gate "main" at the origin."""
+        def row_points(n: int, first_row: int) -> list[Point]:
+            return [
+                ((i % per_row) * BAY_WIDTH, (first_row + i // per_row) * ROW_GAP)
+                for i in range(n)
+            ]
+        ice_rows = -(-capacity // per_row)
+        return cls(
+            slots=row_points(capacity, 0),
+            evSlots=row_points(ev_capacity, ice_rows),
+            entrances=dict(entrances or {"main": (0.0, -ROW_GAP)}),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "slots": [list(p) for p in self.slots],
+            "evSlots": [list(p) for p in self.evSlots],
+            "entrances": {name: list(p) for name, p in self.entrances.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Layout:
+        def pt(p: Any) -> Point:
+            return (float(p[0]), float(p[1]))
+        return cls(
+            slots=[pt(p) for p in data.get("slots", [])],
+            evSlots=[pt(p) for p in data.get("evSlots", [])],
+            entrances={name: pt(p) for name, p in data.get("entrances", {}).items()},
+        )
+
+
+class VacancyTree:
+    """k-d tree over one pool's slot positions with a vacant count per node."""
+
+    def __init__(self, points: list[Point]) -> None:
+        self._points = points
+        self._vacant = [False] * len(points)
+        self._perm = list(range(len(points)))  # slots reordered so every node is a range
+        self._range: list[tuple[int, int]] = []
+        self._box: list[tuple[float, float, float, float]] = []  # min x, min y, max x, max y
+        self._kids: list[tuple[int, int] | None] = []
+        self._parent: list[int] = []
+        self._count: list[int] = []  # vacant slots below each node
+        self._leaf_of = [0] * len(points)
+        if points:
+            self._build()
+
+    def _build(self) -> None:
+        pts, perm = self._points, self._perm
+        stack = [(0, len(pts), -1)]  # (lo, hi, parent)
+        while stack:
+            lo, hi, parent = stack.pop()
+            node = len(self._range)
+            xs = [pts[i][0] for i in perm[lo:hi]]
+            ys = [pts[i][1] for i in perm[lo:hi]]
+            box = (min(xs), min(ys), max(xs), max(ys))
+            self._range.append((lo, hi))
+            self._box.append(box)
+            self._kids.append(None)
+            self._parent.append(parent)
+            self._count.append(0)
+            if parent >= 0:
+                kids = self._kids[parent]
+                self._kids[parent] = (node, -1) if kids is None else (kids[0], node)
+            if hi - lo <= LEAF_SIZE:
+                for i in range(lo, hi):
+                    self._leaf_of[perm[i]] = node
+                continue
+            axis = 0 if box[2] - box[0] >= box[3] - box[1] else 1
+            perm[lo:hi] = sorted(perm[lo:hi], key=lambda i: (pts[i][axis], i))
+            mid = (lo + hi) // 2
+            stack.append((mid, hi, node))  # popped after the left half
+            stack.append((lo, mid, node))
+
+    def __len__(self) -> int:
+        return self._count[0] if self._count else 0
+
+    def _adjust(self, idx: int, delta: int) -> None:
+        node = self._leaf_of[idx]
+        while node >= 0:
+            self._count[node] += delta
+            node = self._parent[node]
+
+    def release(self, idx: int) -> None:
+        """Mark a slot vacant."""
+        if not self._vacant[idx]:
+            self._vacant[idx] = True
+            self._adjust(idx, 1)
+
+    def occupy(self, idx: int) -> None:
+        """Mark a slot taken."""
+        if self._vacant[idx]:
+            self._vacant[idx] = False
+            self._adjust(idx, -1)
+
+    def nearest(self, p: Point) -> int | None:
+        """Vacant slot closest to p (ties -> lower index), else None."""
+        if not len(self):
+            return None
+        px, py = p
+        best = (math.inf, -1)
+        heap = [(0.0, 0)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > best[0]:
+                break  # every remaining node's box is farther than the best slot
+            kids = self._kids[node]
+            if kids is None:
+                lo, hi = self._range[node]
+                for idx in self._perm[lo:hi]:
+                    if self._vacant[idx]:
+                        q = self._points[idx]
+                        best = min(best, ((q[0] - px) ** 2 + (q[1] - py) ** 2, idx))
+                continue
+            for kid in kids:
+                if self._count[kid]:
+                    x0, y0, x1, y1 = self._box[kid]
+                    dx = max(x0 - px, 0.0, px - x1)
+                    dy = max(y0 - py, 0.0, py - y1)
+                    kd = dx * dx + dy * dy
+                    if kd <= best[0]:
+                        heapq.heappush(heap, (kd, kid))
+        return best[1]
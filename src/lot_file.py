@@ -0,0 +1,146 @@
+"""
+Safe read-modify-write of a lot JSON file shared by several processes.
+
+Snapshots carry a "revision" counter. update_lot() loads the file and
+applies the operation in memory without holding any lock. It then takes a
+short advisory lock (a sidecar <file>.lock, flock on POSIX, msvcrt on
+Windows) only to compare-and-swap: if the revision on disk is still the one
+it loaded, it writes revision + 1 atomically (temp file + os.replace).
+Otherwise another writer won, so it reloads and re-applies the operation.
+Readers never need the lock because the file is always replaced whole.
+Side files that must follow the lot (history chunks, session logs) are
+written by an on_commit callback that runs under the same lock, right after
+the winning save. replace_lot() is the same compare-and-swap for a lot that
+is written whole: it fails instead of re-applying.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+from parking_service import ParkingService
+
+if sys.platform == "win32":  # pragma: no cover
+    import msvcrt
+else:
+    import fcntl
+
+T = TypeVar("T")
+
+DEFAULT_RETRIES = 50
+BACKOFF_S = 0.002  # first retry delay; grows linearly with jitter
+
+
+class ConflictError(RuntimeError):
+    """update_lot() kept losing the compare-and-swap race."""
+
+
+def atomic_write_json(path: str | os.PathLike[str], data: Any) -> None:
+    """Write JSON to a temp file in the same directory, fsync, then rename over path."""
+    target = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def file_lock(path: str | os.PathLike[str]) -> Iterator[None]:
+    """Exclusive advisory lock on <path>.lock for the duration of the block."""
+    with open(f"{os.fspath(path)}.lock", "a+b") as f:
+        if sys.platform == "win32":  # pragma: no cover
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def read_revision(path: str | os.PathLike[str]) -> int:
+    """Revision of the snapshot currently on disk (0 for files that predate it)."""
+    with open(path, encoding="utf-8") as f:
+        return int(json.load(f).get("revision", 0))
+
+
+def update_lot(
+    path: str | os.PathLike[str],
+    operation: Callable[[ParkingService], T],
+    retries: int = DEFAULT_RETRIES,
+    on_commit: Callable[[ParkingService], None] | None = None,
+) -> T:
+    """
+    Apply operation to the lot stored at path and commit it with
+    compare-and-swap, retrying on conflicts. operation may run more than
+    once, so it must only touch the service it is given. Nothing is written
+    if it changed nothing (no park/leave/charge event). on_commit(svc) runs
+    once, for the attempt that committed a change, while the lock is held.
+    Raises:
+        ConflictError: if every attempt lost the race.
+    """
+    for attempt in range(retries + 1):
+        committed, result = _attempt(os.fspath(path), operation, on_commit)
+        if committed:
+            return result
+        time.sleep(BACKOFF_S * (attempt + 1) * random.uniform(0.5, 1.5))  # noqa: S311
+    raise ConflictError(f"gave up on {os.fspath(path)} after {retries + 1} attempts")
+
+
+def replace_lot(path: str | os.PathLike[str], svc: ParkingService, base: int | None) -> None:
+    """
+    Write svc over path as a whole, with the compare-and-swap of update_lot()
+    but no re-apply: the file must still be at revision base (or, for
+    base=None, not exist yet). For changes that cannot be replayed on a
+    fresh load.
+    Raises:
+        ConflictError: if another writer got there first.
+    """
+    target = os.fspath(path)
+    with file_lock(target):
+        current = read_revision(target) if os.path.exists(target) else None
+        if current != base:
+            raise ConflictError(f"{target} changed on disk since the lot was loaded")
+        svc.save_json(target)
+
+
+def _attempt(
+    path: str,
+    operation: Callable[[ParkingService], T],
+    on_commit: Callable[[ParkingService], None] | None,
+) -> tuple[bool, T]:
+    """One optimistic try: (committed, result). Unchanged lots count as committed."""
+    svc = ParkingService.load_json(path)
+    base = svc.revision
+    changes: list[object] = []
+    unsubscribe = svc.subscribe(lambda *e: changes.append(e))
+    result = operation(svc)
+    unsubscribe()
+    if not changes:
+        return True, result
+    with file_lock(path):
+        if read_revision(path) != base:
+            return False, result
+        svc.save_json(path)
+        if on_commit is not None:
+            on_commit(svc)
+    return True, result
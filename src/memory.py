@@ -0,0 +1,60 @@
+"""
+Memory accounting helpers for ParkingService.memory_report() and the soak harness.
+
+deep_sizeof() walks an object graph with sys.getsizeof, counting every
+object once (pass the same `seen` set to split a graph into components
+without double counting). Functions, classes and modules are not followed,
+so listeners and hooks don't drag in unrelated state.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import types
+from array import array
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+           types.MethodType, types.LambdaType)
+_SEQUENCES = (list, tuple, set, frozenset, deque)
+
+
+def deep_sizeof(roots: Iterable[Any], seen: set[int] | None = None) -> int:
+    """Bytes held by roots and everything they reference (each object counted once)."""
+    seen = set() if seen is None else seen
+    stack = list(roots)
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, int, float, bool, array)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _SEQUENCES):
+            stack.extend(obj)
+        else:
+            d = getattr(obj, "__dict__", None)
+            if d is not None:
+                stack.append(d)
+            for cls in type(obj).__mro__:
+                names = getattr(cls, "__slots__", ())
+                for name in (names,) if isinstance(names, str) else names:
+                    if hasattr(obj, name):
+                        stack.append(getattr(obj, name))
+    return total
+
+
+def current_rss() -> int | None:
+    """Resident set size of this process in bytes (Linux /proc), else None."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
@@ -0,0 +1,230 @@
+"""
+Overstay detection: vehicles parked longer than a maximum stay.
+
+OverstayMonitor gives every parked vehicle a deadline (entry time + the
+limit for its kind or pool) and keeps it in a TimingWheel. The deadline is
+added on park and removed on leave, so a check only touches the deadlines
+that came due since the previous check, never the whole lot.
+
+TimingWheel is a hierarchical timing wheel over integer ticks (tick_s
+seconds each). Each level has 64 buckets, and level l buckets span 64**l
+ticks. An entry goes in the level of the highest 6-bit digit where its
+deadline differs from the current tick. When time reaches that bucket, the
+entry cascades one or more levels down, until level 0 expires it. Adding and
+removing an entry are O(1). advance() jumps straight to the next non-empty
+bucket using a 64-bit occupancy mask per level, so time can move forward
+by seconds or by months. Over its life an entry moves at most once per
+level, so the cost per expiry is O(1) amortized. Deadlines are rounded up
+to the next tick.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any, Generic, TypedDict, TypeVar
+
+from vehicle_codec import codec_for
+
+if TYPE_CHECKING:
+    from parking_service import Fuel, Kind, ParkingService, SlotEvent
+
+K = TypeVar("K", bound=Hashable)
+
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS  # buckets per level
+DEFAULT_TICK_S = 1.0
+
+
+class TimingWheel(Generic[K]):
+    """Keys with deadlines; advance(now) returns the keys whose deadline passed."""
+
+    def __init__(self, start: float, tick_s: float = DEFAULT_TICK_S) -> None:
+        if tick_s <= 0:
+            raise ValueError("tick_s must be > 0")
+        self.tick_s = tick_s
+        self._now = math.floor(start / tick_s)  # current tick
+        self._levels: list[list[dict[K, int]]] = []  # [level][bucket] -> {key: deadline tick}
+        self._masks: list[int] = []  # non-empty buckets per level, one bit each
+        self._where: dict[K, tuple[int, int]] = {}  # key -> (level, bucket)
+        self._due: list[K] = []  # added with a deadline already past
+
+    def __len__(self) -> int:
+        return len(self._where) + len(self._due)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._where or key in self._due
+
+    @property
+    def now(self) -> float:
+        """Start of the current tick, in seconds."""
+        return self._now * self.tick_s
+
+    def add(self, key: K, deadline: float) -> None:
+        """Schedule key (replacing an earlier deadline for it)."""
+        self.remove(key)
+        self._place(key, math.ceil(deadline / self.tick_s))
+
+    def remove(self, key: K) -> bool:
+        pos = self._where.pop(key, None)
+        if pos is None:
+            if key in self._due:
+                self._due.remove(key)
+                return True
+            return False
+        level, bucket = pos
+        slots = self._levels[level][bucket]
+        del slots[key]
+        if not slots:
+            self._masks[level] &= ~(1 << bucket)
+        return True
+
+    def _place(self, key: K, tick: int) -> None:
+        if tick <= self._now:
+            self._due.append(key)
+            return
+        level = ((tick ^ self._now).bit_length() - 1) // WHEEL_BITS
+        while len(self._levels) <= level:
+            self._levels.append([{} for _ in range(WHEEL_SIZE)])
+            self._masks.append(0)
+        bucket = (tick >> (level * WHEEL_BITS)) & (WHEEL_SIZE - 1)
+        self._levels[level][bucket][key] = tick
+        self._masks[level] |= 1 << bucket
+        self._where[key] = (level, bucket)
+
+    def _next_event(self) -> int | None:
+        """Earliest tick at which some non-empty bucket is cascaded or expired."""
+        best: int | None = None
+        for level, mask in enumerate(self._masks):
+            shift = level * WHEEL_BITS
+            digit = (self._now >> shift) & (WHEEL_SIZE - 1)
+            ahead = mask >> (digit + 1)
+            if not ahead:
+                continue
+            bucket = digit + (ahead & -ahead).bit_length()
+            tick = (self._now >> (shift + WHEEL_BITS) << (shift + WHEEL_BITS)) | (bucket << shift)
+            if best is None or tick < best:
+                best = tick
+        return best
+
+    def advance(self, now: float) -> list[K]:
+        """Move time forward to `now` and return the expired keys, earliest first."""
+        expired, self._due = self._due, []
+        target = math.floor(now / self.tick_s)
+        while True:
+            tick = self._next_event()
+            if tick is None or tick > target:
+                break
+            self._now = tick
+            for level in range(len(self._levels) - 1, -1, -1):
+                shift = level * WHEEL_BITS
+                if tick & ((1 << shift) - 1):
+                    continue  # not on this level's boundary
+                bucket = (tick >> shift) & (WHEEL_SIZE - 1)
+                slots = self._levels[level][bucket]
+                if not slots:
+                    continue
+                self._levels[level][bucket] = {}
+                self._masks[level] &= ~(1 << bucket)
+                for key, deadline in slots.items():
+                    del self._where[key]
+                    if deadline <= tick:
+                        expired.append(key)
+                    else:
+                        self._place(key, deadline)  # lands on a lower level
+        self._now = max(self._now, target)
+        return expired
+
+
+class Overstay(TypedDict):
+    regnum: str
+    fuel: Fuel
+    kind: Kind
+    slot_ui: int
+    entered: float
+    deadline: float  # entered + limit
+    limit_s: float
+
+
+class OverstayMonitor:
+    """
+    Flags vehicles that stay longer than limits[kind], else limits[fuel],
+    else limits["*"] (seconds). Vehicles with no limit or no entry time are
+    not tracked. on_overstay(row) runs once per vehicle when tick() finds it
+    overdue. start is the time checks begin from (default: the service
+    clock); pass an earlier one to look at the lot as of that time.
+    """
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        limits: dict[str, float],
+        tick_s: float = DEFAULT_TICK_S,
+        on_overstay: Callable[[Overstay], None] | None = None,
+        start: float | None = None,
+    ) -> None:
+        if any(v <= 0 for v in limits.values()):
+            raise ValueError("limits must be > 0 seconds")
+        self._svc = svc
+        self.limits = dict(limits)
+        self.on_overstay = on_overstay
+        start = svc.clock() if start is None else start
+        self._wheel: TimingWheel[tuple[Fuel, int]] = TimingWheel(start, tick_s)
+        self._pending: dict[tuple[Fuel, int], Overstay] = {}  # scheduled, not yet due
+        self.flagged: dict[tuple[Fuel, int], Overstay] = {}  # overdue and still parked
+        pools: tuple[Fuel, ...] = ("ICE", "EV")
+        for fuel in pools:
+            for idx, vehicle in svc.occupied(fuel):
+                self._schedule(fuel, idx, vehicle, svc.entered_at(fuel, idx))
+        self._unsubscribe = svc.subscribe(self._on_event)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def limit_for(self, kind: str, fuel: str) -> float | None:
+        for key in (kind, fuel, "*"):
+            if key in self.limits:
+                return self.limits[key]
+        return None
+
+    def __len__(self) -> int:
+        """Vehicles being timed (flagged ones excluded)."""
+        return len(self._pending)
+
+    def _schedule(self, fuel: Fuel, idx: int, vehicle: Any, entered: float | None) -> None:
+        kind = codec_for(vehicle).kind
+        limit = self.limit_for(kind, fuel)
+        if limit is None or entered is None:
+            return
+        row: Overstay = {
+            "regnum": str(vehicle.regnum), "fuel": fuel, "kind": kind, "slot_ui": idx + 1,
+            "entered": entered, "deadline": entered + limit, "limit_s": limit,
+        }
+        self._pending[(fuel, idx)] = row
+        self._wheel.add((fuel, idx), row["deadline"])
+
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        if event == "park":
+            self._schedule(fuel, idx, vehicle, self._svc.entered_at(fuel, idx))
+        elif event == "leave":
+            key = (fuel, idx)
+            if self._pending.pop(key, None) is not None:
+                self._wheel.remove(key)
+            self.flagged.pop(key, None)
+
+    def tick(self, now: float | None = None) -> list[Overstay]:
+        """Vehicles that became overdue since the previous tick (default now: the service clock)."""
+        now = self._svc.clock() if now is None else now
+        found: list[Overstay] = []
+        for key in self._wheel.advance(now):
+            row = self._pending.pop(key)
+            self.flagged[key] = row
+            found.append(row)
+        if self.on_overstay is not None:
+            for row in found:
+                self.on_overstay(row)
+        return found
+
+    def overstays(self, now: float | None = None) -> list[Overstay]:
+        """Every vehicle currently over its limit, longest overdue first."""
+        self.tick(now)
+        return sorted(self.flagged.values(), key=lambda r: (r["deadline"], r["fuel"], r["slot_ui"]))
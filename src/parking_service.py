@@ -1,13 +1,32 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Callable, Iterator, Mapping
 from dataclasses import dataclass
-from typing import Any, Literal, TypedDict
+from itertools import islice
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Literal, TypedDict
 
+from allocation import POLICIES, FragmentationStats, FreeRuns, Policy
+from charge_index import ChargeIndex
+from layout import Layout, VacancyTree
+from memory import deep_sizeof
+from reg_index import RegIndex
 from slot import Slot
+from slot_index import SlotIndex
+from snapshot import CowList, LotSnapshot
+from sort_index import SORT_KEYS, SortIndex, decode_cursor, encode_cursor
+from vehicle_codec import codec_for, codec_for_spec, csv_cells
 from vehicle_factory import create as create_vehicle
 
+if TYPE_CHECKING:
+    from billing import Tariff
+
 Fuel = Literal["ICE", "EV"]
 Kind = Literal["CAR", "MOTORCYCLE", "BUS", "TRUCK"]
+SlotEvent = Literal["park", "leave", "charge"]
+# (event, fuel, 0-based slot index, vehicle) -- vehicle is the one that left on "leave"
+Listener = Callable[[SlotEvent, Fuel, int, Any], None]
 
 
 @dataclass(frozen=True)
@@ -27,11 +46,27 @@ class ParkResult(TypedDict):
     slot_ui: int | None  # 1-based index for UI
 
 
-class LeaveResult(TypedDict):
+class Session(TypedDict):
+    """One closed stay, as returned by leave() and priced by billing.Tariff."""
+    regnum: str
+    fuel: Fuel
+    kind: Kind
+    slot_ui: int
+    entered: float | None  # POSIX seconds; None for vehicles loaded without an entry time
+    exited: float
+    charge: int | None  # EV charge percent at exit, None for ICE
+
+
+class LeaveOutcome(TypedDict):
     ok: bool
     message: str
 
 
+class LeaveResult(LeaveOutcome, total=False):
+    session: Session  # successful leaves only
+    fee: float  # when a tariff is set
+
+
 class StatusRow(TypedDict):
     slot_ui: int
     level: int
@@ -41,6 +76,62 @@ class StatusRow(TypedDict):
     model: str
 
 
+class QueryRow(TypedDict):
+    slot_ui: int
+    level: int
+    fuel: Fuel
+    kind: Kind
+    regnum: str
+    color: str
+    make: str
+    model: str
+
+
+class RegMatch(TypedDict):
+    regnum: str
+    slot_ui: int
+    fuel: Fuel
+    match: Literal["exact", "prefix", "substring", "fuzzy"]
+    distance: int  # edit distance for fuzzy matches, else 0
+
+
+class OccupancyCounts(TypedDict):
+    capacity: int
+    occupied: int
+    free: int
+    occupancy_pct: float
+
+
+class PoolSummary(OccupancyCounts, total=False):
+    reserved: int  # vacant slots held by reservations (counted as free, not allocatable)
+    fragmentation: FragmentationStats
+    by_kind: dict[str, int]
+    by_make: dict[str, int]
+    by_model: dict[str, int]
+    by_color: dict[str, int]
+
+
+class LotSummary(TypedDict):
+    level: int
+    ice: PoolSummary
+    ev: PoolSummary
+    total: OccupancyCounts
+
+
+class StatusPage(TypedDict):
+    rows: list[StatusRow]
+    next: str | None  # cursor for the following page, None on the last one
+
+
+class MemoryReport(TypedDict):
+    slots: int
+    vehicles: int
+    bytes: dict[str, int]  # per component (vehicles, slots, each index, caches)
+    total_bytes: int
+    bytes_per_slot: float  # total / slots
+    bytes_per_vehicle: float  # vehicle objects and their strings / vehicles
+
+
 class ParkingService:
     """
     Pure application layer for the Parking Lot.
@@ -49,24 +140,89 @@ class ParkingService:
     - Slot IDs are normalized: 0-based internally, 1-based for UI/messages.
     - Temporary API shim: leave(..., fuel="ICE") remains for back-compat and
       should be made required after the Factory/State milestones.
+    - Allocation: bays_per_kind gives kinds that need several adjacent bays
+      (e.g. allocation.LARGE_VEHICLE_BAYS); policy picks the run (see allocation).
+      A multi-bay vehicle lives in its first slot; the rest of the run is held.
+    - Optional layout (slot coordinates + entrances) enables park(spec, entrance=...).
     """
 
-    def __init__(self, capacity: int, ev_capacity: int, level: int = 1) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        capacity: int,
+        ev_capacity: int,
+        level: int = 1,
+        *,
+        bays_per_kind: dict[str, int] | None = None,
+        policy: str | Policy = "first_fit",
+        layout: Layout | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
         if capacity < 0 or ev_capacity < 0:
             raise ValueError("capacities must be >= 0")
         if capacity == 0 and ev_capacity == 0:
             raise ValueError("at least one of capacity or ev_capacity must be > 0")
         if level <= 0:
             raise ValueError("level must be >= 1")
+        if isinstance(policy, str) and policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r}; expected one of {sorted(POLICIES)}")
+        if any(b < 1 for b in (bays_per_kind or {}).values()):
+            raise ValueError("bays_per_kind values must be >= 1")
 
         self.level = level
         self.capacity = capacity
         self.ev_capacity = ev_capacity
+        # Snapshot revision: bumped by every save_json(), checked by lot_file.update_lot()
+        self.revision = 0
+        # Entry/exit timestamps when park/leave get no explicit `at`
+        self.clock = clock
 
         # State-model slots
         self.slots: list[Slot] = [Slot(i, level, "ICE") for i in range(capacity)]
         self.evSlots: list[Slot] = [Slot(i, level, "EV") for i in range(ev_capacity)]
 
+        # Free-run trees per pool; multi-bay spans as head idx -> bays and held idx -> head
+        self.bays_per_kind: dict[str, int] = dict(bays_per_kind or {})
+        self.policy: Policy = POLICIES[policy] if isinstance(policy, str) else policy
+        self._free = {"ICE": FreeRuns(capacity), "EV": FreeRuns(ev_capacity)}
+        self._spans: dict[str, dict[int, int]] = {"ICE": {}, "EV": {}}
+        self._held: dict[str, dict[int, int]] = {"ICE": {}, "EV": {}}
+        # Reservation holds: idx -> active hold count; held slots are skipped by allocation
+        self._reserved: dict[str, dict[int, int]] = {"ICE": {}, "EV": {}}
+        # Optional hook run before every allocation (set by reservations.ReservationBook)
+        self.before_allocate: Callable[[], None] | None = None
+        self.layout: Layout | None = None
+        self._near: dict[str, VacancyTree] = {}
+        if layout is not None:
+            self.set_layout(layout)
+
+        # Encoded vehicle records per slot (see vehicle_codec). Encoding is deferred
+        # to the first export and then reused, so repeated saves don't re-encode
+        # every vehicle. Vehicles are treated as immutable apart from EV 'charge',
+        # which is re-read at export time (set_charge() also refreshes the record,
+        # so snapshot() sees it). Records are replaced, never edited, and live in
+        # copy-on-write lists so snapshot() can share them.
+        self._records: dict[str, CowList[dict[str, Any] | None]] = {
+            "ICE": CowList(capacity, None),
+            "EV": CowList(ev_capacity, None),
+        }
+        self._unencoded: dict[str, set[int]] = {"ICE": set(), "EV": set()}
+        # Postings lists for finders/query(), maintained in _occupy/_vacate
+        self._index = SlotIndex()
+        self._regs = RegIndex()
+        self._charges = ChargeIndex()  # EV pool ordered by charge percent
+        self._sorted = SortIndex()  # sorted orders for status_page(), built on demand
+        # External observers (charging engine, schedulers, ...) notified after changes
+        self._listeners: list[Listener] = []
+        # Bumped on every park/leave/charge; read models below are rebuilt only
+        # when the change touched them ("ICE"/"EV" status rows, "charge" rows)
+        self.version = 0
+        self._views: dict[str, list[Any]] = {}
+        # Optional 0-based EV idx -> assigned kW (set by charge_scheduler.ChargeScheduler)
+        self.charge_power: Callable[[int], float] | None = None
+        # Prices each session at leave() when set; on_session sees every closed
+        # session (set by billing.SessionLog)
+        self.tariff: Tariff | None = None
+        self.on_session: Callable[[Session], None] | None = None
 
     # ---------- helpers ----------
     @staticmethod
@@ -81,25 +237,239 @@ class ParkingService:
             return None
         return slot_ui - 1
 
-    def _get_empty_slot(self) -> int | None:
-        """Return first vacant ICE slot index, else None."""
-        for i, s in enumerate(self.slots):
-            if s.is_vacant:
-                return i
-        return None
+    def _pool(self, fuel: Fuel) -> list[Slot]:
+        """Slot list for a fuel pool."""
+        return self.evSlots if fuel == "EV" else self.slots
+
+    def _occupy(  # noqa: PLR0913
+        self, fuel: Fuel, idx: int, entity: Any, bays: int = 1, at: float | None = None
+    ) -> None:
+        """Single entry point for filling a slot (keeps derived state in sync)."""
+        self._pool(fuel)[idx].occupy(entity, at)
+        self._mark_taken(fuel, idx, bays)
+        if bays > 1:
+            self._spans[fuel][idx] = bays
+            for i in range(idx + 1, idx + bays):
+                self._held[fuel][i] = idx
+        self._unencoded[fuel].add(idx)
+        self._index.add(fuel, idx, entity)
+        self._regs.add(str(entity.regnum), fuel, idx)
+        self._sorted.add(fuel, idx, entity)
+        if fuel == "EV":
+            self._charges.add(idx, entity.charge)
+        self._notify("park", fuel, idx, entity)
+
+    def _vacate(self, fuel: Fuel, idx: int, at: float | None = None) -> Session:
+        """Single entry point for freeing a slot (keeps derived state in sync)."""
+        slot = self._pool(fuel)[idx]
+        vehicle = slot.vehicle
+        session: Session = {
+            "regnum": str(vehicle.regnum),
+            "fuel": fuel,
+            "kind": codec_for(vehicle).kind,
+            "slot_ui": self._to_ui(idx),
+            "entered": slot.entered_at,
+            "exited": self.clock() if at is None else at,
+            "charge": int(vehicle.charge) if fuel == "EV" else None,
+        }
+        self._index.remove(fuel, idx, vehicle)
+        self._regs.remove(str(vehicle.regnum), fuel, idx)
+        self._sorted.remove(fuel, idx, vehicle)
+        if fuel == "EV":
+            self._charges.remove(idx)
+        slot.free()
+        bays = self._spans[fuel].pop(idx, 1)
+        for i in range(idx + 1, idx + bays):
+            del self._held[fuel][i]
+        self._mark_free(fuel, idx, bays)
+        self._records[fuel][idx] = None
+        self._unencoded[fuel].discard(idx)
+        self._notify("leave", fuel, idx, vehicle)
+        if self.on_session is not None:
+            self.on_session(session)
+        return session
+
+    def _mark_taken(self, fuel: Fuel, idx: int, bays: int = 1) -> None:
+        """Remove bays from the allocation structures (free runs, vacancy tree)."""
+        self._free[fuel].occupy(idx, bays)
+        if self._near:
+            for i in range(idx, idx + bays):
+                self._near[fuel].occupy(i)
+
+    def _mark_free(self, fuel: Fuel, idx: int, bays: int = 1) -> None:
+        """Return bays to the allocation structures, except reservation-held ones."""
+        reserved = self._reserved[fuel]
+        for i in range(idx, idx + bays):
+            if i not in reserved:
+                self._free[fuel].release(i)
+                if self._near:
+                    self._near[fuel].release(i)
+
+    def _notify(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        self.version += 1
+        if event != "charge":
+            self._views.pop(fuel, None)
+        if fuel == "EV":
+            self._views.pop("charge", None)
+        for listener in self._listeners:
+            listener(event, fuel, idx, vehicle)
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """
+        Call listener(event, fuel, idx, vehicle) after every park/leave/charge
+        change (idx is 0-based). Returns a function that unsubscribes.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    # ---------- Slot reads (0-based idx, as in events; for views kept in sync by subscribe) ----------
+    def vehicle_at(self, fuel: Fuel, idx: int) -> Any | None:
+        """Vehicle parked with its run starting at idx (None for vacant or trailing bays)."""
+        return self._pool(fuel)[idx].vehicle
+
+    def entered_at(self, fuel: Fuel, idx: int) -> float | None:
+        """Entry time of the vehicle at idx (None if vacant or unknown)."""
+        entered: float | None = self._pool(fuel)[idx].entered_at
+        return entered
+
+    def run_head(self, fuel: Fuel, idx: int) -> int:
+        """First bay of the multi-bay run covering idx, else idx itself."""
+        return self._held[fuel].get(idx, idx)
+
+    def spans(self, fuel: Fuel) -> Mapping[int, int]:
+        """Run start -> bays for the multi-bay vehicles of a pool (read-only)."""
+        return MappingProxyType(self._spans[fuel])
 
-    def _get_empty_ev_slot(self) -> int | None:
-        """Return first vacant EV slot index, else None."""
-        for i, s in enumerate(self.evSlots):
-            if s.is_vacant:
-                return i
-        return None
+    def occupied(self, fuel: Fuel) -> Iterator[tuple[int, Any]]:
+        """(idx, vehicle) for every parked vehicle of a pool, by slot."""
+        for i, s in enumerate(self._pool(fuel)):
+            if s.vehicle is not None:
+                yield i, s.vehicle
+
+    def records(self, fuel: Fuel) -> CowList[dict[str, Any] | None]:
+        """Per-slot records of a pool as save_json() writes them (treat as read-only)."""
+        return self._encoded(fuel)
+
+    def _encoded(self, fuel: Fuel) -> CowList[dict[str, Any] | None]:
+        """Per-slot records for a pool, encoding only slots filled since the last export."""
+        records = self._records[fuel]
+        pending = self._unencoded[fuel]
+        if pending:
+            pool = self._pool(fuel)
+            spans = self._spans[fuel]
+            for idx in pending:
+                v = pool[idx].vehicle
+                rec = records[idx] = codec_for(v).encode(v)
+                if idx in spans:
+                    rec["bays"] = spans[idx]
+                entered = pool[idx].entered_at
+                if entered is not None:
+                    rec["entered"] = entered
+            pending.clear()
+        return records
+
+    def bays_for(self, kind: str) -> int:
+        """Adjacent bays a vehicle kind occupies (1 unless configured)."""
+        return self.bays_per_kind.get(kind, 1)
+
+    def bays_at(self, slot_ui: int, fuel: Fuel = "ICE") -> int:
+        """Bays taken by the vehicle whose run starts at this 1-based slot (1 if single)."""
+        return self._spans[fuel].get(slot_ui - 1, 1)
+
+    def _allocate(self, fuel: Fuel, bays: int) -> int | None:
+        """Start index chosen by the policy for a run of `bays` free slots, else None."""
+        runs = self._free[fuel]
+        if runs.largest < bays:
+            return None
+        start: int | None = self.policy(runs, bays)
+        return start
+
+    def set_layout(self, layout: Layout) -> None:
+        """
+        Attach slot coordinates and entrances (replacing any previous layout).
+        Raises:
+            ValueError: if the layout doesn't have one point per slot.
+        """
+        if len(layout.slots) != self.capacity or len(layout.evSlots) != self.ev_capacity:
+            raise ValueError("layout must give one point per ICE and EV slot")
+        near: dict[str, VacancyTree] = {}
+        pools: tuple[tuple[Fuel, list[Any]], ...] = (("ICE", layout.slots), ("EV", layout.evSlots))
+        for fuel, points in pools:
+            tree = near[fuel] = VacancyTree(points)
+            for i, s in enumerate(self._pool(fuel)):
+                if s.is_vacant and i not in self._held[fuel] and i not in self._reserved[fuel]:
+                    tree.release(i)
+        self.layout = layout
+        self._near = near
+
+    def nearest_free(self, fuel: Fuel, entrance: str) -> int | None:
+        """
+        0-based index of the vacant slot closest to a named entrance, else None.
+        Raises:
+            ValueError: if no layout is attached or the entrance is unknown.
+        """
+        if self.layout is None:
+            raise ValueError("no layout attached; pass layout= or call set_layout()")
+        if entrance not in self.layout.entrances:
+            raise ValueError(f"unknown entrance {entrance!r}")
+        idx: int | None = self._near[fuel].nearest(self.layout.entrances[entrance])
+        return idx
+
+    def fragmentation(self, fuel: Fuel = "ICE") -> FragmentationStats:
+        """Free bays, number of free runs and longest run for a pool."""
+        return self._free[fuel].stats()
 
     # ---------- API ----------
-    def park(self, spec: VehicleSpec) -> ParkResult:
-        """Park a vehicle. Returns ok/message and 1-based slot if successful."""
-        # minimal sanitize: trim strings so lookups behave predictably
-        spec = VehicleSpec(
+    def park(
+        self, spec: VehicleSpec, entrance: str | None = None, at: float | None = None
+    ) -> ParkResult:
+        """
+        Park a vehicle. Returns ok/message and 1-based slot if successful.
+        With a layout, entrance picks the free slot nearest that gate (single-bay
+        vehicles; multi-bay runs still come from the allocation policy).
+        at is the entry time (POSIX seconds, default: the service clock).
+        """
+        spec = self._clean(spec)
+        if not spec.regnum:
+            return {"ok": False, "message": "registration required", "slot_ui": None}
+        if self.before_allocate is not None:
+            self.before_allocate()
+
+        bays = self.bays_for(spec.kind)
+        if entrance is not None and bays == 1:
+            idx = self.nearest_free(spec.fuel, entrance)
+        else:
+            idx = self._allocate(spec.fuel, bays)
+        if idx is None:
+            if self._free[spec.fuel].free and bays > 1:
+                msg = f"Sorry, no {bays} adjacent free slots"
+            elif spec.fuel == "EV":
+                msg = "Sorry, EV lot is full"
+            else:
+                msg = "Sorry, parking lot is full"
+            return {"ok": False, "message": msg, "slot_ui": None}
+        return self._place(spec, idx, bays, at)
+
+    def park_at(self, spec: VehicleSpec, slot_ui: int, at: float | None = None) -> ParkResult:
+        """
+        Park a vehicle in a specific 1-based slot (the first of its run for
+        multi-bay kinds). Fails if any bay is taken or reservation-held.
+        """
+        spec = self._clean(spec)
+        if not spec.regnum:
+            return {"ok": False, "message": "registration required", "slot_ui": None}
+        if self.before_allocate is not None:
+            self.before_allocate()
+        idx = self._from_ui(slot_ui)
+        bays = self.bays_for(spec.kind)
+        if idx is None or not self._free[spec.fuel].is_free(idx, bays):
+            return {"ok": False, "message": f"Slot {slot_ui} is not available", "slot_ui": None}
+        return self._place(spec, idx, bays, at)
+
+    @staticmethod
+    def _clean(spec: VehicleSpec) -> VehicleSpec:
+        """Minimal sanitize: trim strings so lookups behave predictably."""
+        return VehicleSpec(
             regnum=spec.regnum.strip(),
             make=spec.make.strip(),
             model=spec.model.strip(),
@@ -107,244 +477,487 @@ class ParkingService:
             fuel=spec.fuel,
             kind=spec.kind,
         )
-        if not spec.regnum:
-            return {"ok": False, "message": "registration required", "slot_ui": None}
 
-        if spec.fuel == "EV":
-            idx = self._get_empty_ev_slot()
-            if idx is None:
-                return {"ok": False, "message": "Sorry, EV lot is full", "slot_ui": None}
-            entity = create_vehicle(spec.regnum, spec.make, spec.model, spec.color, spec.fuel, spec.kind)
-            self.evSlots[idx].occupy(entity)
-            ui = self._to_ui(idx)
-            return {"ok": True, "message": f"Allocated EV slot number: {ui}", "slot_ui": ui}
-
-        # ICE
-        idx = self._get_empty_slot()
-        if idx is None:
-            return {"ok": False, "message": "Sorry, parking lot is full", "slot_ui": None}
+    def _place(self, spec: VehicleSpec, idx: int, bays: int, at: float | None) -> ParkResult:
         entity = create_vehicle(spec.regnum, spec.make, spec.model, spec.color, spec.fuel, spec.kind)
-        self.slots[idx].occupy(entity)
+        self._occupy(spec.fuel, idx, entity, bays, self.clock() if at is None else at)
         ui = self._to_ui(idx)
-        return {"ok": True, "message": f"Allocated slot number: {ui}", "slot_ui": ui}
+        prefix = "Allocated EV slot" if spec.fuel == "EV" else "Allocated slot"
+        if bays > 1:
+            return {"ok": True, "message": f"{prefix}s {ui}-{ui + bays - 1}", "slot_ui": ui}
+        return {"ok": True, "message": f"{prefix} number: {ui}", "slot_ui": ui}
+
+    def _hold_idx(self, slot_ui: int, fuel: Fuel) -> int:
+        if not 1 <= slot_ui <= len(self._pool(fuel)):
+            raise ValueError(f"slot {slot_ui} out of range for {fuel}")
+        return slot_ui - 1
 
-    def leave(self, slot_ui: int, fuel: Fuel = "ICE") -> LeaveResult:
+    def hold(self, slot_ui: int, fuel: Fuel = "ICE") -> None:
         """
-        Free a slot by its 1-based UI number.
+        Keep a slot out of allocation (park/park_at) until unhold(); holds nest.
+        A held slot that is occupied stays unavailable after its vehicle leaves.
+        Raises:
+            ValueError: if slot_ui is outside 1..pool size.
+        """
+        idx = self._hold_idx(slot_ui, fuel)
+        reserved = self._reserved[fuel]
+        reserved[idx] = reserved.get(idx, 0) + 1
+        self._mark_taken(fuel, idx)
+
+    def unhold(self, slot_ui: int, fuel: Fuel = "ICE") -> None:
+        """Drop one hold on a slot; the last one makes a vacant slot allocatable again."""
+        idx = self._hold_idx(slot_ui, fuel)
+        reserved = self._reserved[fuel]
+        count = reserved.get(idx, 0)
+        if count > 1:
+            reserved[idx] = count - 1
+            return
+        reserved.pop(idx, None)
+        if self._pool(fuel)[idx].is_vacant and idx not in self._held[fuel]:
+            self._mark_free(fuel, idx)
+
+    def leave(self, slot_ui: int, fuel: Fuel = "ICE", at: float | None = None) -> LeaveResult:
+        """
+        Free a slot by its 1-based UI number at time `at` (default: the service
+        clock). The result carries the closed session, and its fee when a
+        tariff is set.
         NOTE: 'fuel' is temporarily optional for back-compat; pass explicitly where possible.
         """
         idx = self._from_ui(slot_ui)
         if idx is None:
             return {"ok": False, "message": "slot must be >= 1"}
-
-        if fuel == "EV":
-            if 0 <= idx < len(self.evSlots) and not self.evSlots[idx].is_vacant:
-                self.evSlots[idx].free()
-                return {"ok": True, "message": f"EV slot {slot_ui} is free"}
+        # any bay of a multi-bay span frees the whole vehicle
+        idx = self._held[fuel].get(idx, idx)
+        pool = self._pool(fuel)
+        if not (0 <= idx < len(pool)) or pool[idx].is_vacant:
             return {"ok": False, "message": "Slot empty or invalid"}
 
-        # ICE
-        if 0 <= idx < len(self.slots) and not self.slots[idx].is_vacant:
-            self.slots[idx].free()
-            return {"ok": True, "message": f"Slot {slot_ui} is free"}
-        return {"ok": False, "message": "Slot empty or invalid"}
+        session = self._vacate(fuel, idx, at)
+        prefix = "EV slot" if fuel == "EV" else "Slot"
+        res: LeaveResult = {"ok": True, "message": f"{prefix} {slot_ui} is free", "session": session}
+        if self.tariff is not None:
+            res["fee"] = self.tariff.price(session)
+        return res
+
+    def leave_by_reg(self, regnum: str, at: float | None = None) -> LeaveResult:
+        """
+        Free the slot held by a registration (for exit gates that only know
+        the plate). If the plate is parked more than once, ICE goes first,
+        then the lowest slot.
+        """
+        r = (regnum or "").strip()
+        entries = sorted(self._regs.slots(r), key=lambda e: (e[0] != "ICE", e[1])) if r else []
+        if not entries:
+            return {"ok": False, "message": f"Registration {r} is not parked"}
+        fuel, idx = entries[0]
+        return self.leave(self._to_ui(idx), fuel="EV" if fuel == "EV" else "ICE", at=at)
+
+    def set_charge(self, slot_ui: int, charge: int) -> bool:
+        """
+        Set the charge percent of the EV in a 1-based EV slot.
+        Returns False if the slot is empty or out of range.
+        Raises:
+            ValueError: if charge is outside 0..100.
+        """
+        if not 0 <= charge <= 100:  # noqa: PLR2004
+            raise ValueError("charge must be between 0 and 100")
+        idx = self._from_ui(slot_ui)
+        if idx is None or idx >= len(self.evSlots) or self.evSlots[idx].is_vacant:
+            return False
+        v = self.evSlots[idx].vehicle
+        v.charge = int(charge)
+        rec = self._records["EV"][idx]
+        if rec is not None:
+            self._records["EV"][idx] = {**rec, "charge": v.charge}
+        self._charges.update(idx, v.charge)
+        self._notify("charge", "EV", idx, v)
+        return True
 
     # ---------- Reporting ----------
-    def status_rows(self) -> list[StatusRow]:
-        """Tabular rows for ICE vehicles currently parked."""
-        rows: list[StatusRow] = []
-        for i, s in enumerate(self.slots):
-            v = s.vehicle
-            if v is not None:
-                rows.append(
-                    {
-                        "slot_ui": self._to_ui(i),
-                        "level": s.level,
-                        "regnum": v.regnum,
-                        "color": v.color,
-                        "make": v.make,
-                        "model": v.model,
-                    }
-                )
+    def _status_rows(self, fuel: Fuel) -> list[StatusRow]:
+        rows: list[StatusRow] | None = self._views.get(fuel)
+        if rows is None:
+            rows = self._views[fuel] = [
+                {
+                    "slot_ui": self._to_ui(i),
+                    "level": s.level,
+                    "regnum": s.vehicle.regnum,
+                    "color": s.vehicle.color,
+                    "make": s.vehicle.make,
+                    "model": s.vehicle.model,
+                }
+                for i, s in enumerate(self._pool(fuel))
+                if s.vehicle is not None
+            ]
         return rows
 
+    def status_rows(self) -> list[StatusRow]:
+        """
+        Tabular rows for ICE vehicles currently parked. The list is cached
+        until the next ICE park/leave, so treat it as read-only.
+        """
+        return self._status_rows("ICE")
+
     def ev_status_rows(self) -> list[StatusRow]:
-        """Tabular rows for EV vehicles currently parked."""
+        """Tabular rows for EV vehicles currently parked (cached like status_rows())."""
+        return self._status_rows("EV")
+
+    def status_page(
+        self,
+        fuel: Fuel = "ICE",
+        sort: str = "slot",
+        after: str | None = None,
+        limit: int = 50,
+    ) -> StatusPage:
+        """
+        One page of status rows ordered by sort (then slot), starting after
+        the cursor returned with the previous page. Cursors stay valid while
+        vehicles park and leave; a page costs O(log n + limit).
+        Raises:
+            ValueError: for an unknown sort key or a malformed cursor.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"cannot sort by {sort!r} (choose from {', '.join(SORT_KEYS)})")
+        start = None if after is None else decode_cursor(after)
+        pool = self._pool(fuel)
+        if not self._sorted.built(fuel, sort):
+            occupied = [(i, s.vehicle) for i, s in enumerate(pool) if s.vehicle is not None]
+            self._sorted.build(fuel, sort, occupied)
+        idxs, more = self._sorted.page(fuel, sort, start, limit)
         rows: list[StatusRow] = []
-        for i, s in enumerate(self.evSlots):
-            v = s.vehicle
-            if v is not None:
-                rows.append(
-                    {
-                        "slot_ui": self._to_ui(i),
-                        "level": s.level,
-                        "regnum": v.regnum,
-                        "color": v.color,
-                        "make": v.make,
-                        "model": v.model,
-                    }
-                )
-        return rows
+        for i in idxs:
+            v = pool[i].vehicle
+            rows.append({
+                "slot_ui": self._to_ui(i),
+                "level": pool[i].level,
+                "regnum": v.regnum,
+                "color": v.color,
+                "make": v.make,
+                "model": v.model,
+            })
+        cursor = None
+        if more and idxs:
+            last = idxs[-1]
+            cursor = encode_cursor(SortIndex.value(sort, pool[last].vehicle), last)
+        return {"rows": rows, "next": cursor}
+
+    def _charge_row(self, idx: int) -> dict[str, Any]:
+        """One ev_charge_rows() row for an occupied 0-based EV slot."""
+        s = self.evSlots[idx]
+        v = s.vehicle
+        row = {
+            "slot_ui": self._to_ui(idx),
+            "level": s.level,
+            "regnum": v.regnum,
+            "charge": v.charge,
+        }
+        if self.charge_power is not None:
+            row["power_kw"] = self.charge_power(idx)
+        return row
 
     def ev_charge_rows(self) -> list[dict[str, Any]]:
-        """Rows for EV charge status (slot, level, reg, charge%)."""
-        rows: list[dict[str, Any]] = []
-        for i, s in enumerate(self.evSlots):
-            v = s.vehicle
-            if v is not None:
-                rows.append(
-                    {
-                        "slot_ui": self._to_ui(i),
-                        "level": s.level,
-                        "regnum": v.regnum,
-                        "charge": v.charge,
-                    }
-                )
+        """
+        Rows for EV charge status (slot, level, reg, charge%), plus power_kw
+        when a charge scheduler is attached. Cached until the next EV change
+        (read-only); not cached while a scheduler is attached, since power
+        allocations change without events.
+        """
+        if self.charge_power is not None:
+            return [self._charge_row(i) for i, s in enumerate(self.evSlots) if s.vehicle is not None]
+        rows: list[dict[str, Any]] | None = self._views.get("charge")
+        if rows is None:
+            rows = self._views["charge"] = [
+                self._charge_row(i) for i, s in enumerate(self.evSlots) if s.vehicle is not None
+            ]
         return rows
 
+    def lowest_charge(self, k: int) -> list[dict[str, Any]]:
+        """The k EVs with the lowest charge (ties by slot), as ev_charge_rows() rows."""
+        return [self._charge_row(i) for i in islice(self._charges.ascending(), max(k, 0))]
+
+    def charge_between(self, lo: int, hi: int) -> list[dict[str, Any]]:
+        """EVs with lo <= charge <= hi, lowest charge first, as ev_charge_rows() rows."""
+        return [self._charge_row(i) for i in self._charges.ascending(lo, hi)]
+
+    # ---------- Aggregates ----------
+    @staticmethod
+    def _counts(capacity: int, occupied: int) -> OccupancyCounts:
+        pct = round(100.0 * occupied / capacity, 2) if capacity else 0.0
+        return {
+            "capacity": capacity,
+            "occupied": occupied,
+            "free": capacity - occupied,
+            "occupancy_pct": pct,
+        }
+
+    def summary(self, histograms: bool = True) -> LotSummary:
+        """
+        Occupancy per pool and overall, plus per-attribute histograms of parked
+        vehicles. Read from the counters the indexes keep up to date on
+        park/leave, so cost is O(distinct values), not O(capacity).
+        Occupied counts every bay a vehicle covers; reservation holds on
+        vacant slots are reported separately as reserved.
+        """
+        pools: dict[str, PoolSummary] = {}
+        sizes: tuple[tuple[Fuel, int], ...] = (("ICE", self.capacity), ("EV", self.ev_capacity))
+        for fuel, capacity in sizes:
+            frag = self.fragmentation(fuel)
+            vehicles = sum(self._index.counts(fuel, "kind").values())
+            occupied = vehicles + len(self._held[fuel])  # plus the extra bays of multi-bay runs
+            pool: PoolSummary = {**self._counts(capacity, occupied)}
+            pool["reserved"] = capacity - occupied - frag["free"]
+            pool["fragmentation"] = frag
+            if histograms:
+                pool["by_kind"] = self._index.counts(fuel, "kind")
+                pool["by_make"] = self._index.counts(fuel, "make")
+                pool["by_model"] = self._index.counts(fuel, "model")
+                pool["by_color"] = self._index.counts(fuel, "color")
+            pools[fuel] = pool
+        return {
+            "level": self.level,
+            "ice": pools["ICE"],
+            "ev": pools["EV"],
+            "total": self._counts(
+                self.capacity + self.ev_capacity,
+                pools["ICE"]["occupied"] + pools["EV"]["occupied"],
+            ),
+        }
+
     # ---------- Finders ----------
+    def _find(self, fuel: Fuel, field: str, value: str) -> list[int]:
+        """Sorted 1-based slot numbers in one pool where vehicle.<field> == value."""
+        v = (value or "").strip()
+        if not v:
+            return []
+        return [self._to_ui(i) for i in sorted(self._index.postings(fuel, field, v))]
+
     def ev_slots_by_make(self, make: str) -> list[int]:
         """Return 1-based EV slot numbers where vehicle.make == make."""
-        out: list[int] = []
-        m = (make or "").strip()
-        if not m:
-            return out
-        for i, s in enumerate(self.evSlots):
-            v = s.vehicle
-            if v is not None and str(v.make) == m:
-                out.append(self._to_ui(i))
-        return out
+        return self._find("EV", "make", make)
 
     def ev_slots_by_model(self, model: str) -> list[int]:
         """Return 1-based EV slot numbers where vehicle.model == model."""
-        out: list[int] = []
-        md = (model or "").strip()
-        if not md:
-            return out
-        for i, s in enumerate(self.evSlots):
-            v = s.vehicle
-            if v is not None and str(v.model) == md:
-                out.append(self._to_ui(i))
-        return out
+        return self._find("EV", "model", model)
 
     def slots_by_make(self, make: str) -> list[int]:
         """Return 1-based ICE slot numbers where vehicle.make == make."""
-        out: list[int] = []
-        m = (make or "").strip()
-        if not m:
-            return out
-        for i, s in enumerate(self.slots):
-            v = s.vehicle
-            if v is not None and str(v.make) == m:
-                out.append(self._to_ui(i))
-        return out
+        return self._find("ICE", "make", make)
 
     def slots_by_model(self, model: str) -> list[int]:
         """Return 1-based ICE slot numbers where vehicle.model == model."""
-        out: list[int] = []
-        md = (model or "").strip()
-        if not md:
-            return out
-        for i, s in enumerate(self.slots):
-            v = s.vehicle
-            if v is not None and str(v.model) == md:
-                out.append(self._to_ui(i))
-        return out
+        return self._find("ICE", "model", model)
 
     def all_slots_by_color(self, color: str) -> list[int]:
         """Return 1-based slot numbers (ICE+EV) where vehicle.color == color."""
-        out: list[int] = []
-        c = (color or "").strip()
-        if not c:
-            return out
-        for i, s in enumerate(self.slots):
-            v = s.vehicle
-            if v is not None and str(v.color) == c:
-                out.append(self._to_ui(i))
-        for i, s in enumerate(self.evSlots):
-            v = s.vehicle
-            if v is not None and str(v.color) == c:
-                out.append(self._to_ui(i))
-        return out
+        return self._find("ICE", "color", color) + self._find("EV", "color", color)
 
     def all_regnums_by_color(self, color: str) -> list[str]:
         """Return registration numbers (ICE+EV) where vehicle.color == color."""
-        regs: list[str] = []
         c = (color or "").strip()
         if not c:
-            return regs
-        for s in self.slots:
-            v = s.vehicle
-            if v is not None and str(v.color) == c:
-                regs.append(str(v.regnum))
-        for s in self.evSlots:
-            v = s.vehicle
-            if v is not None and str(v.color) == c:
-                regs.append(str(v.regnum))
+            return []
+        regs: list[str] = []
+        for fuel, pool in (("ICE", self.slots), ("EV", self.evSlots)):
+            for i in sorted(self._index.postings(fuel, "color", c)):
+                regs.append(str(pool[i].vehicle.regnum))
         return regs
-        # --- Registration finders (ICE + EV) ---
+
+    # --- Registration finders (ICE + EV) ---
     def all_slots_by_reg(self, regnum: str) -> list[int]:
         """Return 1-based slot numbers for any vehicle whose regnum matches (ICE+EV)."""
-        out: list[int] = []
+        return [slot_ui for _, slot_ui in self.reg_slots(regnum)]
+
+    def reg_slots(self, regnum: str) -> list[tuple[Fuel, int]]:
+        """(fuel, 1-based slot) for every exact regnum match, ICE first, then by slot."""
         r = (regnum or "").strip()
         if not r:
-            return out
-        for i, s in enumerate(self.slots):
-            v = s.vehicle
-            if v is not None and str(v.regnum) == r:
-                out.append(self._to_ui(i))
-        for i, s in enumerate(self.evSlots):
-            v = s.vehicle
-            if v is not None and str(v.regnum) == r:
-                out.append(self._to_ui(i))
-        return out
+            return []
+        entries = sorted(self._regs.slots(r), key=lambda e: (e[0] != "ICE", e[1]))
+        return [("EV" if f == "EV" else "ICE", self._to_ui(i)) for f, i in entries]
 
     def first_slot_by_reg(self, regnum: str) -> int | None:
         """Return the first matching 1-based slot number, or None."""
         slots = self.all_slots_by_reg(regnum)
         return slots[0] if slots else None
 
-    # --- Persistence / Export ---
+    def search_reg(self, text: str, *, limit: int = 10, max_distance: int = 1) -> list[RegMatch]:
+        """
+        Ranked registration candidates for partial or misread plates (ANPR):
+        exact, then prefix, then substring, then fuzzy matches within
+        max_distance edits (closest first). One row per occupied slot, at most
+        limit rows; later match kinds are only computed if earlier ones did not
+        fill the limit.
+        """
+        q = (text or "").strip()
+        if not q or limit <= 0:
+            return []
+        regs = self._regs
+        ranked: dict[str, tuple[Literal["exact", "prefix", "substring", "fuzzy"], int]] = {}
+        if regs.slots(q):
+            ranked[q] = ("exact", 0)
+        for r in regs.prefix(q, limit + 1):
+            ranked.setdefault(r, ("prefix", 0))
+        if len(ranked) < limit:
+            for r in regs.substring(q):
+                ranked.setdefault(r, ("substring", 0))
+        if len(ranked) < limit:
+            for r, d in regs.fuzzy(q, max_distance):
+                ranked.setdefault(r, ("fuzzy", d))
+        out: list[RegMatch] = []
+        for r, (match, d) in ranked.items():
+            for fuel, i in sorted(regs.slots(r), key=lambda e: (e[0] != "ICE", e[1])):
+                out.append(
+                    {
+                        "regnum": r,
+                        "slot_ui": self._to_ui(i),
+                        "fuel": "EV" if fuel == "EV" else "ICE",
+                        "match": match,
+                        "distance": d,
+                    }
+                )
+                if len(out) >= limit:
+                    return out
+        return out
 
-    def to_dict(self) -> dict:
-        """Serialize lot state to a plain dict (JSON-safe)."""
-        def veh2d(v):
-            if v is None:
-                return None
-            # Determine fuel by presence of 'charge' attribute (EV) vs not (ICE)
-            fuel = "EV" if hasattr(v, "charge") else "ICE"
-            # Map concrete class to kind
-            cls = v.__class__.__name__
-            if fuel == "EV":
-                kind = "CAR" if "Car" in cls else "MOTORCYCLE"
-            else:
-                if "Truck" in cls:
-                    kind = "TRUCK"
-                elif "Bus" in cls:
-                    kind = "BUS"
-                elif "Motorcycle" in cls:
-                    kind = "MOTORCYCLE"
-                else:
-                    kind = "CAR"
-            out = {
+    # ---------- Query engine ----------
+    def query(  # noqa: PLR0913
+        self,
+        *,
+        fuel: Fuel | None = None,
+        kind: Kind | None = None,
+        make: str | None = None,
+        color: str | None = None,
+        model: str | None = None,
+        regnum_prefix: str | None = None,
+    ) -> Iterator[QueryRow]:
+        """
+        Stream occupied slots matching every given predicate (blank/None = any),
+        ICE first then EV, in slot order within each pool.
+        Plan per pool: drive from the smallest candidate set (a postings list or
+        the regnum prefix range) and probe the others by membership, so cost is
+        O(smallest + output) rather than a full scan per predicate.
+        Raises:
+            ValueError: for an unknown fuel or kind.
+        """
+        if fuel is not None and fuel not in ("ICE", "EV"):
+            raise ValueError(f"Unknown fuel: {fuel}")
+        if kind is not None and kind not in ("CAR", "MOTORCYCLE", "BUS", "TRUCK"):
+            raise ValueError(f"Unknown kind: {kind}")
+        equals = {
+            f: v.strip()
+            for f, v in (("kind", kind), ("make", make), ("color", color), ("model", model))
+            if v is not None and v.strip()
+        }
+        prefix = (regnum_prefix or "").strip()
+        fuels: tuple[Fuel, ...] = (fuel,) if fuel else ("ICE", "EV")
+        for f in fuels:
+            yield from self._query_pool(f, equals, prefix)
+
+    def _query_pool(self, fuel: Fuel, equals: dict[str, str], prefix: str) -> Iterator[QueryRow]:
+        """Evaluate one pool of query(): pick the driving set, probe the rest."""
+        index = self._index
+        candidates: list[set[int]] = [index.postings(fuel, f, v) for f, v in equals.items()]
+        if prefix:
+            lo, hi = self._regs.prefix_range(prefix)
+            if not candidates or hi - lo < min(len(c) for c in candidates):
+                candidates.append({
+                    i for r in self._regs.prefix(prefix)
+                    for f, i in self._regs.slots(r) if f == fuel
+                })
+                prefix = ""  # fully applied by the driving set
+        if not candidates:
+            candidates.append(index.occupied(fuel))
+        candidates.sort(key=len)
+        driver, probes = candidates[0], candidates[1:]
+        pool = self._pool(fuel)
+        for i in sorted(driver):
+            if not all(i in p for p in probes):
+                continue
+            s = pool[i]
+            v = s.vehicle
+            if prefix and not str(v.regnum).startswith(prefix):
+                continue
+            yield {
+                "slot_ui": self._to_ui(i),
+                "level": s.level,
+                "fuel": fuel,
+                "kind": codec_for(v).kind,
                 "regnum": v.regnum,
+                "color": v.color,
                 "make": v.make,
                 "model": v.model,
-                "color": v.color,
-                "fuel": fuel,
-                "kind": kind,
             }
-            if fuel == "EV":
-                out["charge"] = getattr(v, "charge", 0)
-            return out
 
+    def memory_report(self) -> MemoryReport:
+        """
+        Deep size of the lot's state by component (see memory.deep_sizeof).
+        Walks every object, so it costs O(size); meant for diagnostics and
+        soak tests rather than hot paths.
+        """
+        seen: set[int] = set()
+        vehicles = [s.vehicle for s in (*self.slots, *self.evSlots) if s.vehicle is not None]
+        sizes = {
+            "vehicles": deep_sizeof(vehicles, seen),
+            "slots": deep_sizeof([self.slots, self.evSlots], seen),
+            "slot_index": deep_sizeof([self._index], seen),
+            "reg_index": deep_sizeof([self._regs], seen),
+            "charge_index": deep_sizeof([self._charges], seen),
+            "sort_index": deep_sizeof([self._sorted], seen),
+            "free_runs": deep_sizeof([self._free], seen),
+            "placement": deep_sizeof(
+                [self._spans, self._held, self._reserved, self._near, self.layout], seen
+            ),
+            "caches": deep_sizeof([self._records, self._unencoded, self._views], seen),
+        }
+        total = sum(sizes.values())
+        n_slots = self.capacity + self.ev_capacity
         return {
+            "slots": n_slots,
+            "vehicles": len(vehicles),
+            "bytes": sizes,
+            "total_bytes": total,
+            "bytes_per_slot": round(total / n_slots, 1) if n_slots else 0.0,
+            "bytes_per_vehicle": round(sizes["vehicles"] / len(vehicles), 1) if vehicles else 0.0,
+        }
+
+    # --- Persistence / Export ---
+
+    def to_dict(self) -> dict:
+        """Serialize lot state to a plain dict (JSON-safe)."""
+        data = {
+            "revision": self.revision,
             "level": self.level,
             "capacity": self.capacity,
             "ev_capacity": self.ev_capacity,
-            "slots": [veh2d(s.vehicle) for s in self.slots],
-            "evSlots": [veh2d(s.vehicle) for s in self.evSlots],
+            "slots": [None if r is None else r.copy() for r in self._encoded("ICE")],
+            "evSlots": [
+                None if r is None else {**r, "charge": s.vehicle.charge}
+                for r, s in zip(self._encoded("EV"), self.evSlots, strict=True)
+            ],
         }
+        if self.bays_per_kind:
+            data["bays_per_kind"] = dict(self.bays_per_kind)
+        if self.layout is not None:
+            data["layout"] = self.layout.to_dict()
+        return data
+
+    def snapshot(self) -> LotSnapshot:
+        """
+        Frozen view of the lot for exports (to_dict/to_csv_rows/save_json/
+        save_csv) that may run on another thread while park/leave continue.
+        Shares the encoded records copy-on-write (see snapshot.CowList), so
+        the cost is encoding vehicles parked since the last export, not a
+        copy of the lot. EV charges are as of the last set_charge().
+        """
+        records = {fuel: self._encoded(fuel).freeze() for fuel in ("ICE", "EV")}
+        return LotSnapshot(
+            revision=self.revision,
+            version=self.version,
+            level=self.level,
+            records=records,
+            bays_per_kind=dict(self.bays_per_kind),
+            layout=self.layout,
+        )
 
     @classmethod
     def from_dict(cls, data: dict) -> "ParkingService":
@@ -353,31 +966,29 @@ class ParkingService:
             capacity=int(data.get("capacity", 0)),
             ev_capacity=int(data.get("ev_capacity", 0)),
             level=int(data.get("level", 1)),
+            bays_per_kind=data.get("bays_per_kind"),
         )
-        # Recreate vehicles via factory and occupy slots in order
-        from vehicle_factory import create as create_vehicle  # local import to avoid cycles
-        for i, v in enumerate(data.get("slots", [])):
-            if v:
-                entity = create_vehicle(
-                    v["regnum"], v["make"], v["model"], v["color"], v["fuel"], v["kind"]
-                )
-                svc.slots[i].occupy(entity)
-        for i, v in enumerate(data.get("evSlots", [])):
-            if v:
-                entity = create_vehicle(
-                    v["regnum"], v["make"], v["model"], v["color"], v["fuel"], v["kind"]
-                )
-                # Preserve EV charge if present
-                if "charge" in v:
-                    setattr(entity, "charge", int(v["charge"]))
-                svc.evSlots[i].occupy(entity)
+        svc.revision = int(data.get("revision", 0))
+        layout = data.get("layout")
+        # Recreate vehicles via their codec and occupy slots in order
+        pools: tuple[tuple[Fuel, str], ...] = (("ICE", "slots"), ("EV", "evSlots"))
+        for fuel, key in pools:
+            for i, v in enumerate(data.get(key, [])):
+                if v:
+                    vehicle = codec_for_spec(v["fuel"], v["kind"]).decode(v)
+                    svc._occupy(fuel, i, vehicle, int(v.get("bays", 1)), v.get("entered"))
+        if layout is not None:
+            svc.set_layout(Layout.from_dict(layout))
         return svc
 
     def save_json(self, path: str) -> None:
-        """Write the current lot to a JSON file."""
-        import json
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, indent=2)
+        """
+        Write the current lot to a JSON file as the next revision. The file is
+        replaced atomically, so concurrent readers never see a partial write.
+        """
+        from lot_file import atomic_write_json
+        self.revision += 1
+        atomic_write_json(path, self.to_dict())
 
     @classmethod
     def load_json(cls, path: str) -> "ParkingService":
@@ -387,6 +998,15 @@ class ParkingService:
             data = json.load(f)
         return cls.from_dict(data)
 
+    def to_columns(self) -> dict[str, Any]:
+        """
+        NumPy arrays of the lot, one row per slot (see columns.to_columns).
+        Requires the optional numpy dependency.
+        """
+        from columns import to_columns
+        cols: dict[str, Any] = to_columns(self)
+        return cols
+
     def to_csv_rows(self, include_ev: bool = True) -> list[list[str]]:
         """
         Return a combined CSV-like table:
@@ -394,17 +1014,12 @@ class ParkingService:
         """
         header = ["slot_ui", "level", "regnum", "color", "make", "model", "fuel"]
         rows: list[list[str]] = [header]
-        for r in self.status_rows():
-            rows.append([
-                str(r["slot_ui"]), str(r["level"]), r["regnum"],
-                r["color"], r["make"], r["model"], "ICE",
-            ])
-        if include_ev:
-            for r in self.ev_status_rows():
-                rows.append([
-                    str(r["slot_ui"]), str(r["level"]), r["regnum"],
-                    r["color"], r["make"], r["model"], "EV",
-                ])
+        level = str(self.level)
+        fuels: tuple[Fuel, ...] = ("ICE", "EV") if include_ev else ("ICE",)
+        for fuel in fuels:
+            for i, r in enumerate(self._encoded(fuel)):
+                if r is not None:
+                    rows.append([str(self._to_ui(i)), level, *csv_cells(r)])
         return rows
 
     def save_csv(self, path: str, include_ev: bool = True) -> None:
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+
+Entry = tuple[str, int]  # (fuel, 0-based slot index)
+
+GRAM = 3  # substring index granularity (trigrams)
+MAX_EDITS = 2  # largest edit distance fuzzy() accepts
+
+
+def _grams(s: str) -> set[str]:
+    return {s[i:i + GRAM] for i in range(len(s) - GRAM + 1)}
+
+
+class RegIndex:
+    """
+    Registration-number index over occupied slots (both pools):
+    - exact:     regnum -> slots, dict lookup
+    - prefix:    bisect over a sorted list of distinct regnums
+    - substring: trigram postings intersected smallest-first, then verified
+    - fuzzy:     edit neighbourhood of the query probed against the exact map
+                 (no per-plate variants are stored, so memory stays O(plates))
+    Kept in sync by ParkingService on every occupy/vacate.
+    """
+
+    def __init__(self) -> None:
+        self._slots: dict[str, set[Entry]] = {}
+        self._sorted: list[str] = []
+        self._grams: dict[str, set[str]] = {}
+        self._alphabet: dict[str, int] = {}  # char -> number of plates using it
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # ---------- maintenance ----------
+    def add(self, regnum: str, fuel: str, idx: int) -> None:
+        entries = self._slots.get(regnum)
+        if entries is None:
+            entries = self._slots[regnum] = set()
+            insort(self._sorted, regnum)
+            for g in _grams(regnum):
+                self._grams.setdefault(g, set()).add(regnum)
+            for ch in set(regnum):
+                self._alphabet[ch] = self._alphabet.get(ch, 0) + 1
+        entries.add((fuel, idx))
+
+    def remove(self, regnum: str, fuel: str, idx: int) -> None:
+        entries = self._slots.get(regnum)
+        if entries is None:
+            return
+        entries.discard((fuel, idx))
+        if entries:
+            return
+        del self._slots[regnum]
+        pos = bisect_left(self._sorted, regnum)
+        if pos < len(self._sorted) and self._sorted[pos] == regnum:
+            del self._sorted[pos]
+        for g in _grams(regnum):
+            plates = self._grams[g]
+            plates.discard(regnum)
+            if not plates:
+                del self._grams[g]
+        for ch in set(regnum):
+            self._alphabet[ch] -= 1
+            if not self._alphabet[ch]:
+                del self._alphabet[ch]
+
+    # ---------- lookups ----------
+    def slots(self, regnum: str) -> set[Entry]:
+        """(fuel, idx) entries for an exact regnum (treat as read-only)."""
+        return self._slots.get(regnum, set())
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        """[lo, hi) positions in the sorted regnum list that start with prefix."""
+        if not prefix:
+            return 0, len(self._sorted)
+        lo = bisect_left(self._sorted, prefix)
+        # upper bound: first key past every string that starts with prefix
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return lo, bisect_left(self._sorted, upper, lo)
+
+    def prefix(self, prefix: str, limit: int | None = None) -> Iterator[str]:
+        """Distinct regnums starting with prefix, in sorted order."""
+        lo, hi = self.prefix_range(prefix)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        for i in range(lo, hi):
+            yield self._sorted[i]
+
+    def substring(self, text: str) -> list[str]:
+        """Distinct regnums containing text, sorted."""
+        if not text:
+            return []
+        if len(text) < GRAM:
+            # too short for the gram index; such queries match broadly anyway
+            return [r for r in self._sorted if text in r]
+        postings = []
+        for g in _grams(text):
+            plates = self._grams.get(g)
+            if not plates:
+                return []
+            postings.append(plates)
+        postings.sort(key=len)
+        driver, rest = postings[0], postings[1:]
+        return sorted(r for r in driver if all(r in p for p in rest) and text in r)
+
+    def fuzzy(self, text: str, max_distance: int = 1) -> list[tuple[str, int]]:
+        """
+        Regnums within max_distance edits of text as (regnum, distance), closest
+        first. Distance 1 costs O(|text| * alphabet) dict probes, independent of
+        how many plates are indexed; distance 2 squares that, so keep it for
+        offline/batch use.
+        Raises:
+            ValueError: if max_distance is outside 0..MAX_EDITS.
+        """
+        if not 0 <= max_distance <= MAX_EDITS:
+            raise ValueError(f"max_distance must be between 0 and {MAX_EDITS}")
+        if not text:
+            return []
+        alphabet = "".join(self._alphabet)
+        found: dict[str, int] = {}
+        frontier = {text}
+        seen = {text}
+        for d in range(max_distance + 1):
+            for cand in frontier:
+                if cand in self._slots and cand not in found:
+                    found[cand] = d
+            if d == max_distance:
+                break
+            nxt: set[str] = set()
+            for cand in frontier:
+                nxt.update(_edits1(cand, alphabet))
+            frontier = nxt - seen
+            seen |= frontier
+        return sorted(found.items(), key=lambda kv: (kv[1], kv[0]))
+
+
+def _edits1(s: str, alphabet: str) -> set[str]:
+    """All strings one edit (incl. adjacent swap) away from s over alphabet."""
+    splits = [(s[:i], s[i:]) for i in range(len(s) + 1)]
+    out = {a + b[1:] for a, b in splits if b}
+    out.update(a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1)
+    out.update(a + c + b[1:] for a, b in splits if b for c in alphabet if c != b[0])
+    out.update(a + c + b for a, b in splits for c in alphabet)
+    return out
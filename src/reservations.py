@@ -0,0 +1,307 @@
+"""
+Time-windowed slot reservations on top of ParkingService.
+
+Each slot keeps its bookings as a sorted list of non-overlapping
+(start, end, id) intervals, so "is this slot free from s to e" is one
+bisect. Slots with no booking at all are tracked in a FreeRuns tree per
+pool, so booking "any slot" finds the lowest unbooked one in O(log n).
+Booked slots are summarised in a BookedSpans tree (edges, longest gap and
+the spans in which all of them are booked), so once every slot has a
+booking the search still descends only into subtrees that can hold the
+window.
+
+A heap of hold/expire events drives ParkingService.hold()/unhold(): from
+`lead` seconds before a booking starts until it ends (or is claimed or
+cancelled) the slot is skipped by park(), so walk-ins can't take it.
+Events are applied lazily before each allocation, so nothing runs on a
+timer.
+
+Times are POSIX timestamps (seconds); the clock is injectable for tests.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from allocation import FreeRuns
+
+if TYPE_CHECKING:
+    from parking_service import Fuel, ParkingService, ParkResult, VehicleSpec
+
+DEFAULT_LEAD_S = 3600.0  # slot is withheld from walk-ins this long before a booking
+INF = float("inf")
+
+Interval = tuple[float, float, int]  # (start, end, reservation id)
+
+
+Span = tuple[float, float]  # [start, end)
+ALWAYS: list[Span] = [(-INF, INF)]
+
+
+def _intersect(a: list[Span], b: list[Span]) -> list[Span]:
+    """Common part of two sorted lists of disjoint spans."""
+    out: list[Span] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo, hi = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if lo < hi:
+            out.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+class BookedSpans:
+    """
+    Segment tree over one pool's booked slots. Each node keeps the latest
+    first-booking start, the earliest last-booking end and the longest gap
+    between consecutive bookings of the slots below it, plus the spans in
+    which every one of those slots is booked. candidates() descends only
+    into subtrees where some slot could hold a window [s, e): one whose
+    bookings all end by s or all start at or after e, or that has a gap of
+    at least e - s, and only while the window misses the spans the whole
+    subtree is booked. Slots without bookings never match (ReservationBook
+    finds those in its FreeRuns). Pruning is a heuristic. A window in which
+    every slot is booked, but at no moment shared by a whole subtree, still
+    visits each slot.
+    """
+
+    def __init__(self, n: int) -> None:
+        size = 1
+        while size < max(n, 1):
+            size *= 2
+        self._size = size
+        self._first = [-INF] * (2 * size)  # max over slots of the earliest booking start
+        self._last = [INF] * (2 * size)  # min over slots of the latest booking end
+        self._gap = [-INF] * (2 * size)  # max over slots of the longest gap between bookings
+        self._busy = [ALWAYS] * (2 * size)  # spans in which every slot below is booked
+
+    def set(self, idx: int, intervals: list[Interval]) -> None:
+        """Re-summarise one slot from its sorted bookings (empty: never matches)."""
+        node = self._size + idx
+        if intervals:
+            self._first[node] = intervals[0][0]
+            self._last[node] = intervals[-1][1]
+            self._gap[node] = max((b[0] - a[1] for a, b in itertools.pairwise(intervals)), default=-INF)
+            busy: list[Span] = []
+            for start, end, _ in intervals:
+                if busy and busy[-1][1] == start:  # back-to-back bookings
+                    busy[-1] = (busy[-1][0], end)
+                else:
+                    busy.append((start, end))
+            self._busy[node] = busy
+        else:
+            self._first[node], self._last[node], self._gap[node] = -INF, INF, -INF
+            self._busy[node] = ALWAYS
+        while node > 1:
+            node //= 2
+            left, right = 2 * node, 2 * node + 1
+            summary = (
+                max(self._first[left], self._first[right]),
+                min(self._last[left], self._last[right]),
+                max(self._gap[left], self._gap[right]),
+                _intersect(self._busy[left], self._busy[right]),
+            )
+            if summary == (self._first[node], self._last[node], self._gap[node], self._busy[node]):
+                break  # nothing above changes either
+            self._first[node], self._last[node], self._gap[node], self._busy[node] = summary
+
+    def candidates(self, start: float, end: float) -> Iterator[int]:
+        """
+        Booked slots that may fit [start, end), in slot order. A slot found
+        through its latest end or earliest start is free for the window. One
+        found through its longest gap still needs an exact check.
+        """
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            if not (self._last[node] <= start or self._first[node] >= end
+                    or self._gap[node] >= end - start):
+                continue
+            busy = self._busy[node]
+            pos = bisect_left(busy, (end,))
+            if pos and busy[pos - 1][1] > start:  # every slot below is booked inside the window
+                continue
+            if node >= self._size:
+                yield node - self._size
+            else:
+                stack += (2 * node + 1, 2 * node)
+
+
+@dataclass(frozen=True)
+class Reservation:
+    id: int
+    fuel: Fuel
+    slot_ui: int
+    start: float
+    end: float
+    regnum: str = ""
+
+
+class ReservationBook:
+    """Bookings for one ParkingService (attach once; detach with close())."""
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        lead_s: float = DEFAULT_LEAD_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._svc = svc
+        self.lead_s = float(lead_s)
+        self._clock = clock
+        self._ids = itertools.count(1)
+        self._by_id: dict[int, Reservation] = {}
+        self._intervals: dict[tuple[str, int], list[Interval]] = {}  # (fuel, idx) -> sorted
+        self._events: list[tuple[float, int, int]] = []  # (when, 0=hold/1=expire, id)
+        self._holding: set[int] = set()  # ids whose slot is currently held
+        self._unbooked = {"ICE": FreeRuns(svc.capacity), "EV": FreeRuns(svc.ev_capacity)}
+        self._booked = {"ICE": BookedSpans(svc.capacity), "EV": BookedSpans(svc.ev_capacity)}
+        svc.before_allocate = self.advance
+
+    def close(self) -> None:
+        """Release every hold and stop gating park()."""
+        for rid in list(self._holding):
+            self._release(rid)
+        if self._svc.before_allocate == self.advance:
+            self._svc.before_allocate = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, rid: int) -> Reservation | None:
+        return self._by_id.get(rid)
+
+    # ---------- availability ----------
+    def is_available(self, fuel: Fuel, slot_ui: int, start: float, end: float) -> bool:
+        """True if no booking on the slot overlaps [start, end)."""
+        intervals = self._intervals.get((fuel, slot_ui - 1))
+        if not intervals:
+            return True
+        pos = bisect_left(intervals, (start,))
+        if pos < len(intervals) and intervals[pos][0] < end:
+            return False
+        return not (pos > 0 and intervals[pos - 1][1] > start)
+
+    def available_slots(self, fuel: Fuel, start: float, end: float) -> Iterator[int]:
+        """
+        1-based slots of a pool with no overlapping booking: unbooked slots
+        first (O(log n) each), then booked ones that fit, in slot order,
+        from a descent of the BookedSpans tree that prunes subtrees which
+        can't hold the window.
+        """
+        unbooked = self._unbooked[fuel]
+        idx = unbooked.next_free(0)
+        while idx is not None:
+            yield idx + 1
+            idx = unbooked.next_free(idx + 1)
+        for idx in self._booked[fuel].candidates(start, end):
+            if self.is_available(fuel, idx + 1, start, end):
+                yield idx + 1
+
+    # ---------- booking ----------
+    def reserve(
+        self,
+        fuel: Fuel,
+        start: float,
+        end: float,
+        slot_ui: int | None = None,
+        regnum: str = "",
+    ) -> Reservation | None:
+        """
+        Book a slot (a given one, or any free one) for [start, end).
+        Returns None if nothing is available.
+        Raises:
+            ValueError: if end <= start or slot_ui is out of range.
+        """
+        if end <= start:
+            raise ValueError("reservation end must be after start")
+        capacity = self._svc.ev_capacity if fuel == "EV" else self._svc.capacity
+        if slot_ui is not None and not 1 <= slot_ui <= capacity:
+            raise ValueError(f"slot {slot_ui} out of range for {fuel}")
+        if slot_ui is None:
+            slot_ui = next(self.available_slots(fuel, start, end), None)
+            if slot_ui is None:
+                return None
+        elif not self.is_available(fuel, slot_ui, start, end):
+            return None
+        res = Reservation(next(self._ids), fuel, slot_ui, float(start), float(end), regnum)
+        self._by_id[res.id] = res
+        key = (fuel, slot_ui - 1)
+        if key not in self._intervals:
+            self._unbooked[fuel].occupy(slot_ui - 1)
+        intervals = self._intervals.setdefault(key, [])
+        insort(intervals, (res.start, res.end, res.id))
+        self._booked[fuel].set(slot_ui - 1, intervals)
+        heapq.heappush(self._events, (res.start - self.lead_s, 0, res.id))
+        heapq.heappush(self._events, (res.end, 1, res.id))
+        self.advance()
+        return res
+
+    def cancel(self, rid: int) -> bool:
+        """Drop a booking (releasing its hold). False if unknown."""
+        if rid not in self._by_id:
+            return False
+        self._release(rid)
+        self._forget(rid)
+        return True
+
+    def claim(self, rid: int, spec: VehicleSpec) -> ParkResult:
+        """
+        The booked driver arrived: park them in their reserved slot, or in any
+        free slot if it is still occupied. The booking is consumed either way,
+        unless the vehicle's fuel doesn't match the booked pool.
+        """
+        res = self._by_id.get(rid)
+        if res is None:
+            return {"ok": False, "message": f"Unknown reservation {rid}", "slot_ui": None}
+        if spec.fuel != res.fuel:
+            return {
+                "ok": False,
+                "message": f"Reservation {rid} is for an {res.fuel} slot, not {spec.fuel}",
+                "slot_ui": None,
+            }
+        self._release(rid)
+        self._forget(rid)
+        out = self._svc.park_at(spec, res.slot_ui)
+        return out if out["ok"] else self._svc.park(spec)
+
+    # ---------- time ----------
+    def advance(self, now: float | None = None) -> None:
+        """Apply hold/expire events due by now (called by park() automatically)."""
+        now = self._clock() if now is None else now
+        events = self._events
+        while events and events[0][0] <= now:
+            _, kind, rid = heapq.heappop(events)
+            res = self._by_id.get(rid)
+            if res is None:
+                continue  # cancelled or claimed
+            if kind == 0 and rid not in self._holding:
+                self._holding.add(rid)
+                self._svc.hold(res.slot_ui, res.fuel)
+            elif kind == 1:  # booking over (no-show)
+                self._release(rid)
+                self._forget(rid)
+
+    def _release(self, rid: int) -> None:
+        if rid in self._holding:
+            self._holding.discard(rid)
+            res = self._by_id[rid]
+            self._svc.unhold(res.slot_ui, res.fuel)
+
+    def _forget(self, rid: int) -> None:
+        res = self._by_id.pop(rid)
+        key = (res.fuel, res.slot_ui - 1)
+        intervals = self._intervals[key]
+        del intervals[bisect_left(intervals, (res.start, res.end, rid))]
+        self._booked[res.fuel].set(res.slot_ui - 1, intervals)
+        if not intervals:
+            del self._intervals[key]
+            self._unbooked[res.fuel].release(res.slot_ui - 1)
@@ -0,0 +1,327 @@
+"""
+Lot occupancy in shared memory for read-only worker processes.
+
+Requires NumPy (optional dependency: `pip install parking-lot-manager[analytics]`).
+SharedLot publishes a lot in one multiprocessing.shared_memory block, one row
+per slot, ICE slots first and then EV, as in columns.to_columns(). It writes
+the initial rows and then keeps them current from the service's
+park/leave/charge events. SharedLotView attaches to the block by name from
+another process and runs finders and aggregates directly on NumPy views of
+it. Nothing is copied or pickled.
+
+Block layout: an int64 header (magic, seq, pool sizes, level, string width,
+service version), then the columns kind, occupied, bays, charge, entered,
+regnum, make, model, color and truncated. Strings are fixed-width UTF-8
+bytes. A longer value is cut at the last whole character that fits, and
+its bit (1 << STRINGS.index(name)) is set in the row's truncated mask.
+Finders keep exact-match semantics. A flagged row never matches, since its
+real value is longer than any query they accept. A query longer than
+str_width bytes raises ValueError, and so does all_regnums_by_color when it
+would have to return a cut plate.
+
+Consistency uses a seqlock. The single writer makes `seq` odd, updates the
+rows for the event and makes it even again. A reader notes an even `seq`,
+computes its result and keeps it only if `seq` has not moved, otherwise it
+retries. Readers never block the writer. The writer's stores are plain
+aligned stores, issued in program order on x86-64.
+
+Before Python 3.13 every attach registers the block with a resource tracker.
+Attach from processes started by the writer's multiprocessing, which share
+its tracker. A standalone process's tracker would unlink the block when that
+process exits.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import numpy as np
+
+from columns import FUELS, KINDS, NO_CHARGE
+from parking_service import ParkingService
+from vehicle_codec import codec_for
+
+if TYPE_CHECKING:
+    from parking_service import Fuel, OccupancyCounts, SlotEvent
+
+T = TypeVar("T")
+
+MAGIC = 0x5041524B4C4F5432  # "PARKLOT2"
+DEFAULT_STR_WIDTH = 32  # bytes per regnum/make/model/color value
+DEFAULT_READ_TIMEOUT_S = 1.0
+STRINGS = ("regnum", "make", "model", "color")
+# header words
+_MAGIC, _SEQ, _N_ICE, _N_EV, _LEVEL, _WIDTH, _VERSION = range(7)
+_HEADER_WORDS = 8
+
+Columns = dict[str, np.ndarray]
+
+
+def _layout(n: int, width: int) -> tuple[list[tuple[str, np.dtype[Any], int]], int]:
+    """(name, dtype, byte offset) per column and the total block size."""
+    dtypes: list[tuple[str, np.dtype[Any]]] = [
+        ("entered", np.dtype(np.float64)),
+        *((name, np.dtype(f"S{width}")) for name in STRINGS),
+        ("kind", np.dtype(np.int8)),
+        ("occupied", np.dtype(np.bool_)),
+        ("bays", np.dtype(np.uint8)),
+        ("charge", np.dtype(np.int8)),
+        ("truncated", np.dtype(np.uint8)),  # bit per STRINGS field cut to fit
+    ]
+    out = []
+    offset = _HEADER_WORDS * 8
+    for name, dtype in dtypes:
+        out.append((name, dtype, offset))
+        offset += -(-n * dtype.itemsize // 8) * 8  # keep every column 8-byte aligned
+    return out, offset
+
+
+def _views(buf: memoryview | None, readonly: bool = False) -> tuple[np.ndarray, Columns]:
+    assert buf is not None
+    header = np.ndarray((_HEADER_WORDS,), dtype=np.int64, buffer=buf)
+    if header[_MAGIC] != MAGIC:
+        raise ValueError("shared memory block does not hold a lot")
+    n = int(header[_N_ICE] + header[_N_EV])
+    cols = {
+        name: np.ndarray((n,), dtype=dtype, buffer=buf, offset=offset)
+        for name, dtype, offset in _layout(n, int(header[_WIDTH]))[0]
+    }
+    if readonly:
+        for col in (header, *cols.values()):
+            col.flags.writeable = False
+    return header, cols
+
+
+def _encode(value: Any, width: int) -> tuple[bytes, bool]:
+    """value as at most width UTF-8 bytes, cut on a character boundary; True if cut."""
+    raw = str(value).encode("utf-8")
+    if len(raw) <= width:
+        return raw, False
+    return raw[:width].decode("utf-8", "ignore").encode("utf-8"), True
+
+
+def _too_wide(value: str, width: int) -> ValueError:
+    return ValueError(f"{value!r} is longer than the block's str_width ({width} bytes)")
+
+
+class SharedLot:
+    """
+    Writer side: mirrors svc into a new shared memory block until close().
+    Use one SharedLot per lot, in the process that applies park/leave.
+    """
+
+    def __init__(
+        self,
+        svc: ParkingService,
+        name: str | None = None,
+        str_width: int = DEFAULT_STR_WIDTH,
+    ) -> None:
+        if str_width < 1:
+            raise ValueError("str_width must be >= 1")
+        self._svc = svc
+        self._width = str_width
+        self._base = {"ICE": 0, "EV": svc.capacity}  # first row of each pool
+        n = svc.capacity + svc.ev_capacity
+        size = _layout(n, str_width)[1]
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER_WORDS,), dtype=np.int64, buffer=self._shm.buf)
+        header[:] = 0
+        header[_N_ICE], header[_N_EV], header[_LEVEL] = svc.capacity, svc.ev_capacity, svc.level
+        header[_WIDTH] = str_width
+        header[_MAGIC] = MAGIC
+        self._header, self.columns = _views(self._shm.buf)
+        self.columns["kind"][:] = -1
+        self.columns["charge"][:] = NO_CHARGE
+        self.columns["entered"][:] = np.nan
+        for fuel in FUELS:
+            for idx, vehicle in svc.occupied(fuel):
+                self._write_park(fuel, idx, vehicle)
+        header[_VERSION] = svc.version
+        self._unsubscribe: Callable[[], None] | None = svc.subscribe(self._on_event)
+
+    @property
+    def name(self) -> str:
+        """Block name to pass to SharedLotView in the workers."""
+        return self._shm.name
+
+    def close(self, unlink: bool = True) -> None:
+        """Stop mirroring and release the block (unlink: remove it for every process)."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        del self._header, self.columns  # views must go before the buffer is closed
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+    def _write_park(self, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        cols, row = self.columns, self._base[fuel] + idx
+        bays = self._svc.bays_at(idx + 1, fuel)
+        cols["occupied"][row:row + bays] = True
+        cols["bays"][row] = bays
+        cols["kind"][row] = KINDS.index(codec_for(vehicle).kind)
+        entered = self._svc.entered_at(fuel, idx)
+        cols["entered"][row] = np.nan if entered is None else entered
+        truncated = 0
+        for bit, name in enumerate(STRINGS):
+            cols[name][row], cut = _encode(getattr(vehicle, name), self._width)
+            truncated |= cut << bit
+        cols["truncated"][row] = truncated
+        if fuel == "EV":
+            cols["charge"][row] = vehicle.charge
+
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        cols, row = self.columns, self._base[fuel] + idx
+        seq = self._header[_SEQ]
+        self._header[_SEQ] = seq + 1  # odd: rows are changing
+        if event == "park":
+            self._write_park(fuel, idx, vehicle)
+        elif event == "leave":
+            bays = max(int(cols["bays"][row]), 1)
+            cols["occupied"][row:row + bays] = False
+            cols["bays"][row] = 0
+            cols["kind"][row] = -1
+            cols["charge"][row] = NO_CHARGE
+            cols["entered"][row] = np.nan
+            for name in STRINGS:
+                cols[name][row] = b""
+            cols["truncated"][row] = 0
+        else:
+            cols["charge"][row] = vehicle.charge
+        self._header[_VERSION] = self._svc.version
+        self._header[_SEQ] = seq + 2
+
+
+class SharedLotView:
+    """
+    Reader side: attaches to a SharedLot block by name. Queries mirror the
+    ParkingService finders (1-based slot numbers) and see the lot as of one
+    consistent point between two writer events.
+    """
+
+    def __init__(self, name: str, timeout_s: float = DEFAULT_READ_TIMEOUT_S) -> None:
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+        except TypeError:  # Python < 3.13 always tracks, see the module docstring
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._header, self._cols = _views(self._shm.buf, readonly=True)
+        self.capacity = int(self._header[_N_ICE])
+        self.ev_capacity = int(self._header[_N_EV])
+        self.level = int(self._header[_LEVEL])
+        self._width = int(self._header[_WIDTH])
+        self.timeout_s = timeout_s
+        self.retries = 0  # reads repeated because the writer moved underneath
+
+    def close(self) -> None:
+        del self._header, self._cols
+        self._shm.close()
+
+    def read(self, fn: Callable[[Columns], T]) -> T:
+        """
+        Run fn(columns) against one consistent state and return its result.
+        fn must copy what it returns (tolist(), int(), .copy()): the arrays
+        it gets are live views. Raises TimeoutError if the writer keeps the
+        block busy (or died mid-write) for longer than timeout_s.
+        """
+        deadline = time.monotonic() + self.timeout_s
+        while True:
+            start = int(self._header[_SEQ])
+            if not start & 1:
+                try:
+                    result = fn(self._cols)
+                except (ValueError, IndexError, UnicodeDecodeError):
+                    if int(self._header[_SEQ]) == start:
+                        raise  # a real error, not a torn read
+                else:
+                    if int(self._header[_SEQ]) == start:
+                        return result
+                self.retries += 1
+            if time.monotonic() > deadline:
+                raise TimeoutError("shared lot stayed busy; is the writer alive?")
+
+    @property
+    def version(self) -> int:
+        """The service's version counter as of the last published event."""
+        return self.read(lambda cols: int(self._header[_VERSION]))
+
+    def snapshot(self) -> Columns:
+        """Private copies of every column."""
+        return self.read(lambda cols: {k: v.copy() for k, v in cols.items()})
+
+    # ---------- finders ----------
+    def _rows(self, fuel: Fuel) -> slice:
+        return slice(0, self.capacity) if fuel == "ICE" else slice(self.capacity, None)
+
+    def _find(self, fuel: Fuel, field: str, value: str) -> list[int]:
+        v = (value or "").strip()
+        if not v:
+            return []
+        key, cut = _encode(v, self._width)
+        if cut:
+            raise _too_wide(v, self._width)
+        rows, bit = self._rows(fuel), 1 << STRINGS.index(field)
+        return self.read(
+            lambda cols: (np.flatnonzero(
+                (cols[field][rows] == key) & (cols["truncated"][rows] & bit == 0)
+            ) + 1).tolist()
+        )
+
+    def slots_by_make(self, make: str) -> list[int]:
+        return self._find("ICE", "make", make)
+
+    def slots_by_model(self, model: str) -> list[int]:
+        return self._find("ICE", "model", model)
+
+    def ev_slots_by_make(self, make: str) -> list[int]:
+        return self._find("EV", "make", make)
+
+    def ev_slots_by_model(self, model: str) -> list[int]:
+        return self._find("EV", "model", model)
+
+    def all_slots_by_color(self, color: str) -> list[int]:
+        return self._find("ICE", "color", color) + self._find("EV", "color", color)
+
+    def all_slots_by_reg(self, regnum: str) -> list[int]:
+        return self._find("ICE", "regnum", regnum) + self._find("EV", "regnum", regnum)
+
+    def all_regnums_by_color(self, color: str) -> list[str]:
+        """Raises ValueError if a matching plate was cut to fit str_width."""
+        c = (color or "").strip()
+        if not c:
+            return []
+        key, cut = _encode(c, self._width)
+        if cut:
+            raise _too_wide(c, self._width)
+        color_bit, reg_bit = 1 << STRINGS.index("color"), 1 << STRINGS.index("regnum")
+
+        def match(cols: Columns) -> tuple[list[bytes], bool]:
+            hit = (cols["color"] == key) & (cols["truncated"] & color_bit == 0)
+            return cols["regnum"][hit].tolist(), bool((cols["truncated"][hit] & reg_bit).any())
+
+        regs, cut_plates = self.read(match)
+        if cut_plates:
+            raise ValueError(f"a {c!r} plate is longer than the block's str_width ({self._width} bytes)")
+        return [r.decode("utf-8") for r in regs]
+
+    # ---------- aggregates ----------
+    def occupancy(self) -> dict[str, OccupancyCounts]:
+        """Capacity/occupied/free/occupancy_pct for "ice", "ev" and "total"."""
+        ice, ev = self.read(
+            lambda cols: (int(cols["occupied"][: self.capacity].sum()),
+                          int(cols["occupied"][self.capacity:].sum()))
+        )
+        return {
+            "ice": ParkingService._counts(self.capacity, ice),
+            "ev": ParkingService._counts(self.ev_capacity, ev),
+            "total": ParkingService._counts(self.capacity + self.ev_capacity, ice + ev),
+        }
+
+    def by_kind(self, fuel: Fuel) -> dict[str, int]:
+        """Parked vehicles per kind in one pool."""
+        rows = self._rows(fuel)
+        counts = self.read(
+            lambda cols: np.bincount(cols["kind"][rows][cols["bays"][rows] > 0], minlength=len(KINDS)).tolist()
+        )
+        return {k: c for k, c in zip(KINDS, counts, strict=True) if c}
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Any
+
+from vehicle_codec import codec_for
+
+# Vehicle attributes with equality postings lists ("kind" comes from the codec).
+INDEXED_FIELDS: tuple[str, ...] = ("make", "model", "color", "kind")
+
+
+class SlotIndex:
+    """
+    Postings lists over occupied slots, maintained by ParkingService on every
+    occupy/vacate: (fuel, field, value) -> set of 0-based slot indexes.
+    Registration numbers live in reg_index.RegIndex.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, dict[str, set[int]]]] = {
+            fuel: {f: {} for f in INDEXED_FIELDS} for fuel in ("ICE", "EV")
+        }
+        self._occupied: dict[str, set[int]] = {"ICE": set(), "EV": set()}
+
+    @staticmethod
+    def _values(vehicle: Any) -> tuple[str, ...]:
+        """Indexed attribute values in INDEXED_FIELDS order."""
+        return (
+            str(vehicle.make),
+            str(vehicle.model),
+            str(vehicle.color),
+            codec_for(vehicle).kind,
+        )
+
+    def add(self, fuel: str, idx: int, vehicle: Any) -> None:
+        """Index a vehicle that was just placed in slot idx."""
+        by_field = self._postings[fuel]
+        for f, value in zip(INDEXED_FIELDS, self._values(vehicle), strict=True):
+            by_field[f].setdefault(value, set()).add(idx)
+        self._occupied[fuel].add(idx)
+
+    def remove(self, fuel: str, idx: int, vehicle: Any) -> None:
+        """Drop a vehicle that is leaving slot idx."""
+        by_field = self._postings[fuel]
+        for f, value in zip(INDEXED_FIELDS, self._values(vehicle), strict=True):
+            postings = by_field[f][value]
+            postings.discard(idx)
+            if not postings:
+                del by_field[f][value]
+        self._occupied[fuel].discard(idx)
+
+    def postings(self, fuel: str, field: str, value: str) -> set[int]:
+        """Slot indexes whose vehicle has field == value (treat as read-only)."""
+        return self._postings[fuel][field].get(value, set())
+
+    def occupied(self, fuel: str) -> set[int]:
+        """All occupied slot indexes of a pool (treat as read-only)."""
+        return self._occupied[fuel]
+
+    def counts(self, fuel: str, field: str) -> dict[str, int]:
+        """Histogram value -> occupied slots for one field (postings sizes)."""
+        return {value: len(slots) for value, slots in self._postings[fuel][field].items()}
@@ -0,0 +1,166 @@
+"""
+Point-in-time views of a lot for exports that run while the lot changes.
+
+ParkingService keeps its encoded per-slot records (see vehicle_codec) in
+CowLists, fixed-length lists split into chunks of CHUNK entries. freeze()
+hands out the current chunks and bumps an epoch, which takes O(1). After
+that, the first write to a chunk copies it, and the first write of any kind
+copies the chunk directory. So the frozen chunks are never written again,
+and a lot that keeps changing pays for one chunk copy per chunk it touches.
+
+svc.snapshot() freezes both pools into a LotSnapshot. Its to_dict(),
+to_csv_rows() and save_* produce exactly what the service produced at that
+moment. They can run on another thread while park/leave keep going on the
+owner's thread. Records are replaced, never mutated in place (a charge
+change stores a new record), so a frozen chunk always holds the values it
+had when it was frozen.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from vehicle_codec import csv_cells
+
+if TYPE_CHECKING:
+    from layout import Layout
+    from parking_service import Fuel
+
+T = TypeVar("T")
+
+CHUNK_BITS = 8
+CHUNK = 1 << CHUNK_BITS  # entries per chunk
+
+Record = dict[str, Any]
+CSV_HEADER = ["slot_ui", "level", "regnum", "color", "make", "model", "fuel"]
+
+
+class FrozenList(Generic[T]):
+    """Read-only list over chunks that no one writes any more."""
+
+    __slots__ = ("_chunks", "_len")
+
+    def __init__(self, chunks: list[list[T]], length: int) -> None:
+        self._chunks = chunks
+        self._len = length
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i: int) -> T:
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return self._chunks[i >> CHUNK_BITS][i & (CHUNK - 1)]
+
+    def __iter__(self) -> Iterator[T]:
+        for chunk in self._chunks:
+            yield from chunk
+
+
+class CowList(Generic[T]):
+    """Fixed-length list whose freeze() is O(1); writes copy shared chunks first."""
+
+    __slots__ = ("_chunks", "_dir_shared", "_epoch", "_len", "_owner")
+
+    def __init__(self, length: int, fill: T) -> None:
+        self._len = length
+        self._chunks = [[fill] * min(CHUNK, length - start) for start in range(0, length, CHUNK)]
+        self._epoch = 0
+        self._owner = [0] * len(self._chunks)  # epoch in which each chunk was last copied
+        self._dir_shared = False
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i: int) -> T:
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return self._chunks[i >> CHUNK_BITS][i & (CHUNK - 1)]
+
+    def __setitem__(self, i: int, value: T) -> None:
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        c = i >> CHUNK_BITS
+        if self._owner[c] != self._epoch:
+            if self._dir_shared:
+                self._chunks = list(self._chunks)
+                self._dir_shared = False
+            self._chunks[c] = list(self._chunks[c])
+            self._owner[c] = self._epoch
+        self._chunks[c][i & (CHUNK - 1)] = value
+
+    def __iter__(self) -> Iterator[T]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def freeze(self) -> FrozenList[T]:
+        """The current contents, unaffected by later writes."""
+        self._epoch += 1
+        self._dir_shared = True
+        return FrozenList(self._chunks, self._len)
+
+
+class LotSnapshot:
+    """A lot as it was when svc.snapshot() was called (exports only)."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        revision: int,
+        version: int,
+        level: int,
+        records: dict[Fuel, FrozenList[Record | None]],
+        bays_per_kind: dict[str, int],
+        layout: Layout | None,
+    ) -> None:
+        self.revision = revision
+        self.version = version  # ParkingService.version at the snapshot
+        self.level = level
+        self.records = records
+        self.bays_per_kind = bays_per_kind
+        self.layout = layout
+
+    @property
+    def capacity(self) -> int:
+        return len(self.records["ICE"])
+
+    @property
+    def ev_capacity(self) -> int:
+        return len(self.records["EV"])
+
+    def to_dict(self) -> dict[str, Any]:
+        """Same shape as ParkingService.to_dict()."""
+        data: dict[str, Any] = {
+            "revision": self.revision,
+            "level": self.level,
+            "capacity": self.capacity,
+            "ev_capacity": self.ev_capacity,
+            "slots": [None if r is None else r.copy() for r in self.records["ICE"]],
+            "evSlots": [None if r is None else r.copy() for r in self.records["EV"]],
+        }
+        if self.bays_per_kind:
+            data["bays_per_kind"] = dict(self.bays_per_kind)
+        if self.layout is not None:
+            data["layout"] = self.layout.to_dict()
+        return data
+
+    def to_csv_rows(self, include_ev: bool = True) -> list[list[str]]:
+        """Same table as ParkingService.to_csv_rows()."""
+        rows: list[list[str]] = [list(CSV_HEADER)]
+        level = str(self.level)
+        fuels: tuple[Fuel, ...] = ("ICE", "EV") if include_ev else ("ICE",)
+        for fuel in fuels:
+            for i, r in enumerate(self.records[fuel]):
+                if r is not None:
+                    rows.append([str(i + 1), level, *csv_cells(r)])
+        return rows
+
+    def save_json(self, path: str) -> None:
+        """Write to_dict() atomically. The revision is the snapshot's own; nothing is bumped."""
+        from lot_file import atomic_write_json  # noqa: PLC0415
+        atomic_write_json(path, self.to_dict())
+
+    def save_csv(self, path: str, include_ev: bool = True) -> None:
+        import csv  # noqa: PLC0415
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self.to_csv_rows(include_ev=include_ev))
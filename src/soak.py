@@ -0,0 +1,173 @@
+"""
+Soak harness: long randomized park/leave/save/load runs with memory tracking.
+
+run_soak() drives one ParkingService through `cycles` random operations:
+mostly park and leave, a charge update now and then, and every
+reload_every cycles a save_json/load_json round trip that replaces the
+service (as the UI does when a file is re-opened). Every sample_every
+cycles it records tracemalloc's traced bytes and the process RSS. After a
+warm-up (the lot fills up), it fits a least-squares slope to each series in
+bytes per 1000 cycles. The run fails if either slope exceeds its limit. A
+tracemalloc snapshot diff between the end of warm-up and the end of the run
+names the source lines that grew. Samples are kept in preallocated arrays,
+so the harness's own bookkeeping does not count as growth.
+
+Run length matters. A fresh lot keeps allocating for a while after it fills,
+until most of its plate population (PLATES_PER_SLOT per slot) has parked
+once. DEFAULT_MAX_ALLOC_SLOPE is calibrated for runs of at least
+MIN_CYCLES_PER_SLOT cycles per slot. At the default 1,100 slots a steady lot
+settles at about 500-750 B/kcycle from 50k cycles on. Shorter runs can
+exceed 1024 without leaking, so give them a looser limit.
+"""
+from __future__ import annotations
+
+import random
+import tempfile
+import tracemalloc
+from array import array
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TypedDict
+
+from memory import current_rss
+from parking_service import MemoryReport, ParkingService, VehicleSpec
+
+DEFAULT_MAX_ALLOC_SLOPE = 1024.0  # traced bytes per 1000 cycles (~1 byte leaked per cycle)
+MIN_CYCLES_PER_SLOT = 50  # shortest run the default alloc limit is calibrated for
+DEFAULT_MAX_RSS_SLOPE = 16_384.0  # RSS bytes per 1000 cycles (allocator noise is larger)
+WARMUP_FRACTION = 0.2
+TOP_GROWTH = 5  # source lines listed in SoakResult.growth
+PLATES_PER_SLOT = 10  # distinct plates in the simulated population, per slot
+
+MAKES = ("Audi", "BMW", "Ford", "Honda", "Kia", "Tesla", "Toyota", "VW")
+COLORS = ("Black", "Blue", "Red", "Silver", "White")
+
+
+class SoakSample(TypedDict):
+    cycle: int
+    traced_bytes: int
+    rss_bytes: int | None
+
+
+@dataclass
+class SoakResult:
+    cycles: int
+    samples: list[SoakSample]
+    alloc_slope: float  # bytes per 1000 cycles after warm-up
+    rss_slope: float | None
+    report: MemoryReport  # svc.memory_report() at the end
+    growth: list[str] = field(default_factory=list)  # top tracemalloc diff lines
+    failures: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+def slope_per_kcycle(points: Sequence[tuple[float, float]]) -> float:
+    """Least-squares slope of (cycle, bytes) points, scaled to bytes per 1000 cycles."""
+    n = len(points)
+    if n < 2:  # noqa: PLR2004
+        return 0.0
+    mx = sum(x for x, _ in points) / n
+    my = sum(y for _, y in points) / n
+    var = sum((x - mx) ** 2 for x, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((x - mx) * (y - my) for x, y in points) / var * 1000
+
+
+def _step(svc: ParkingService, rng: random.Random) -> None:
+    roll = rng.random()
+    if roll < 0.5:  # noqa: PLR2004
+        ev = rng.random() < 0.2  # noqa: PLR2004
+        plates = PLATES_PER_SLOT * (svc.capacity + svc.ev_capacity)  # regulars come back
+        spec = VehicleSpec(
+            f"S{rng.randrange(plates):07d}", rng.choice(MAKES), "X", rng.choice(COLORS),
+            "EV" if ev else "ICE", "CAR" if ev or rng.random() < 0.9 else "MOTORCYCLE",  # noqa: PLR2004
+        )
+        svc.park(spec)
+    elif roll < 0.95:  # noqa: PLR2004
+        ev = rng.random() < 0.2  # noqa: PLR2004
+        capacity = svc.ev_capacity if ev else svc.capacity
+        if capacity:
+            svc.leave(rng.randrange(capacity) + 1, fuel="EV" if ev else "ICE")
+    elif svc.ev_capacity:
+        svc.set_charge(rng.randrange(svc.ev_capacity) + 1, rng.randrange(101))
+
+
+def run_soak(  # noqa: PLR0913
+    cycles: int = 1_000_000,
+    *,
+    capacity: int = 1000,
+    ev_capacity: int = 100,
+    sample_every: int = 10_000,
+    reload_every: int = 5_000,
+    max_alloc_slope: float = DEFAULT_MAX_ALLOC_SLOPE,
+    max_rss_slope: float | None = DEFAULT_MAX_RSS_SLOPE,
+    seed: int = 0,
+    on_cycle: Callable[[ParkingService, int], None] | None = None,
+) -> SoakResult:
+    """
+    Run the soak and return its samples, slopes and failures.
+    on_cycle(svc, cycle) runs after every cycle (e.g. to exercise a consumer
+    of the service). max_rss_slope=None only reports RSS.
+    """
+    if sample_every < 1 or cycles < sample_every:
+        raise ValueError("need cycles >= sample_every >= 1")
+    rng = random.Random(seed)
+    svc = ParkingService(capacity=capacity, ev_capacity=ev_capacity, level=1)
+    # no Python objects per sample: they would be traced as growth
+    n_samples = cycles // sample_every
+    traced = array("q", bytes(8 * n_samples))
+    rss_bytes = array("q", bytes(8 * n_samples))  # -1 when RSS is unavailable
+    warmup = int(cycles * WARMUP_FRACTION)
+    baseline: tracemalloc.Snapshot | None = None
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "soak.json")
+            for cycle in range(1, cycles + 1):
+                _step(svc, rng)
+                if reload_every and cycle % reload_every == 0:
+                    svc.save_json(path)
+                    svc = ParkingService.load_json(path)
+                if on_cycle is not None:
+                    on_cycle(svc, cycle)
+                if cycle % sample_every == 0:
+                    i = cycle // sample_every - 1
+                    traced[i] = tracemalloc.get_traced_memory()[0]
+                    rss_bytes[i] = current_rss() or -1
+                if cycle == warmup:
+                    baseline = tracemalloc.take_snapshot()
+            final = tracemalloc.take_snapshot()
+    finally:
+        if not started:
+            tracemalloc.stop()
+
+    samples: list[SoakSample] = [
+        {
+            "cycle": (i + 1) * sample_every,
+            "traced_bytes": traced[i],
+            "rss_bytes": rss_bytes[i] if rss_bytes[i] >= 0 else None,
+        }
+        for i in range(n_samples)
+    ]
+    steady = [s for s in samples if s["cycle"] > warmup]
+    alloc = slope_per_kcycle([(s["cycle"], s["traced_bytes"]) for s in steady])
+    rss_points = [(s["cycle"], s["rss_bytes"]) for s in steady if s["rss_bytes"] is not None]
+    rss = slope_per_kcycle(rss_points) if rss_points else None
+    result = SoakResult(cycles, samples, alloc, rss, svc.memory_report())
+    if baseline is not None:
+        diff = final.compare_to(baseline, "lineno")
+        result.growth = [str(d) for d in diff[:TOP_GROWTH] if d.size_diff > 0]
+    if alloc > max_alloc_slope:
+        result.failures.append(
+            f"traced allocations grow {alloc:,.0f} B/1k cycles (limit {max_alloc_slope:,.0f})"
+        )
+    if rss is not None and max_rss_slope is not None and rss > max_rss_slope:
+        result.failures.append(f"RSS grows {rss:,.0f} B/1k cycles (limit {max_rss_slope:,.0f})")
+    return result
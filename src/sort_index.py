@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from bisect import bisect_right, insort
+from typing import Any
+
+# Orders status_page() can return; "slot" is plain slot order.
+SORT_KEYS: tuple[str, ...] = ("slot", "regnum", "make", "model", "color")
+
+Entry = tuple[str, int]  # (sort value, 0-based slot)
+
+
+def encode_cursor(value: str, idx: int) -> str:
+    """Opaque-ish page token: '<slot_ui>:<value>' (the slot number never contains ':')."""
+    return f"{idx + 1}:{value}"
+
+
+def decode_cursor(cursor: str) -> Entry:
+    """
+    Inverse of encode_cursor().
+    Raises:
+        ValueError: if the token is malformed.
+    """
+    slot, sep, value = cursor.partition(":")
+    if not sep or not slot.isdigit() or int(slot) < 1:
+        raise ValueError(f"bad cursor {cursor!r}")
+    return value, int(slot) - 1
+
+
+class SortIndex:
+    """
+    Occupied slots of each pool kept sorted by (value, slot) per sort key,
+    maintained by ParkingService on every occupy/vacate. An order is built
+    (one sort) the first time it is paged and updated in place afterwards,
+    so lots that never page pay nothing.
+
+    Pages are keyset-based: a cursor is the last (value, slot) returned and
+    the next page starts strictly after it, so cursors stay valid when
+    vehicles park or leave between requests.
+    """
+
+    def __init__(self) -> None:
+        self._orders: dict[tuple[str, str], list[Entry]] = {}
+
+    @staticmethod
+    def value(key: str, vehicle: Any) -> str:
+        return "" if key == "slot" else str(getattr(vehicle, key))
+
+    def add(self, fuel: str, idx: int, vehicle: Any) -> None:
+        for (f, key), order in self._orders.items():
+            if f == fuel:
+                insort(order, (self.value(key, vehicle), idx))
+
+    def remove(self, fuel: str, idx: int, vehicle: Any) -> None:
+        for (f, key), order in self._orders.items():
+            if f == fuel:
+                entry = (self.value(key, vehicle), idx)
+                pos = bisect_right(order, entry) - 1
+                if pos >= 0 and order[pos] == entry:
+                    del order[pos]
+
+    def built(self, fuel: str, key: str) -> bool:
+        return (fuel, key) in self._orders
+
+    def build(self, fuel: str, key: str, occupied: list[tuple[int, Any]]) -> None:
+        """Create an order from (idx, vehicle) pairs of the pool's occupied slots."""
+        self._orders[(fuel, key)] = sorted((self.value(key, v), i) for i, v in occupied)
+
+    def page(self, fuel: str, key: str, after: Entry | None, limit: int) -> tuple[list[int], bool]:
+        """Up to limit slot indexes following `after`, and whether more remain."""
+        order = self._orders[(fuel, key)]
+        start = 0 if after is None else bisect_right(order, after)
+        end = start + max(limit, 0)
+        return [idx for _, idx in order[start:end]], end < len(order)
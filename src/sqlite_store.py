@@ -0,0 +1,297 @@
+"""
+SQLite storage for a single lot.
+
+One row per occupied slot (empty slots have no row) plus a small meta table
+for capacities, level and optional config. The database runs in WAL mode so
+readers don't block the writer. Regnum, make and color are indexed.
+
+- save(svc) / load(): whole-lot snapshot in one transaction; load reads only
+  the occupied rows.
+- attach(svc): write-through. Every park/leave/charge becomes one single-row
+  transaction, so a lot can be kept on disk without re-saving the whole
+  file after each change. Parks are plain INSERTs: if another process has
+  taken the slot since load(), the park raises ConflictError instead of
+  overwriting that row.
+- update(operation): load, apply and write inside one BEGIN IMMEDIATE
+  transaction, so processes sharing a file take turns and each one
+  allocates against the rows the others committed.
+- status_rows(), status_page(), find(), regnums_by_color(): answered in SQL straight from
+  the file without building a ParkingService.
+
+Statements are module constants so sqlite3's per-connection statement
+cache reuses the prepared statements.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from lot_file import ConflictError
+from parking_service import Fuel, ParkingService, StatusPage, StatusRow
+from sort_index import SORT_KEYS, decode_cursor, encode_cursor
+from vehicle_codec import codec_for
+
+if TYPE_CHECKING:
+    from parking_service import SlotEvent
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS slots (
+    fuel TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    regnum TEXT NOT NULL,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    color TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    charge INTEGER,
+    bays INTEGER NOT NULL DEFAULT 1,
+    entered REAL,
+    PRIMARY KEY (fuel, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS slots_regnum ON slots (regnum);
+CREATE INDEX IF NOT EXISTS slots_make ON slots (make);
+CREATE INDEX IF NOT EXISTS slots_color ON slots (color);
+"""
+
+INSERT_SLOT = (
+    "INSERT INTO slots (fuel, idx, regnum, make, model, color, kind, charge, bays, entered)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+DELETE_SLOT = "DELETE FROM slots WHERE fuel = ? AND idx = ?"
+UPDATE_CHARGE = "UPDATE slots SET charge = ? WHERE fuel = 'EV' AND idx = ?"
+PUT_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+SELECT_ROWS = "SELECT fuel, idx, regnum, make, model, color, kind, charge, bays, entered FROM slots"
+STATUS = "SELECT idx, regnum, color, make, model FROM slots WHERE fuel = ? ORDER BY idx"
+
+# Columns find() may filter on (guards the column name interpolated into SQL)
+FIND_FIELDS = ("regnum", "make", "model", "color", "kind")
+
+
+def _row(  # noqa: PLR0913
+    fuel: Fuel, idx: int, vehicle: Any, bays: int, entered: float | None
+) -> tuple[Any, ...]:
+    rec = codec_for(vehicle).encode(vehicle)
+    charge = rec.get("charge")
+    return (
+        fuel, idx, rec["regnum"], rec["make"], rec["model"], rec["color"], rec["kind"], charge, bays,
+        entered,
+    )
+
+
+class SqliteStore:
+    """A lot persisted in one SQLite file."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(slots)")}
+        if "entered" not in columns:  # files created before entry times were stored
+            self._conn.execute("ALTER TABLE slots ADD COLUMN entered REAL")
+        self._svc: ParkingService | None = None
+        self._unsubscribe: Callable[[], None] | None = None
+
+    def close(self) -> None:
+        self.detach()
+        self._conn.close()
+
+    def __enter__(self) -> SqliteStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ---------- snapshot ----------
+    def exists(self) -> bool:
+        """True once a lot has been saved to this file."""
+        return self._conn.execute("SELECT 1 FROM meta WHERE key = 'capacity'").fetchone() is not None
+
+    def save(self, svc: ParkingService) -> None:
+        """Replace the stored lot with svc's state (one transaction)."""
+        data = svc.to_dict()
+        meta = {
+            "revision": data["revision"],
+            "level": data["level"],
+            "capacity": data["capacity"],
+            "ev_capacity": data["ev_capacity"],
+            "bays_per_kind": data.get("bays_per_kind"),
+            "layout": data.get("layout"),
+        }
+        rows = []
+        pools: tuple[tuple[Fuel, str], ...] = (("ICE", "slots"), ("EV", "evSlots"))
+        for fuel, key in pools:
+            for i, r in enumerate(data[key]):
+                if r is not None:
+                    rows.append((
+                        fuel, i, r["regnum"], r["make"], r["model"], r["color"], r["kind"],
+                        r.get("charge"), r.get("bays", 1), r.get("entered"),
+                    ))
+        with self._conn:
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("DELETE FROM slots")
+            self._conn.executemany(PUT_META, [(k, json.dumps(v)) for k, v in meta.items()])
+            self._conn.executemany(INSERT_SLOT, rows)
+
+    def _meta(self) -> dict[str, Any]:
+        return {k: json.loads(v) for k, v in self._conn.execute("SELECT key, value FROM meta")}
+
+    def load(self) -> ParkingService:
+        """
+        Rebuild the lot from the occupied rows.
+        Raises:
+            LookupError: if nothing has been saved to this file yet.
+        """
+        meta = self._meta()
+        if "capacity" not in meta:
+            raise LookupError(f"no lot stored in {self.path}")
+        data: dict[str, Any] = {
+            "revision": meta.get("revision", 0),
+            "level": meta["level"],
+            "capacity": meta["capacity"],
+            "ev_capacity": meta["ev_capacity"],
+            "slots": [None] * meta["capacity"],
+            "evSlots": [None] * meta["ev_capacity"],
+        }
+        for key in ("bays_per_kind", "layout"):
+            if meta.get(key) is not None:
+                data[key] = meta[key]
+        for fuel, idx, regnum, make, model, color, kind, charge, bays, entered in self._conn.execute(
+            SELECT_ROWS
+        ):
+            rec: dict[str, Any] = {
+                "regnum": regnum, "make": make, "model": model, "color": color,
+                "fuel": fuel, "kind": kind,
+            }
+            if charge is not None:
+                rec["charge"] = charge
+            if bays != 1:
+                rec["bays"] = bays
+            if entered is not None:
+                rec["entered"] = entered
+            data["evSlots" if fuel == "EV" else "slots"][idx] = rec
+        return ParkingService.from_dict(data)
+
+    # ---------- write-through ----------
+    def attach(self, svc: ParkingService) -> None:
+        """Persist every subsequent park/leave/charge of svc as it happens."""
+        self.detach()
+        self._svc = svc
+        self._unsubscribe = svc.subscribe(self._on_event)
+
+    def detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def update(self, operation: Callable[[ParkingService], T]) -> T:
+        """
+        Apply operation to the stored lot in one write transaction and return
+        its result. The write lock is taken before the lot is read (BEGIN
+        IMMEDIATE), so concurrent updates run one after another and none of
+        them allocates a slot another has just filled. Nothing is written if
+        operation raises.
+        """
+        self.detach()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            svc = self.load()
+            self._svc = svc
+            unsubscribe = svc.subscribe(self._write)
+            try:
+                result = operation(svc)
+            finally:
+                unsubscribe()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+        return result
+
+    def _on_event(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        with self._conn:
+            self._write(event, fuel, idx, vehicle)
+
+    def _write(self, event: SlotEvent, fuel: Fuel, idx: int, vehicle: Any) -> None:
+        assert self._svc is not None
+        if event == "park":
+            bays = self._svc.bays_at(idx + 1, fuel)
+            entered = self._svc.entered_at(fuel, idx)
+            try:
+                self._conn.execute(INSERT_SLOT, _row(fuel, idx, vehicle, bays, entered))
+            except sqlite3.IntegrityError:
+                raise ConflictError(
+                    f"{fuel} slot {idx + 1} was taken in {self.path} since the lot was loaded"
+                ) from None
+        elif event == "leave":
+            self._conn.execute(DELETE_SLOT, (fuel, idx))
+        else:
+            self._conn.execute(UPDATE_CHARGE, (int(vehicle.charge), idx))
+
+    # ---------- queries pushed down to SQL ----------
+    def status_rows(self, fuel: Fuel = "ICE") -> list[StatusRow]:
+        """Same rows as ParkingService.status_rows()/ev_status_rows(), read from SQL."""
+        level = int(self._meta().get("level", 1))
+        return [
+            {"slot_ui": idx + 1, "level": level, "regnum": regnum, "color": color, "make": make, "model": model}
+            for idx, regnum, color, make, model in self._conn.execute(STATUS, (fuel,))
+        ]
+
+    def status_page(
+        self,
+        fuel: Fuel = "ICE",
+        sort: str = "slot",
+        after: str | None = None,
+        limit: int = 50,
+    ) -> StatusPage:
+        """Same pages and cursors as ParkingService.status_page(), as a keyset query."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"cannot sort by {sort!r} (choose from {', '.join(SORT_KEYS)})")
+        col = "''" if sort == "slot" else sort  # whitelisted above
+        sql = f"SELECT {col}, idx, regnum, color, make, model FROM slots WHERE fuel = ?"  # noqa: S608
+        params: tuple[Any, ...] = (fuel,)
+        if after is not None:
+            value, idx = decode_cursor(after)
+            sql += f" AND ({col}, idx) > (?, ?)"
+            params += (value, idx)
+        rows = self._conn.execute(sql + f" ORDER BY {col}, idx LIMIT ?", (*params, limit + 1)).fetchall()
+        level = int(self._meta().get("level", 1))
+        page: list[StatusRow] = [
+            {"slot_ui": idx + 1, "level": level, "regnum": regnum, "color": color, "make": make, "model": model}
+            for _, idx, regnum, color, make, model in rows[:limit]
+        ]
+        cursor = None
+        if len(rows) > limit and page:
+            value, idx = rows[limit - 1][:2]
+            cursor = encode_cursor(value, idx)
+        return {"rows": page, "next": cursor}
+
+    def find(self, field: str, value: str, fuel: Fuel | None = None) -> list[tuple[Fuel, int]]:
+        """
+        (fuel, 1-based slot) where <field> == value, ICE first, then by slot.
+        Raises:
+            ValueError: if field isn't one of FIND_FIELDS.
+        """
+        if field not in FIND_FIELDS:
+            raise ValueError(f"cannot search on {field!r}")
+        sql = f"SELECT fuel, idx FROM slots WHERE {field} = ?"  # noqa: S608 (field is whitelisted)
+        params: tuple[Any, ...] = (value.strip(),)
+        if fuel is not None:
+            sql += " AND fuel = ?"
+            params += (fuel,)
+        rows = self._conn.execute(sql + " ORDER BY fuel = 'EV', idx", params).fetchall()
+        return [(f, idx + 1) for f, idx in rows]
+
+    def regnums_by_color(self, color: str) -> list[str]:
+        """Registrations of vehicles with this color (ICE first, then EV)."""
+        rows = self._conn.execute(
+            "SELECT regnum FROM slots WHERE color = ? ORDER BY fuel = 'EV', idx", (color.strip(),)
+        )
+        return [r for (r,) in rows]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Literal
+
+import ElectricVehicle
+import Vehicle
+
+Fuel = Literal["ICE", "EV"]
+Kind = Literal["CAR", "MOTORCYCLE", "BUS", "TRUCK"]
+
+# Attributes every vehicle record carries, in serialization order.
+BASE_FIELDS: tuple[str, ...] = ("regnum", "make", "model", "color")
+# Record keys emitted by CSV export after slot_ui/level.
+CSV_FIELDS: tuple[str, ...] = ("regnum", "color", "make", "model", "fuel")
+csv_cells = itemgetter(*CSV_FIELDS)
+
+
+@dataclass(frozen=True)
+class VehicleCodec:
+    """
+    Encode/decode one concrete vehicle class to a plain record.
+    fuel/kind are fixed per class, so they are computed once at registration
+    instead of being sniffed from the instance on every save.
+    """
+    cls: type
+    fuel: Fuel
+    kind: Kind
+    extra_fields: tuple[str, ...] = ()  # e.g. ("charge",) for EVs
+    fields: tuple[str, ...] = field(init=False)  # all record keys, in order
+    # Vehicle -> dict, and record -> vehicle (missing extra fields keep their defaults)
+    encode: Callable[[Any], dict[str, Any]] = field(init=False, repr=False, compare=False)
+    decode: Callable[[dict[str, Any]], Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "fields", BASE_FIELDS + ("fuel", "kind") + self.extra_fields)
+        object.__setattr__(self, "encode", _compile_encoder(self.fuel, self.kind, self.extra_fields))
+        object.__setattr__(self, "decode", _compile_decoder(self.cls, self.extra_fields))
+
+
+def _compile_encoder(
+    fuel: str, kind: str, extra_fields: tuple[str, ...]
+) -> Callable[[Any], dict[str, Any]]:
+    """
+    Build the Vehicle -> dict function for one class. fuel/kind are bound as
+    constants; the output keeps the historic to_dict key order.
+    """
+    if not extra_fields:
+        def encode(v: Any) -> dict[str, Any]:
+            return {
+                "regnum": v.regnum, "make": v.make, "model": v.model, "color": v.color,
+                "fuel": fuel, "kind": kind,
+            }
+        return encode
+
+    def encode_extra(v: Any) -> dict[str, Any]:
+        out = {
+            "regnum": v.regnum, "make": v.make, "model": v.model, "color": v.color,
+            "fuel": fuel, "kind": kind,
+        }
+        for name in extra_fields:
+            out[name] = getattr(v, name)
+        return out
+    return encode_extra
+
+
+def _compile_decoder(cls: type, extra_fields: tuple[str, ...]) -> Callable[[dict[str, Any]], Any]:
+    """Build the dict -> Vehicle function for one class (extra fields are ints)."""
+    if not extra_fields:
+        def decode(d: dict[str, Any]) -> Any:
+            return cls(d["regnum"], d["make"], d["model"], d["color"])
+        return decode
+
+    def decode_extra(d: dict[str, Any]) -> Any:
+        v = cls(d["regnum"], d["make"], d["model"], d["color"])
+        for name in extra_fields:
+            if name in d:
+                setattr(v, name, int(d[name]))
+        return v
+    return decode_extra
+
+
+_BY_CLASS: dict[type, VehicleCodec] = {}
+_BY_SPEC: dict[tuple[str, str], VehicleCodec] = {}
+
+
+def register(codec: VehicleCodec) -> VehicleCodec:
+    """Register a codec for its class and its (fuel, kind) pair."""
+    _BY_CLASS[codec.cls] = codec
+    _BY_SPEC[(codec.fuel, codec.kind)] = codec
+    return codec
+
+
+def codec_for(v: Any) -> VehicleCodec:
+    """
+    Codec for a vehicle instance (exact class lookup, then MRO fallback so
+    subclasses of registered classes still serialize).
+    Raises:
+        TypeError: if no registered class matches.
+    """
+    codec = _BY_CLASS.get(type(v))
+    if codec is not None:
+        return codec
+    for base in type(v).__mro__[1:]:
+        codec = _BY_CLASS.get(base)
+        if codec is not None:
+            _BY_CLASS[type(v)] = codec
+            return codec
+    raise TypeError(f"No codec registered for {type(v).__name__}")
+
+
+def codec_for_spec(fuel: str, kind: str) -> VehicleCodec:
+    """
+    Codec for a (fuel, kind) pair as stored in records.
+    Raises:
+        ValueError: for unsupported combinations (e.g. EV BUS).
+    """
+    codec = _BY_SPEC.get((fuel, kind))
+    if codec is None:
+        raise ValueError(f"Unsupported vehicle: fuel={fuel} kind={kind}")
+    return codec
+
+
+def encode(v: Any) -> dict[str, Any] | None:
+    """Encode a vehicle (or None for a vacant slot)."""
+    if v is None:
+        return None
+    return codec_for(v).encode(v)
+
+
+def decode(d: dict[str, Any]) -> Any:
+    """Decode a record produced by encode()."""
+    return codec_for_spec(d["fuel"], d["kind"]).decode(d)
+
+
+register(VehicleCodec(Vehicle.Car, "ICE", "CAR"))
+register(VehicleCodec(Vehicle.Motorcycle, "ICE", "MOTORCYCLE"))
+register(VehicleCodec(Vehicle.Bus, "ICE", "BUS"))
+register(VehicleCodec(Vehicle.Truck, "ICE", "TRUCK"))
+register(VehicleCodec(ElectricVehicle.ElectricCar, "EV", "CAR", ("charge",)))
+register(VehicleCodec(ElectricVehicle.ElectricBike, "EV", "MOTORCYCLE", ("charge",)))
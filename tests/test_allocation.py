@@ -0,0 +1,64 @@
+import random
+
+from src.allocation import LARGE_VEHICLE_BAYS, FreeRuns
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def _brute_runs(free):
+    runs, start = [], None
+    for i, f in enumerate([*free, False]):
+        if f and start is None:
+            start = i
+        elif not f and start is not None:
+            runs.append((start, i - start))
+            start = None
+    return runs
+
+
+def test_free_runs_match_brute_force():
+    rng = random.Random(3)
+    n = 37
+    tree, free = FreeRuns(n), [True] * n
+    for _ in range(1500):
+        i = rng.randrange(n)
+        free[i] = not free[i]
+        (tree.release if free[i] else tree.occupy)(i)
+        runs = _brute_runs(free)
+        k = rng.randint(1, 6)
+        fits = [s for s, length in runs for s in range(s, s + length - k + 1)]
+        assert tree.first_fit(k) == (min(fits) if fits else None)
+        assert tree.last_fit(k) == (max(fits) if fits else None)
+        start = rng.randrange(n + 2)
+        assert tree.next_free(start) == next((j for j in range(start, n) if free[j]), None)
+        stats = tree.stats()
+        assert stats["free"] == sum(free) and stats["free_runs"] == len(runs)
+        assert stats["largest_free_run"] == max((length for _, length in runs), default=0)
+
+
+def test_multi_bay_park_leave_and_roundtrip():
+    svc = ParkingService(capacity=6, ev_capacity=0, level=1, bays_per_kind=LARGE_VEHICLE_BAYS)
+    assert svc.park(VehicleSpec("C1", "Fiat", "500", "Red", "ICE", "CAR"))["slot_ui"] == 1
+    bus = svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))
+    assert bus["slot_ui"] == 2 and bus["message"] == "Allocated slots 2-4"  # noqa: PLR2004
+    assert svc.park(VehicleSpec("C2", "Fiat", "500", "Red", "ICE", "CAR"))["slot_ui"] == 5  # noqa: PLR2004
+    assert not svc.park(VehicleSpec("T1", "Ford", "F-150", "Red", "ICE", "TRUCK"))["ok"]
+    assert svc.summary()["ice"]["occupied"] == 5  # noqa: PLR2004
+    assert [r["slot_ui"] for r in svc.status_rows()] == [1, 2, 5]
+
+    restored = ParkingService.from_dict(svc.to_dict())
+    assert restored.fragmentation() == svc.fragmentation()
+
+    assert svc.leave(3)["ok"]  # a held bay frees the whole bus
+    assert svc.fragmentation() == {
+        "free": 4, "free_runs": 2, "largest_free_run": 3, "fragmentation": 0.25,
+    }
+    assert svc.park(VehicleSpec("T1", "Ford", "F-150", "Red", "ICE", "TRUCK"))["slot_ui"] == 2  # noqa: PLR2004
+
+
+def test_large_from_end_policy_keeps_runs_apart():
+    svc = ParkingService(
+        capacity=8, ev_capacity=0, level=1, bays_per_kind={"BUS": 3}, policy="large_from_end"
+    )
+    assert svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))["slot_ui"] == 6  # noqa: PLR2004
+    assert svc.park(VehicleSpec("C1", "Fiat", "500", "Red", "ICE", "CAR"))["slot_ui"] == 1
+    assert svc.fragmentation()["free_runs"] == 1
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src import autosave
+from src.autosave import Autosaver
+from src.parking_service import ParkingService, VehicleSpec
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _car(reg):
+    return VehicleSpec(reg, "Ford", "Focus", "Red", "ICE", "CAR")
+
+
+def _lot():
+    return ParkingService(capacity=10, ev_capacity=2, level=1)
+
+
+def test_burst_is_coalesced_into_one_save(tmp_path):
+    svc, clock = _lot(), FakeClock()
+    path = tmp_path / "auto.json"
+    saver = Autosaver(svc, path, delay_s=2.0, clock=clock)
+    assert saver.poll() is None and not saver.dirty
+    for i in range(5):
+        svc.park(_car(f"R{i}"))
+        clock.now += 0.5
+    assert saver.dirty
+    assert saver.poll() is None and not saver.saving  # still inside the quiet window
+    clock.now += 2.0
+    saver.poll()
+    assert saver.saving and not saver.dirty
+    outcome = saver.flush()
+    assert outcome is not None and outcome["ok"] and outcome["revision"] == 1
+    assert saver.saves == 1
+    data = json.loads(path.read_text())
+    assert data["revision"] == 1
+    assert [r["regnum"] for r in data["slots"] if r] == [f"R{i}" for i in range(5)]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_steady_stream_saves_after_max_delay(tmp_path):
+    svc, clock = _lot(), FakeClock()
+    saver = Autosaver(svc, tmp_path / "auto.json", delay_s=2.0, max_delay_s=5.0, clock=clock)
+    for i in range(6):
+        svc.park(_car(f"R{i}"))
+        saver.poll()
+        clock.now += 1.0  # never quiet for 2 s
+    assert saver.saving
+    saver.close()
+    assert saver.saves == 1
+
+
+def test_one_save_in_flight_and_later_changes_kept(tmp_path, monkeypatch):
+    svc, clock = _lot(), FakeClock()
+    path = tmp_path / "auto.json"
+    gate = threading.Event()
+    writes = []
+
+    def slow_write(p, data):
+        gate.wait(5)
+        writes.append(data)
+
+    monkeypatch.setattr(autosave, "atomic_write_json", slow_write)
+    saver = Autosaver(svc, path, delay_s=0.0, clock=clock)
+    svc.park(_car("A1"))
+    saver.poll()
+    svc.park(_car("B1"))  # lands while the first save is blocked
+    assert saver.poll() is None and saver.saving and saver.dirty
+    gate.set()
+    saver.flush()
+    assert len(writes) == 2  # noqa: PLR2004
+    first, second = ([r["regnum"] for r in w["slots"] if r] for w in writes)
+    assert first == ["A1"]  # the snapshot was taken before B1 parked
+    assert second == ["A1", "B1"]
+    assert not saver.dirty
+
+
+def test_failed_save_is_reported_and_retried(tmp_path):
+    svc, clock = _lot(), FakeClock()
+    missing = tmp_path / "nope" / "auto.json"
+    saver = Autosaver(svc, missing, delay_s=1.0, clock=clock)
+    svc.park(_car("A1"))
+    clock.now += 1.0
+    saver.poll()
+    outcome = None
+    while outcome is None:
+        time.sleep(0.001)
+        outcome = saver.poll()
+    assert not outcome["ok"] and outcome["error"]
+    assert saver.failures == 1 and saver.dirty and not saver.saving  # pending, not retried yet
+    missing.parent.mkdir()
+    clock.now += 1.0
+    saver.poll()
+    assert saver.flush()["ok"]
+    assert json.loads(missing.read_text())["slots"][0]["regnum"] == "A1"
+
+
+def test_close_unsubscribes(tmp_path):
+    svc = _lot()
+    saver = Autosaver(svc, tmp_path / "auto.json", delay_s=10.0)
+    saver.close()
+    svc.park(_car("A1"))
+    assert not saver.dirty
+    with pytest.raises(ValueError, match="delay_s"):
+        Autosaver(svc, tmp_path / "x.json", delay_s=5.0, max_delay_s=1.0)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from src.billing import KINDS, NO_CHARGE, Band, SessionLog, Tariff
+from src.cli import main as cli_main
+from src.ingest import ingest_jsonl
+from src.parking_service import ParkingService, VehicleSpec
+
+HOUR = 3600
+DAY0 = 1_714_521_600  # 2024-05-01 00:00 UTC
+
+
+def _lot(now):
+    return ParkingService(capacity=5, ev_capacity=2, level=1, clock=lambda: now[0])
+
+
+def test_park_and_leave_record_times_and_session(tmp_path):
+    now = [DAY0 + 8 * HOUR]
+    svc = _lot(now)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"), at=DAY0 + 9 * HOUR)
+    assert svc.slots[0].entered_at == DAY0 + 8 * HOUR
+
+    path = tmp_path / "lot.json"
+    svc.save_json(str(path))
+    svc = ParkingService.load_json(str(path))  # entry times survive a reload
+    svc.clock = lambda: now[0]
+    now[0] = DAY0 + 10 * HOUR
+    res = svc.leave(1)
+    assert res["session"] == {
+        "regnum": "A1", "fuel": "ICE", "kind": "CAR", "slot_ui": 1,
+        "entered": DAY0 + 8 * HOUR, "exited": DAY0 + 10 * HOUR, "charge": None,
+    }
+    assert "fee" not in res and svc.slots[0].entered_at is None
+
+    svc.tariff = Tariff()
+    svc.set_charge(1, 50)
+    res = svc.leave_by_reg("E1", at=DAY0 + 11 * HOUR)
+    assert res["session"]["charge"] == 50  # noqa: PLR2004
+    # 2 h at 3.00 + 30 kWh at 0.35
+    assert res["fee"] == pytest.approx(16.5)
+    assert svc.leave(2)["ok"] is False
+
+
+def test_quote_across_bands_days_and_kinds():
+    tariff = Tariff(bands=(Band(0, 7, 1.0), Band(7, 19, 3.0), Band(19, 24, 1.5)), grace_s=600)
+    # 18:00 -> 08:00 next day: 1 h day + 5 h evening + 7 h night + 1 h day
+    assert tariff.quote("CAR", DAY0 + 18 * HOUR, DAY0 + 32 * HOUR) == pytest.approx(3 + 7.5 + 7 + 3)
+    # three full days cost three times one day, whatever the start time
+    day = 7 * 1.0 + 12 * 3.0 + 5 * 1.5
+    assert tariff.quote("CAR", DAY0 + 5 * HOUR, DAY0 + 77 * HOUR) == pytest.approx(3 * day)
+    assert tariff.quote("BUS", DAY0 + 8 * HOUR, DAY0 + 9 * HOUR) == pytest.approx(9.0)
+    assert tariff.quote("CAR", DAY0 + 8 * HOUR, DAY0 + 8 * HOUR + 300) == 0.0  # within grace
+    assert tariff.quote("CAR", None, DAY0, charge=100) == pytest.approx(21.0)  # energy only
+    local = Tariff(bands=(Band(7, 19, 3.0),), utc_offset_h=2)
+    assert local.quote("CAR", DAY0 + 5 * HOUR, DAY0 + 6 * HOUR) == pytest.approx(3.0)  # 07:00 local
+    with pytest.raises(ValueError, match="overlapping"):
+        Tariff(bands=(Band(0, 10, 1.0), Band(9, 24, 2.0)))
+
+
+def test_price_batch_matches_quote():
+    np = pytest.importorskip("numpy")
+    rng = random.Random(1)
+    tariff = Tariff(utc_offset_h=-5)
+    rows = []
+    for _ in range(2000):
+        start = DAY0 + rng.uniform(-86_400, 5 * 86_400)
+        kind = rng.randrange(len(KINDS))
+        charge = rng.randrange(101) if kind < 2 and rng.random() < 0.3 else NO_CHARGE  # noqa: PLR2004
+        entered = float("nan") if rng.random() < 0.01 else start  # noqa: PLR2004
+        rows.append((entered, start + rng.uniform(0, 3 * 86_400), kind, charge))
+    entered, exited, kind, charge = (np.array(c) for c in zip(*rows, strict=True))
+    fees = tariff.price_batch(entered, exited, kind, charge)
+    expected = [
+        tariff.quote(KINDS[k], None if np.isnan(e) else e, x, None if c == NO_CHARGE else c)
+        for e, x, k, c in rows
+    ]
+    assert fees.tolist() == expected
+
+
+def test_session_log_jsonl_and_invoice(tmp_path):
+    pytest.importorskip("numpy")
+    now = [DAY0 + 8 * HOUR]
+    svc = _lot(now)
+    log = SessionLog(svc)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("M1", "Zero", "FXE", "Black", "EV", "MOTORCYCLE"))
+    svc.set_charge(1, 40)
+    now[0] += 2 * HOUR
+    svc.leave(1)
+    svc.leave(1, fuel="EV")
+    assert len(log) == 2  # noqa: PLR2004
+    path = tmp_path / "sessions.jsonl"
+    log.save_jsonl(path)
+    again = SessionLog.load_jsonl(path)
+    assert list(again.sessions()) == list(log.sessions())
+
+    summary = Tariff().invoice(again)
+    # car 2 h at 3.00; motorcycle 2 h at 1.50 + 6 kWh at 0.35
+    assert summary["total"] == pytest.approx(6.0 + 3.0 + 2.1)
+    assert summary["by_kind"] == {"CAR": 6.0, "MOTORCYCLE": 5.1}
+    assert summary["hours"] == 4.0 and summary["kwh"] == 6.0  # noqa: PLR2004
+    log.close()
+    assert svc.on_session is None
+
+
+def test_cli_leave_logs_sessions_and_invoice(tmp_path, capsys):
+    pytest.importorskip("numpy")
+    lot, sessions, tariff = tmp_path / "lot.json", tmp_path / "s.jsonl", tmp_path / "t.json"
+    tariff.write_text(json.dumps({"bands": [{"start_h": 0, "end_h": 24, "rate": 2.0}], "grace_s": 0}))
+    assert cli_main(["create", "--capacity", "2", "--ev-capacity", "0", "--level", "1", "--save", str(lot)]) == 0
+    args = ["--load", str(lot), "--save", str(lot)]
+    cli_main(["park", *args, "--reg", "A1", "--make", "VW", "--model", "Golf", "--color", "Red"])
+    capsys.readouterr()
+    cli_main(["leave", *args, "--reg", "A1", "--tariff", str(tariff), "--sessions", str(sessions)])
+    res = json.loads(capsys.readouterr().out)
+    assert res["session"]["regnum"] == "A1" and "fee" in res
+    assert len(sessions.read_text().splitlines()) == 1
+    cli_main(["invoice", "--sessions", str(sessions)])
+    assert json.loads(capsys.readouterr().out)["sessions"] == 1
+
+
+def test_ingest_stamps_camera_time(tmp_path):
+    events = tmp_path / "gate.jsonl"
+    events.write_text(
+        json.dumps({"ts": DAY0 + 8 * HOUR, "dir": "in", "reg": "KA01"}) + "\n"
+        + json.dumps({"ts": DAY0 + 11 * HOUR, "dir": "out", "reg": "KA01"}) + "\n"
+    )
+    svc = ParkingService(capacity=2, ev_capacity=0, level=1)
+    log = SessionLog(svc)
+    asyncio.run(ingest_jsonl(svc, events))
+    (session,) = log.sessions()
+    assert session["entered"] == DAY0 + 8 * HOUR and session["exited"] == DAY0 + 11 * HOUR
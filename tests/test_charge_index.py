@@ -0,0 +1,64 @@
+import random
+
+from src.charge_index import ChargeIndex
+from src.cli import main as cli_main
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def _lot(charges):
+    svc = ParkingService(capacity=0, ev_capacity=len(charges), level=1)
+    for i, c in enumerate(charges):
+        svc.park(VehicleSpec(f"E{i}", "Tesla", "3", "Red", "EV", "CAR"))
+        svc.set_charge(i + 1, c)
+    return svc
+
+
+def test_lowest_and_range_follow_set_charge_and_leave():
+    svc = _lot([50, 10, 90, 10, 30])
+    assert [r["slot_ui"] for r in svc.lowest_charge(3)] == [2, 4, 5]
+    assert [r["charge"] for r in svc.charge_between(20, 60)] == [30, 50]
+
+    svc.set_charge(3, 5)
+    svc.leave(2, fuel="EV")
+    assert [(r["slot_ui"], r["charge"]) for r in svc.lowest_charge(2)] == [(3, 5), (4, 10)]
+    assert svc.charge_between(60, 100) == []
+    assert svc.lowest_charge(0) == []
+
+
+def test_range_outside_0_to_100_is_empty_not_clamped():
+    svc = _lot([0, 100, 40])
+    assert svc.charge_between(-5, -1) == [] and svc.charge_between(150, 200) == []
+    assert svc.charge_between(60, 20) == []
+    assert [r["charge"] for r in svc.charge_between(-5, 0)] == [0]
+    assert [r["charge"] for r in svc.charge_between(100, 200)] == [100]  # noqa: PLR2004
+    assert [r["charge"] for r in svc.charge_between(-10, 500)] == [0, 40, 100]
+
+
+def test_index_matches_sorted_scan_under_churn():
+    rng = random.Random(7)
+    idx, truth = ChargeIndex(), {}
+    for _ in range(2000):
+        i = rng.randrange(50)
+        if i in truth and rng.random() < 0.3:  # noqa: PLR2004
+            idx.remove(i)
+            del truth[i]
+        elif i in truth:
+            truth[i] = rng.randint(0, 100)
+            idx.update(i, truth[i])
+        else:
+            truth[i] = rng.randint(0, 100)
+            idx.add(i, truth[i])
+    assert list(idx.ascending()) == sorted(truth, key=lambda i: (truth[i], i))
+    assert list(idx.ascending(40, 60)) == sorted(
+        (i for i in truth if 40 <= truth[i] <= 60), key=lambda i: (truth[i], i)  # noqa: PLR2004
+    )
+
+
+def test_cli_ev_charge_filters(tmp_path, capsys):
+    p = tmp_path / "lot.json"
+    _lot([70, 20, 45]).save_json(str(p))
+    assert cli_main(["ev-charge", "--load", str(p), "--lowest", "1"]) == 0
+    assert capsys.readouterr().out.split("\t")[:1] == ["2"]
+    assert cli_main(["ev-charge", "--load", str(p), "--min", "40"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [ln.split("\t")[0] for ln in lines] == ["3", "1"]
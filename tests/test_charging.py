@@ -0,0 +1,47 @@
+import pytest  # type: ignore
+
+from src.parking_service import ParkingService, VehicleSpec
+
+pytest.importorskip("numpy")
+from src.charging import ChargingEngine  # noqa: E402
+
+
+def _lot():
+    svc = ParkingService(capacity=0, ev_capacity=3, level=1)
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    svc.park(VehicleSpec("E2", "Zero", "FXE", "Black", "EV", "MOTORCYCLE"))
+    return svc
+
+def test_constant_power_phase_and_sync_back_to_vehicles():
+    svc = _lot()
+    eng = ChargingEngine(svc, charger_kw=6.0)
+    # 60 kWh car at 6 kW = 10%/hour; 15 kWh bike at 6 kW = 40%/hour
+    assert eng.run(minutes=60) == 2  # noqa: PLR2004
+    assert [r["charge"] for r in svc.ev_charge_rows()] == [10, 40]
+    assert eng.delivered_kwh[0] == pytest.approx(6.0)
+
+def test_taper_never_exceeds_full_and_vacant_slots_stay_idle():
+    svc = _lot()
+    eng = ChargingEngine(svc, charger_kw=50.0)
+    eng.run(minutes=24 * 60)
+    assert [r["charge"] for r in svc.ev_charge_rows()] == [100, 100]
+    assert eng.soc[2] == 0.0 and eng.delivered_kwh[2] == 0.0
+
+def test_engine_follows_park_leave_and_external_charge_updates():
+    svc = _lot()
+    eng = ChargingEngine(svc, charger_kw=6.0)
+    svc.leave(1, fuel="EV")
+    svc.set_charge(2, 20)
+    svc.park(VehicleSpec("E3", "Nissan", "Leaf", "Green", "EV", "CAR"))
+    eng.run(minutes=60)
+    rows = {r["regnum"]: r["charge"] for r in svc.ev_charge_rows()}
+    assert rows == {"E3": 10, "E2": 60}
+    eng.close()
+    svc.set_charge(1, 5)
+    assert eng.soc[0] == pytest.approx(10.0)
+
+def test_set_charge_validates_input():
+    svc = _lot()
+    with pytest.raises(ValueError):
+        svc.set_charge(1, 101)
+    assert svc.set_charge(3, 50) is False
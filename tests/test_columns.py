@@ -0,0 +1,54 @@
+import pytest  # type: ignore
+
+from src.allocation import LARGE_VEHICLE_BAYS
+from src.cli import main as cli_main
+from src.parking_service import ParkingService, VehicleSpec
+
+np = pytest.importorskip("numpy")
+from src.columns import KINDS, load_columns, load_npz, save_npz, vocab_code  # noqa: E402
+
+
+def _lot():
+    svc = ParkingService(capacity=6, ev_capacity=3, level=2, bays_per_kind=LARGE_VEHICLE_BAYS)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    svc.park(VehicleSpec("E2", "Zero", "FXE", "Black", "EV", "MOTORCYCLE"))
+    svc.set_charge(2, 55)
+    return svc
+
+
+def test_columns_are_typed_and_vectorizable():
+    cols = _lot().to_columns()
+    assert len(cols["slot"]) == 9  # noqa: PLR2004
+    assert cols["slot"].tolist() == [1, 2, 3, 4, 5, 6, 1, 2, 3]
+    assert cols["occupied"].tolist() == [True, True, True, True, False, False, True, True, False]
+    assert cols["bays"].tolist() == [1, 3, 0, 0, 0, 0, 1, 1, 0]
+    assert cols["charge"].tolist() == [-1] * 6 + [0, 55, -1]
+    assert cols["kind"][1] == KINDS.index("BUS")
+    assert (cols["level"] == 2).all()  # noqa: PLR2004
+    assert cols["color_vocab"].tolist() == ["Black", "Red", "White"]
+    red = cols["color"] == vocab_code(cols, "color", "Red")
+    assert cols["regnum"][red].tolist() == ["A1", "E1"]
+    assert vocab_code(cols, "make", "Nissan") == -2  # noqa: PLR2004
+    assert cols["make"].dtype == np.int32
+
+
+def test_npz_roundtrip_and_cli(tmp_path):
+    svc = _lot()
+    path = tmp_path / "lot.npz"
+    save_npz(svc, path)
+    assert load_npz(path).to_dict() == svc.to_dict()
+    cols, config = load_columns(path)
+    assert config["bays_per_kind"] == LARGE_VEHICLE_BAYS
+    assert int(cols["occupied"].sum()) == 6  # noqa: PLR2004
+
+    lot_json = tmp_path / "lot.json"
+    svc.save_json(str(lot_json))
+    out_npz, back = tmp_path / "cli.npz", tmp_path / "back.json"
+    assert cli_main(["export-npz", "--load", str(lot_json), str(out_npz)]) == 0
+    assert cli_main(["import-npz", str(out_npz), "--out", str(back)]) == 0
+    restored = ParkingService.load_json(str(back)).to_dict()
+    expected = svc.to_dict()
+    assert restored.pop("revision") == expected.pop("revision") + 1
+    assert restored == expected
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from src.cli import main as cli_main
+from src.fleet import Fleet
+from src.lot_file import update_lot
+from src.parking_service import VehicleSpec
+
+
+def _car(reg, fuel="ICE"):
+    return VehicleSpec(reg, "VW", "Golf", "Red", fuel, "CAR")
+
+
+def test_lru_eviction_writes_back_dirty_lots(tmp_path):
+    fleet = Fleet(tmp_path, max_lots=2)
+    fleet.create("a", 2, 1).park(_car("A1"))
+    fleet.create("b", 2, 1)
+    fleet.get("a")  # "b" is now least recently used
+    fleet.create("c", 2, 1)
+    assert fleet.cached() == ["a", "c"]
+    assert (tmp_path / "b.json").exists() and not (tmp_path / "a.json").exists()
+    fleet.close()
+    assert json.loads((tmp_path / "a.json").read_text())["slots"][0]["regnum"] == "A1"
+    assert Fleet(tmp_path).get("a").first_slot_by_reg("A1") == 1
+
+
+def test_memory_budget_eviction(tmp_path):
+    sizes = {}
+    fleet = Fleet(tmp_path, max_lots=10, memory_budget=250, sizer=lambda svc: sizes.setdefault(id(svc), 100))
+    for lot in "abc":
+        fleet.create(lot, 1, 0)
+    assert fleet.cached() == ["b", "c"] and fleet.cached_bytes == 200  # noqa: PLR2004
+
+
+def test_find_reg_across_cached_and_disk_lots(tmp_path, capsys):
+    fleet = Fleet(tmp_path, max_lots=1)
+    for i in range(40):
+        svc = fleet.create(f"lot{i:02d}", 3, 2)
+        if i % 7 == 0:
+            svc.park(_car("X1", "EV" if i % 2 else "ICE"))
+    fleet.get("lot07")  # cached copy (dirty-free) plus the rest on disk
+    hits = fleet.find_reg("X1", workers=2)
+    assert [(h["lot_id"], h["fuel"]) for h in hits] == [
+        ("lot00", "ICE"), ("lot07", "EV"), ("lot14", "ICE"), ("lot21", "EV"), ("lot28", "ICE"), ("lot35", "EV"),
+    ]
+    assert fleet.find_reg("X1", workers=1) == hits
+    fleet.close()
+    assert cli_main(["fleet-find", "--dir", str(tmp_path), "--reg", "X1", "--workers", "1"]) == 0
+    assert capsys.readouterr().out.splitlines()[0] == "lot00\tICE\t1"
+
+
+def test_memory_budget_tracks_lots_that_grow(tmp_path):
+    def sizer(svc):
+        return 100 + 1000 * len(svc.all_slots_by_reg("A1"))
+
+    fleet = Fleet(tmp_path, max_lots=10, memory_budget=3000, sizer=sizer)
+    for lot in "abc":
+        fleet.create(lot, 3, 0)
+    assert fleet.cached_bytes == 300  # noqa: PLR2004
+    for lot in "ab":
+        fleet.get(lot).park(_car("A1"))
+    assert fleet.cached_bytes == 2300  # noqa: PLR2004
+    fleet.create("d", 3, 0)  # 2400 fits
+    fleet.get("c").park(_car("A1"))  # 3400 does not, so the next admission evicts "a"
+    fleet.create("e", 3, 0)
+    assert fleet.cached() == ["b", "d", "c", "e"] and fleet.cached_bytes == 2400  # noqa: PLR2004
+
+
+def test_write_back_merges_with_other_writers(tmp_path):
+    fleet = Fleet(tmp_path)
+    fleet.create("a", 3, 1)
+    fleet.flush()
+    fleet.get("a").park(_car("A1"))
+    update_lot(tmp_path / "a.json", lambda svc: svc.park_at(_car("B1"), 3))
+    fleet.close()
+    svc = Fleet(tmp_path).get("a")
+    assert svc.reg_slots("A1") == [("ICE", 1)] and svc.reg_slots("B1") == [("ICE", 3)]
+
+
+def test_write_back_refuses_to_clobber_a_changed_slot(tmp_path):
+    fleet = Fleet(tmp_path)
+    fleet.create("a", 2, 0)
+    fleet.flush()
+    fleet.get("a").park(_car("A1"))
+    update_lot(tmp_path / "a.json", lambda svc: svc.park(_car("B1")))
+    with pytest.raises(RuntimeError, match="ICE slot 1 of lot 'a' changed on disk"):  # lot_file.ConflictError
+        fleet.evict("a")
+    assert fleet.cached() == ["a"]
+    fleet.mark_dirty("a")
+    with pytest.raises(RuntimeError, match="changed on disk"):
+        fleet.flush()
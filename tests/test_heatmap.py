@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.allocation import LARGE_VEHICLE_BAYS
+from src.heatmap import KIND_COLORS, VACANT, HeatmapModel, charge_color
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def test_model_colours_and_dirty_cells():
+    svc = ParkingService(capacity=6, ev_capacity=2, level=1, bays_per_kind=LARGE_VEHICLE_BAYS)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    pings = []
+    model = HeatmapModel(svc, on_dirty=lambda: pings.append(1))
+    assert model.size == 8  # noqa: PLR2004
+    assert model.colors()[:2] == [KIND_COLORS["CAR"], VACANT]
+
+    svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))  # slots 2-4
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    svc.set_charge(1, 90)
+    assert len(pings) == 1  # one repaint scheduled for the whole burst
+    assert model.take_dirty() == [
+        (1, KIND_COLORS["BUS"]), (2, KIND_COLORS["BUS"]), (3, KIND_COLORS["BUS"]),
+        (6, charge_color(90)),
+    ]
+    assert model.take_dirty() == []
+
+    svc.leave(3)  # any bay frees the bus; the whole run repaints
+    assert model.take_dirty() == [(1, VACANT), (2, VACANT), (3, VACANT)]
+    assert len(pings) == 2  # noqa: PLR2004
+    model.close()
+    svc.leave(1)
+    assert model.take_dirty() == []
+
+
+def test_charge_bands():
+    assert charge_color(0) != charge_color(100)
+    assert charge_color(100) == charge_color(85)
+
+
+def test_model_imports_without_tkinter():
+    code = "import sys; sys.modules['tkinter'] = None; import heatmap; print(heatmap.HeatmapModel.__name__)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent / "src")},
+        capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == "HeatmapModel"
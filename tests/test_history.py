@@ -0,0 +1,81 @@
+from src.cli import main as cli_main
+from src.history import HOUR_S, OccupancyHistory
+from src.parking_service import ParkingService, VehicleSpec
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _car(reg, fuel="ICE"):
+    return VehicleSpec(reg, "VW", "Golf", "Red", fuel, "CAR")
+
+
+def _run(hist_dir=None, chunk_size=3):
+    clock = Clock()
+    svc = ParkingService(capacity=3, ev_capacity=2, level=1)
+    svc.park(_car("PRE"))  # parked before recording: lands in the first checkpoint
+    hist = OccupancyHistory(svc, hist_dir, chunk_size=chunk_size, clock=clock)
+    for t, action in [
+        (100, lambda: svc.park(_car("A"))),           # ICE 2
+        (200, lambda: svc.park(_car("E1", "EV"))),    # EV 1
+        (4000, lambda: svc.leave(2)),
+        (4100, lambda: svc.park(_car("B"))),          # ICE 2
+        (7300, lambda: svc.leave(1, fuel="EV")),
+        (7400, lambda: svc.park(_car("E2", "EV"))),   # EV 1
+    ]:
+        clock.now = t
+        action()
+    return svc, hist
+
+
+def test_point_in_time_and_ranges_across_chunks():
+    _, hist = _run()
+    assert len(hist) == 6  # noqa: PLR2004
+    assert hist.occupant_at("ICE", 2, 150) == "A"
+    assert hist.occupant_at("ICE", 2, 4050) is None
+    assert hist.occupant_at("EV", 1, 7350) is None and hist.occupant_at("EV", 1, 8000) == "E2"
+    assert hist.occupant_at("ICE", 1, 50) == "PRE"
+    assert hist.snapshot_at(4100) == {("ICE", 1): "PRE", ("ICE", 2): "B", ("EV", 1): "E1"}
+    assert [e["regnum"] for e in hist.events(150, 7350, fuel="ICE")] == ["A", "B"]
+
+
+def test_hourly_rollup():
+    _, hist = _run(chunk_size=4)
+    rows = hist.hourly(0, 3 * HOUR_S)
+    assert [(r["ice_peak"], r["ev_peak"], r["parks"], r["leaves"]) for r in rows] == [
+        (2, 1, 2, 0), (2, 1, 1, 1), (2, 1, 1, 1),
+    ]
+
+
+def test_disk_chunks_reopen_and_cli(tmp_path, capsys):
+    d = tmp_path / "hist"
+    svc, hist = _run(d, chunk_size=4)
+    hist.close()
+    assert sorted(p.name for p in d.iterdir()) == ["chunk-000001.json", "chunk-000002.json", "index.json"]
+    reopened = OccupancyHistory(svc, d, chunk_size=4)
+    assert reopened.occupant_at("ICE", 2, 150) == "A" and len(reopened) == 6  # noqa: PLR2004
+    assert cli_main(["history", "--dir", str(d), "--at", "1970-01-01T00:02:30+00:00",
+                     "--slot", "2"]) == 0
+    assert capsys.readouterr().out.strip() == "A"
+
+
+def test_hourly_counts_events_on_the_hour_once_at_epoch_timestamps():
+    hour = 1_700_000_000 // HOUR_S * HOUR_S  # a real POSIX hour start
+    for chunk_size in (1, 2, 64):  # the rows at `hour` may end one chunk and start the next
+        clock = Clock()
+        svc = ParkingService(capacity=3, ev_capacity=0, level=1)
+        hist = OccupancyHistory(svc, chunk_size=chunk_size, clock=clock)
+        clock.now = hour - 10
+        svc.park(_car("EARLY"))
+        clock.now = hour
+        svc.park(_car("A"))
+        svc.park(_car("B"))
+        rows = hist.hourly(hour, hour + HOUR_S)
+        assert [(r["hour"], r["ice_peak"], r["parks"]) for r in rows] == [(hour, 3, 2)]
+        assert hist.hourly(hour - HOUR_S, hour)[0]["ice_peak"] == 1
+        assert [e["regnum"] for e in hist.events(hour, hour + 1)] == ["A", "B"]
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.cli import main as cli_main
+from src.ingest import GateEvent, Ingestor, ingest_jsonl, serve
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def _ev(ts, direction, reg, **extra):
+    return {"ts": ts, "dir": direction, "reg": reg, **extra}
+
+
+def _write(path, events):
+    path.write_text("\n".join(json.dumps(e) for e in events) + "\n", encoding="utf-8")
+
+
+def test_leave_by_reg():
+    svc = ParkingService(capacity=2, ev_capacity=1, level=1)
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    assert svc.leave_by_reg("E1")["ok"]
+    assert svc.ev_status_rows() == []
+    assert not svc.leave_by_reg("E1")["ok"]
+
+
+def test_jsonl_replay_dedupes_and_applies(tmp_path):
+    events = [
+        _ev(0.0, "in", "ka01", make="VW", model="Golf", color="Red"),
+        _ev(0.4, "in", "KA01"),  # double read
+        _ev(1.0, "in", "E1", fuel="EV", make="Tesla"),
+        _ev(5.0, "out", "KA01"),
+        _ev(5.1, "out", "KA01"),  # double read
+        _ev(6.0, "out", "NOPE"),  # never entered
+        {"ts": 7, "dir": "sideways", "reg": "X"},
+    ]
+    path = tmp_path / "gate.jsonl"
+    _write(path, events)
+    svc = ParkingService(capacity=2, ev_capacity=1, level=1)
+    stats = asyncio.run(ingest_jsonl(svc, path, dedupe_window_s=2.0))
+    assert (stats.parked, stats.left, stats.duplicates, stats.rejected, stats.malformed) == (2, 1, 2, 1, 1)
+    assert svc.status_rows() == []
+    assert [r["regnum"] for r in svc.ev_status_rows()] == ["E1"]
+    assert len(stats.latencies) == 6  # noqa: PLR2004
+
+
+def test_full_queue_sheds_instead_of_blocking():
+    async def burst():
+        svc = ParkingService(capacity=100, ev_capacity=0, level=1)
+        ing = Ingestor(svc, queue_size=10, batch_size=4)
+        accepted = [ing.submit(GateEvent(float(i), "in", f"R{i}")) for i in range(25)]
+        consumer = asyncio.create_task(ing.run())
+        await ing.stop()
+        return await consumer, accepted, svc
+
+    stats, accepted, svc = asyncio.run(burst())
+    assert accepted.count(True) == 10 and stats.shed == 15  # noqa: PLR2004
+    assert stats.parked == 10 and stats.batches == 3  # noqa: PLR2004
+    assert len(svc.status_rows()) == 10  # noqa: PLR2004
+
+
+def test_socket_source():
+    async def run():
+        svc = ParkingService(capacity=5, ev_capacity=0, level=1)
+        ing = Ingestor(svc)
+        consumer = asyncio.create_task(ing.run())
+        server = await serve(ing)
+        port = server.sockets[0].getsockname()[1]
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"".join(json.dumps(_ev(i, "in", f"S{i}")).encode() + b"\n" for i in range(3)))
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+        while ing.stats.received < 3:  # noqa: PLR2004
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        await ing.stop()
+        await consumer
+        return svc
+
+    assert [r["regnum"] for r in asyncio.run(run()).status_rows()] == ["S0", "S1", "S2"]
+
+
+def test_cli_ingest_and_leave_by_reg(tmp_path, capsys):
+    lot = tmp_path / "lot.json"
+    ParkingService(capacity=3, ev_capacity=1, level=1).save_json(str(lot))
+    events = tmp_path / "gate.jsonl"
+    _write(events, [_ev(0, "in", "A1"), _ev(10, "in", "B2"), _ev(20, "out", "A1")])
+    assert cli_main(["ingest", "--load", str(lot), "--save", str(lot), "--events", str(events)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["parked"] == 2 and report["left"] == 1  # noqa: PLR2004
+    assert cli_main(["leave", "--load", str(lot), "--save", str(lot), "--reg", "b2"]) == 0
+    assert json.loads(capsys.readouterr().out)["ok"]
+    assert ParkingService.load_json(str(lot)).status_rows() == []
+
+
+def _cli(*argv, **kwargs):
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent / "src")}
+    return subprocess.Popen([sys.executable, "-u", "-m", "cli", *argv], env=env, text=True,
+                            stdout=subprocess.PIPE, **kwargs)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="sends SIGINT")
+def test_listener_commits_batches_through_the_shared_lot_file(tmp_path):
+    lot = tmp_path / "lot.json"
+    ParkingService(capacity=5, ev_capacity=0, level=1).save_json(str(lot))
+    listener = _cli("ingest", "--load", str(lot), "--save", str(lot), "--port", "0")
+    try:
+        port = int(listener.stdout.readline().split(":")[1].split()[0])
+        with _cli("park", "--load", str(lot), "--save", str(lot), "--reg", "CLI1",
+                  "--make", "VW", "--model", "Up", "--color", "Red") as park:
+            park.communicate(timeout=30)
+
+        async def send():
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"".join(json.dumps(_ev(i, "in", f"G{i}")).encode() + b"\n" for i in range(3)))
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+
+        asyncio.run(send())
+        deadline = time.monotonic() + 20
+        while {r["regnum"] for r in ParkingService.load_json(str(lot)).status_rows()} < {"CLI1", "G2"}:
+            assert listener.poll() is None and time.monotonic() < deadline, "batch never committed"
+            time.sleep(0.01)
+    finally:
+        listener.send_signal(signal.SIGINT)
+        out, _ = listener.communicate(timeout=30)
+    report = json.loads(out.splitlines()[-1])
+    assert report["parked"] == 3 and report["unapplied"] == 0  # noqa: PLR2004
+    regs = [r["regnum"] for r in ParkingService.load_json(str(lot)).status_rows()]
+    assert regs == ["CLI1", "G0", "G1", "G2"]  # the park in between survives the exit
+
+
+def test_stop_drains_the_queue():
+    async def run():
+        ing = Ingestor(ParkingService(capacity=50, ev_capacity=0, level=1), batch_size=4)
+        for i in range(30):
+            ing.submit(GateEvent(float(i), "in", f"Q{i}"))
+        assert ing.pending == 30  # noqa: PLR2004
+        consumer = asyncio.create_task(ing.run())
+        await ing.stop()
+        stats = await consumer
+        return ing.pending, stats.parked
+
+    assert asyncio.run(run()) == (0, 30)
@@ -0,0 +1,65 @@
+import json
+import random
+
+from src.cli import main as cli_main
+from src.layout import Layout, VacancyTree
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def test_grid_nearest_matches_brute_force_under_churn():
+    rng = random.Random(11)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 40)) for _ in range(300)]
+    grid, vacant = VacancyTree(points), set()
+    for _ in range(400):
+        i = rng.randrange(len(points))
+        if i in vacant:
+            grid.occupy(i)
+            vacant.discard(i)
+        else:
+            grid.release(i)
+            vacant.add(i)
+        q = (rng.uniform(-20, 120), rng.uniform(-20, 60))
+        want = min(vacant, key=lambda j: ((points[j][0] - q[0]) ** 2 + (points[j][1] - q[1]) ** 2, j))
+        assert grid.nearest(q) == want
+
+
+def test_tree_nearest_on_a_nearly_full_lot():
+    rng = random.Random(4)
+    points = [(float(i % 40), float(i // 40) * 3) for i in range(2000)]
+    tree = VacancyTree(points)
+    vacant = set(rng.sample(range(len(points)), 3))
+    for i in vacant:
+        tree.release(i)
+    assert len(tree) == 3  # noqa: PLR2004
+    for _ in range(50):
+        q = (rng.uniform(-50, 90), rng.uniform(-50, 200))
+        want = min(vacant, key=lambda j: ((points[j][0] - q[0]) ** 2 + (points[j][1] - q[1]) ** 2, j))
+        assert tree.nearest(q) == want
+    for i in vacant:
+        tree.occupy(i)
+    assert tree.nearest((0.0, 0.0)) is None and len(tree) == 0
+
+
+def test_park_uses_nearest_bay_to_entrance():
+    layout = Layout.rows(10, 2, per_row=5, entrances={"north": (0.0, -5.0), "south": (10.0, 20.0)})
+    svc = ParkingService(capacity=10, ev_capacity=2, level=1, layout=layout)
+    car = VehicleSpec("S1", "Fiat", "500", "Red", "ICE", "CAR")
+    assert svc.park(car, entrance="south")["slot_ui"] == 10  # noqa: PLR2004
+    assert svc.park(car, entrance="south")["slot_ui"] == 9  # noqa: PLR2004
+    assert svc.park(car, entrance="north")["slot_ui"] == 1
+    svc.leave(10)
+    restored = ParkingService.from_dict(json.loads(json.dumps(svc.to_dict())))
+    assert restored.park(car, entrance="south")["slot_ui"] == 10  # noqa: PLR2004
+    assert svc.park(car)["slot_ui"] == 2  # noqa: PLR2004
+
+
+def test_cli_park_with_entrance(tmp_path, capsys):
+    layout_file = tmp_path / "layout.json"
+    layout_file.write_text(json.dumps(Layout.rows(4, 0, per_row=4, entrances={"east": (20.0, 0.0)}).to_dict()))
+    lot = tmp_path / "lot.json"
+    assert cli_main(["create", "--capacity", "4", "--ev-capacity", "0", "--level", "1",
+                     "--layout", str(layout_file), "--save", str(lot)]) == 0
+    capsys.readouterr()
+    assert cli_main(["park", "--load", str(lot), "--reg", "E1", "--make", "VW", "--model", "Golf",
+                     "--color", "Red", "--entrance", "east"]) == 0
+    assert json.loads(capsys.readouterr().out)["slot_ui"] == 4  # noqa: PLR2004
@@ -0,0 +1,91 @@
+import json
+import multiprocessing
+
+import pytest
+
+from src.cli import main as cli_main
+from src.history import OccupancyHistory
+from src.lot_file import ConflictError, read_revision, update_lot
+from src.parking_service import ParkingService, VehicleSpec
+
+WORKERS = 8
+PARKS_PER_WORKER = 10
+
+
+def _car(reg):
+    return VehicleSpec(reg, "Ford", "Focus", "Red", "ICE", "CAR")
+
+
+def _new_lot(path, capacity=40):
+    ParkingService(capacity=capacity, ev_capacity=2, level=1).save_json(str(path))
+
+
+def test_save_bumps_revision_and_load_keeps_it(tmp_path):
+    path = tmp_path / "lot.json"
+    _new_lot(path)
+    assert read_revision(path) == 1
+    svc = ParkingService.load_json(str(path))
+    assert svc.revision == 1
+    svc.save_json(str(path))
+    assert read_revision(path) == 2  # noqa: PLR2004
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_conflict_reapplies_operation(tmp_path):
+    path = tmp_path / "lot.json"
+    _new_lot(path)
+    calls = []
+
+    def op(svc):
+        calls.append(svc.revision)
+        if len(calls) == 1:  # another writer commits between our load and our swap
+            other = ParkingService.load_json(str(path))
+            other.park(_car("OTHER"))
+            other.save_json(str(path))
+        return svc.park(_car("MINE"))
+
+    out = update_lot(path, op)
+    assert out["ok"]
+    assert calls == [1, 2]
+    svc = ParkingService.load_json(str(path))
+    assert {r["regnum"] for r in svc.status_rows()} == {"OTHER", "MINE"}
+    assert svc.revision == 3  # noqa: PLR2004
+
+
+def test_no_write_without_change_and_retry_limit(tmp_path):
+    path = tmp_path / "lot.json"
+    _new_lot(path)
+    assert update_lot(path, lambda svc: svc.leave(1))["ok"] is False
+    assert read_revision(path) == 1
+
+    def always_loses(svc):
+        ParkingService.load_json(str(path)).save_json(str(path))
+        return svc.park(_car("X"))
+
+    with pytest.raises(ConflictError):
+        update_lot(path, always_loses, retries=2)
+
+
+def _worker(path, worker, history):
+    for i in range(PARKS_PER_WORKER):
+        args = ["park", "--load", path, "--save", path, "--reg", f"W{worker}-{i}",
+                "--make", "Ford", "--model", "Focus", "--color", "Red", "--history", history]
+        assert cli_main(args) == 0
+
+
+def test_concurrent_cli_writers_lose_no_updates(tmp_path):
+    path, history = str(tmp_path / "lot.json"), str(tmp_path / "hist")
+    _new_lot(path, capacity=WORKERS * PARKS_PER_WORKER)
+    procs = [multiprocessing.Process(target=_worker, args=(path, w, history)) for w in range(WORKERS)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    regs = {r["regnum"] for r in data["slots"] if r}
+    assert len(regs) == WORKERS * PARKS_PER_WORKER
+    assert data["revision"] == 1 + WORKERS * PARKS_PER_WORKER
+    events = OccupancyHistory(ParkingService.load_json(path), history).events(0, float("inf"))
+    assert sorted(e["regnum"] for e in events) == sorted(regs)  # every commit kept its history event
@@ -0,0 +1,87 @@
+import math
+import random
+
+import pytest
+
+from src.cli import main as cli_main
+from src.overstay import OverstayMonitor, TimingWheel
+from src.parking_service import ParkingService, VehicleSpec
+
+HOUR = 3600
+DAY0 = 1_714_521_600  # 2024-05-01 00:00 UTC
+
+
+@pytest.mark.parametrize("tick_s", [1.0, 60.0])
+def test_wheel_matches_brute_force(tick_s):
+    rng = random.Random(7)
+    now = DAY0 + rng.uniform(0, 1e6)
+    wheel = TimingWheel(now, tick_s)
+    live = {}
+    for _ in range(3000):
+        roll = rng.random()
+        if roll < 0.5:  # noqa: PLR2004
+            key = rng.randrange(200)
+            deadline = now + rng.choice([rng.uniform(-5, 120), rng.uniform(0, 1e5), rng.uniform(0, 1e8)])
+            wheel.add(key, deadline)
+            live[key] = deadline
+        elif roll < 0.7 and live:  # noqa: PLR2004
+            key = rng.choice(list(live))
+            assert wheel.remove(key)
+            del live[key]
+        else:
+            now += rng.choice([rng.uniform(0, 30), rng.uniform(0, 1e4), rng.uniform(0, 1e7)])
+            expired = wheel.advance(now)
+            due = {k for k, d in live.items() if math.ceil(d / tick_s) <= math.floor(now / tick_s)}
+            assert sorted(expired) == sorted(due)
+            for key in expired:
+                del live[key]
+        assert len(wheel) == len(live)
+    assert not wheel.remove(-1)
+
+
+def _car(reg, kind="CAR", fuel="ICE"):
+    return VehicleSpec(reg, "Ford", "Focus", "Red", fuel, kind)
+
+
+def test_monitor_flags_by_kind_and_pool_and_forgets_leavers():
+    now = [DAY0]
+    svc = ParkingService(capacity=6, ev_capacity=2, level=1, clock=lambda: now[0])
+    svc.park(_car("OLD"), at=DAY0 - 10 * HOUR)  # already over when the monitor starts
+    seen = []
+    monitor = OverstayMonitor(
+        svc, {"*": 4 * HOUR, "EV": 2 * HOUR, "MOTORCYCLE": 1 * HOUR}, tick_s=60, on_overstay=seen.append
+    )
+    svc.park(_car("C1"))
+    svc.park(_car("M1", kind="MOTORCYCLE"))
+    svc.park(_car("E1", fuel="EV"))
+    assert len(monitor) == 4  # noqa: PLR2004
+
+    assert [r["regnum"] for r in monitor.tick()] == ["OLD"]
+    now[0] = DAY0 + 90 * 60
+    assert [r["regnum"] for r in monitor.tick()] == ["M1"]
+    svc.leave(3)  # M1 leaves; no longer flagged
+    now[0] = DAY0 + 3 * HOUR
+    assert [r["regnum"] for r in monitor.tick()] == ["E1"]
+    svc.leave(1, fuel="EV")
+    svc.park(_car("E2", fuel="EV"))  # same slot, fresh deadline
+    now[0] = DAY0 + 5 * HOUR
+    rows = monitor.overstays()
+    assert [r["regnum"] for r in rows] == ["OLD", "C1", "E2"]
+    assert rows[1]["deadline"] == DAY0 + 4 * HOUR and rows[1]["slot_ui"] == 2  # noqa: PLR2004
+    assert [r["regnum"] for r in seen] == ["OLD", "M1", "E1", "C1", "E2"]  # hook fires once each
+    assert monitor.tick() == []
+    monitor.close()
+
+
+def test_cli_overstays(tmp_path, capsys):
+    lot = tmp_path / "lot.json"
+    svc = ParkingService(capacity=3, ev_capacity=0, level=1)
+    svc.park(_car("B1", kind="BUS"), at=DAY0)
+    svc.park(_car("C1"), at=DAY0)
+    svc.save_json(str(lot))
+    cli_main(["overstays", "--load", str(lot), "--limit", "bus=1", "--limit", "*=4",
+              "--at", "2024-05-01T02:30:00+00:00"])
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1 and out[0].startswith("ICE\t1\tB1\tBUS") and out[0].endswith("over 1h30m")
+    with pytest.raises(SystemExit):
+        cli_main(["overstays", "--load", str(lot), "--limit", "BUS"])
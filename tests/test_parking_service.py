@@ -1,3 +1,4 @@
+from src.allocation import LARGE_VEHICLE_BAYS
 from src.parking_service import ParkingService, VehicleSpec
 
 
@@ -30,3 +31,32 @@ def test_leave_validates_slot_number():
     res = svc.leave(0)
     assert res["ok"] is False
     assert "slot" in res["message"].lower()
+
+
+def test_read_models_are_cached_until_a_relevant_change():
+    svc = ParkingService(capacity=3, ev_capacity=2, level=1)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    version = svc.version
+    ice, ev, charge = svc.status_rows(), svc.ev_status_rows(), svc.ev_charge_rows()
+    assert svc.status_rows() is ice and svc.ev_charge_rows() is charge
+    svc.set_charge(1, 70)
+    assert svc.version == version + 1
+    assert svc.ev_status_rows() is ev  # charge doesn't touch status rows
+    assert svc.ev_charge_rows()[0]["charge"] == 70  # noqa: PLR2004
+    svc.park(VehicleSpec("B2", "VW", "Golf", "Blue", "ICE", "CAR"))
+    assert svc.ev_status_rows() is ev
+    assert [r["regnum"] for r in svc.status_rows()] == ["A1", "B2"]
+    svc.leave(1, fuel="EV")
+    assert svc.ev_status_rows() == [] and svc.ev_charge_rows() == []
+
+
+def test_slot_reads_follow_multi_bay_runs():
+    svc = ParkingService(capacity=5, ev_capacity=1, level=1, bays_per_kind=LARGE_VEHICLE_BAYS)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"), at=100.0)
+    svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))  # slots 2-4
+    assert [(i, v.regnum) for i, v in svc.occupied("ICE")] == [(0, "A1"), (1, "B1")]
+    assert dict(svc.spans("ICE")) == {1: 3} and svc.run_head("ICE", 3) == 1 and svc.run_head("ICE", 4) == 4  # noqa: PLR2004
+    assert svc.vehicle_at("ICE", 2) is None and svc.vehicle_at("ICE", 1).regnum == "B1"
+    assert svc.entered_at("ICE", 0) == 100.0 and svc.entered_at("ICE", 4) is None  # noqa: PLR2004
+    assert svc.records("ICE")[1]["bays"] == 3 and svc.records("EV")[0] is None  # noqa: PLR2004
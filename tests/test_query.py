@@ -0,0 +1,50 @@
+import pytest  # type: ignore
+
+from src.cli import main as cli_main
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def _lot():
+    svc = ParkingService(capacity=4, ev_capacity=3, level=1)
+    svc.park(VehicleSpec("AB1", "Ford", "F-150", "Red", "ICE", "TRUCK"))
+    svc.park(VehicleSpec("AB2", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("CD3", "Ford", "Transit", "Blue", "ICE", "TRUCK"))
+    svc.park(VehicleSpec("EV1", "Tesla", "Model 3", "Red", "EV", "CAR"))
+    svc.park(VehicleSpec("EV2", "Tesla", "Model Y", "White", "EV", "CAR"))
+    svc.park(VehicleSpec("AB9", "Zero", "FXE", "Red", "EV", "MOTORCYCLE"))
+    return svc
+
+def test_compound_queries_intersect_predicates():
+    svc = _lot()
+    red_teslas = list(svc.query(fuel="EV", make="Tesla", color="Red"))
+    assert [(r["slot_ui"], r["regnum"]) for r in red_teslas] == [(1, "EV1")]
+    ford_trucks = list(svc.query(fuel="ICE", kind="TRUCK", make="Ford"))
+    assert [r["regnum"] for r in ford_trucks] == ["AB1", "CD3"]
+    red_ab = list(svc.query(color="Red", regnum_prefix="AB"))
+    assert [(r["fuel"], r["regnum"]) for r in red_ab] == [("ICE", "AB1"), ("ICE", "AB2"), ("EV", "AB9")]
+
+def test_query_without_predicates_lists_everything_and_tracks_leave():
+    svc = _lot()
+    assert len(list(svc.query())) == 6  # noqa: PLR2004
+    svc.leave(1, fuel="ICE")
+    assert [r["regnum"] for r in svc.query(make="Ford", kind="TRUCK")] == ["CD3"]
+    assert list(svc.query(regnum_prefix="AB1")) == []
+    assert list(svc.query(make="Nope")) == []
+
+def test_query_rejects_unknown_fuel_or_kind():
+    svc = _lot()
+    with pytest.raises(ValueError):
+        list(svc.query(kind="SPACESHIP"))  # type: ignore[arg-type]
+
+def test_finders_use_index_after_reload():
+    clone = ParkingService.from_dict(_lot().to_dict())
+    assert clone.slots_by_make("Ford") == [1, 2, 3]
+    assert clone.all_slots_by_color("Red") == [1, 2, 1, 3]
+    assert clone.all_slots_by_reg("AB2") == [2]
+
+def test_cli_query(tmp_path, capsys):
+    p = tmp_path / "lot.json"
+    _lot().save_json(str(p))
+    assert cli_main(["query", "--load", str(p), "--kind", "TRUCK", "--color", "Blue"]) == 0
+    out = capsys.readouterr().out.strip().splitlines()
+    assert out == ["3\tICE\tL1\tCD3\tBlue\tFord\tTransit\tTRUCK"]
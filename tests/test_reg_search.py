@@ -0,0 +1,40 @@
+from src.parking_service import ParkingService, VehicleSpec
+from src.reg_index import RegIndex
+
+
+def _lot():
+    svc = ParkingService(capacity=3, ev_capacity=2, level=1)
+    svc.park(VehicleSpec("ABC1234", "Honda", "Civic", "Blue", "ICE", "CAR"))
+    svc.park(VehicleSpec("ABD5678", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("XYZ9876", "Tesla", "3", "Red", "EV", "CAR"))
+    return svc
+
+def test_prefix_and_substring_candidates():
+    svc = _lot()
+    prefix = svc.search_reg("AB")
+    assert [(m["regnum"], m["match"]) for m in prefix] == [("ABC1234", "prefix"), ("ABD5678", "prefix")]
+    sub = svc.search_reg("Z98")
+    assert sub == [{"regnum": "XYZ9876", "slot_ui": 1, "fuel": "EV", "match": "substring", "distance": 0}]
+
+def test_fuzzy_match_for_misread_character():
+    svc = _lot()
+    res = svc.search_reg("ABC1284")  # 3 misread as 8
+    assert res[0]["regnum"] == "ABC1234" and res[0]["match"] == "fuzzy" and res[0]["distance"] == 1
+    assert svc.search_reg("XZY9876")[0]["regnum"] == "XYZ9876"  # swapped characters
+
+def test_exact_ranks_first_and_leave_updates_index():
+    svc = _lot()
+    assert svc.search_reg("ABC1234", limit=1)[0]["match"] == "exact"
+    svc.leave(1, fuel="ICE")
+    assert all(m["regnum"] != "ABC1234" for m in svc.search_reg("ABC"))
+    assert svc.all_slots_by_reg("ABC1234") == []
+
+def test_reg_index_tracks_duplicate_plates_per_slot():
+    idx = RegIndex()
+    idx.add("DUP1", "ICE", 0)
+    idx.add("DUP1", "EV", 2)
+    idx.remove("DUP1", "ICE", 0)
+    assert idx.slots("DUP1") == {("EV", 2)}
+    assert list(idx.prefix("DU")) == ["DUP1"] and idx.substring("UP1") == ["DUP1"]
+    idx.remove("DUP1", "EV", 2)
+    assert len(idx) == 0 and idx.fuzzy("DUP1") == []
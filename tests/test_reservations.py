@@ -0,0 +1,145 @@
+import random
+
+import pytest
+
+from src.parking_service import ParkingService, VehicleSpec
+from src.reservations import ReservationBook
+
+H = 3600.0
+EV = VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR")
+CAR = VehicleSpec("C1", "Fiat", "500", "Red", "ICE", "CAR")
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_availability_and_any_slot_booking():
+    svc = ParkingService(capacity=0, ev_capacity=2, level=1)
+    book = ReservationBook(svc, clock=Clock())
+    a = book.reserve("EV", 14 * H, 16 * H, slot_ui=1)
+    assert a is not None and not book.is_available("EV", 1, 15 * H, 17 * H)
+    assert book.is_available("EV", 1, 16 * H, 18 * H)
+    b = book.reserve("EV", 15 * H, 16 * H)
+    assert b is not None and b.slot_ui == 2  # noqa: PLR2004
+    assert book.reserve("EV", 15 * H, 15.5 * H) is None
+    assert book.cancel(a.id) and book.reserve("EV", 15 * H, 15.5 * H).slot_ui == 1
+
+
+def test_park_skips_held_slot_and_claim_uses_it():
+    clock = Clock()
+    svc = ParkingService(capacity=2, ev_capacity=0, level=1)
+    book = ReservationBook(svc, lead_s=H, clock=clock)
+    res = book.reserve("ICE", 10 * H, 12 * H, slot_ui=1)
+    assert svc.park(CAR)["slot_ui"] == 1  # booking hasn't started holding yet
+    svc.leave(1)
+
+    clock.now = 9.5 * H  # inside the lead window
+    assert svc.park(CAR)["slot_ui"] == 2  # noqa: PLR2004
+    assert not svc.park(CAR)["ok"]
+    assert book.claim(res.id, VehicleSpec("R1", "VW", "Golf", "Blue", "ICE", "CAR"))["slot_ui"] == 1
+    assert len(book) == 0
+
+
+def test_no_show_expires_and_frees_slot():
+    clock = Clock()
+    svc = ParkingService(capacity=1, ev_capacity=0, level=1)
+    book = ReservationBook(svc, clock=clock)
+    book.reserve("ICE", 2 * H, 3 * H)
+    clock.now = 2 * H
+    assert not svc.park(CAR)["ok"]
+    clock.now = 3 * H
+    assert svc.park(CAR)["ok"] and len(book) == 0
+
+
+def test_interval_checks_match_brute_force():
+    rng = random.Random(5)
+    svc = ParkingService(capacity=3, ev_capacity=0, level=1)
+    book = ReservationBook(svc, clock=Clock())
+    kept = []
+    for _ in range(300):
+        s = rng.randrange(0, 200)
+        e = s + rng.randrange(1, 20)
+        ui = rng.randint(1, 3)
+        overlap = any(r.slot_ui == ui and r.start < e and s < r.end for r in kept)
+        res = book.reserve("ICE", s, e, slot_ui=ui)
+        assert (res is None) == overlap
+        if res is not None:
+            kept.append(res)
+
+
+def test_holds_count_as_reserved_not_occupied_and_are_range_checked():
+    svc = ParkingService(capacity=4, ev_capacity=0, level=1)
+    book = ReservationBook(svc, clock=Clock())
+    book.reserve("ICE", 0, H, slot_ui=2)
+    svc.park(CAR)
+    ice = svc.summary()["ice"]
+    assert (ice["occupied"], ice["free"], ice["reserved"]) == (1, 3, 1)
+    assert len(svc.status_rows()) == 1
+    for bad in (0, 5):
+        with pytest.raises(ValueError, match="out of range"):
+            svc.hold(bad)
+        with pytest.raises(ValueError, match="out of range"):
+            svc.unhold(bad)
+    assert svc.fragmentation()["free"] == 2  # noqa: PLR2004
+
+
+def test_park_at_applies_due_holds_first():
+    clock = Clock()
+    svc = ParkingService(capacity=3, ev_capacity=0, level=1)
+    book = ReservationBook(svc, lead_s=H, clock=clock)
+    book.reserve("ICE", 2 * H, 3 * H, slot_ui=2)
+    clock.now = 7000  # inside the lead window, no park() has applied the hold yet
+    assert not svc.park_at(CAR, 2)["ok"]
+    assert svc.park_at(CAR, 3)["ok"]
+
+
+def test_reserve_any_skips_booked_leading_slots():
+    svc = ParkingService(capacity=5, ev_capacity=0, level=1)
+    book = ReservationBook(svc, clock=Clock())
+    for ui in (1, 2, 4):
+        book.reserve("ICE", 10 * H, 11 * H, slot_ui=ui)
+    assert list(book.available_slots("ICE", 10 * H, 11 * H)) == [3, 5]
+    assert list(book.available_slots("ICE", 0, H)) == [3, 5, 1, 2, 4]
+    first = book.reserve("ICE", 10 * H, 11 * H)
+    assert first is not None and first.slot_ui == 3  # noqa: PLR2004
+    book.cancel(first.id)
+    assert book.reserve("ICE", 10 * H, 11 * H).slot_ui == 3  # noqa: PLR2004
+
+
+def test_available_slots_match_brute_force_when_all_booked():
+    rng = random.Random(11)
+    svc = ParkingService(capacity=37, ev_capacity=0, level=1)
+    book = ReservationBook(svc, clock=Clock())
+    kept = []
+    for _ in range(600):
+        s = rng.randrange(0, 400)
+        res = book.reserve("ICE", s, s + rng.randrange(1, 30), slot_ui=rng.randint(1, 37))
+        if res is not None:
+            kept.append(res)
+        if kept and rng.random() < 0.2:  # noqa: PLR2004
+            book.cancel(kept.pop(rng.randrange(len(kept))).id)
+    for _ in range(200):
+        s = rng.randrange(0, 420)
+        e = s + rng.randrange(1, 40)
+        booked = {r.slot_ui for r in kept}
+        free = [ui for ui in range(1, 38) if not any(
+            r.slot_ui == ui and r.start < e and s < r.end for r in kept)]
+        expected = [ui for ui in free if ui not in booked] + [ui for ui in free if ui in booked]
+        assert list(book.available_slots("ICE", s, e)) == expected
+
+
+def test_claim_rejects_other_fuel():
+    svc = ParkingService(capacity=2, ev_capacity=2, level=1)
+    book = ReservationBook(svc, clock=Clock())
+    ev_res = book.reserve("EV", H, 2 * H, slot_ui=2)
+    ice_res = book.reserve("ICE", H, 2 * H, slot_ui=2)
+    out = book.claim(ev_res.id, CAR)
+    assert not out["ok"] and "EV slot" in out["message"]
+    assert not book.claim(ice_res.id, EV)["ok"]
+    assert len(book) == 2 and svc.summary()["total"]["occupied"] == 0  # noqa: PLR2004
+    assert book.claim(ev_res.id, EV)["slot_ui"] == 2  # noqa: PLR2004
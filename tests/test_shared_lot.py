@@ -0,0 +1,115 @@
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.allocation import LARGE_VEHICLE_BAYS
+from src.parking_service import ParkingService, VehicleSpec
+
+np = pytest.importorskip("numpy")
+from src.shared_lot import SharedLot, SharedLotView  # noqa: E402
+
+
+def _lot():
+    svc = ParkingService(capacity=6, ev_capacity=3, level=2, bays_per_kind=LARGE_VEHICLE_BAYS)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    return svc
+
+
+def _same_answers(svc, view):
+    assert view.all_slots_by_color("Red") == svc.all_slots_by_color("Red")
+    assert view.all_regnums_by_color("Red") == svc.all_regnums_by_color("Red")
+    assert view.slots_by_make("Volvo") == svc.slots_by_make("Volvo")
+    assert view.ev_slots_by_model("3") == svc.ev_slots_by_model("3")
+    assert view.all_slots_by_reg("E1") == svc.all_slots_by_reg("E1")
+    summary = svc.summary()
+    occupancy = view.occupancy()
+    for pool in ("ice", "ev", "total"):
+        assert occupancy[pool].items() <= summary[pool].items()
+    assert view.by_kind("ICE") == summary["ice"]["by_kind"]
+
+
+def test_view_follows_writer_events():
+    svc = _lot()
+    lot = SharedLot(svc)
+    view = SharedLotView(lot.name)
+    try:
+        assert (view.capacity, view.ev_capacity, view.level) == (6, 3, 2)
+        _same_answers(svc, view)
+        assert view.occupancy()["ice"]["occupied"] == 4  # noqa: PLR2004 (bus holds 3 bays)
+        svc.leave(2)  # the bus
+        svc.park(VehicleSpec("C2", "Ford", "Puma", "Red", "ICE", "CAR"))
+        svc.park(VehicleSpec("E2", "Zero", "FXE", "Black", "EV", "MOTORCYCLE"))
+        svc.set_charge(2, 55)
+        _same_answers(svc, view)
+        cols = view.snapshot()
+        assert cols["occupied"].tolist() == [True, True, False, False, False, False, True, True, False]
+        assert cols["charge"].tolist() == [-1] * 6 + [0, 55, -1]
+        assert view.version == svc.version
+        with pytest.raises(ValueError, match="read-only"):
+            view._cols["occupied"][0] = False
+    finally:
+        view.close()
+        lot.close()
+
+
+def test_over_width_values_never_match_or_leak_cut_plates():
+    svc = ParkingService(capacity=4, ev_capacity=0, level=1)
+    svc.park(VehicleSpec("ABCDEFG", "KiamŠ", "Fabia", "Red", "ICE", "CAR"))  # 7-byte plate
+    svc.park(VehicleSpec("ABCD", "Kiam", "Fabia", "Blue", "ICE", "CAR"))
+    lot = SharedLot(svc, str_width=5)
+    view = SharedLotView(lot.name)
+    try:
+        cols = view.snapshot()
+        assert cols["regnum"].tolist()[:2] == [b"ABCDE", b"ABCD"]
+        assert cols["make"].tolist()[:2] == [b"Kiam", b"Kiam"]  # Š not split
+        assert cols["truncated"].tolist()[:2] == [0b11, 0]  # regnum and make
+        assert view.all_slots_by_reg("ABCD") == svc.all_slots_by_reg("ABCD") == [2]
+        assert view.slots_by_make("Kiam") == svc.slots_by_make("Kiam") == [2]
+        with pytest.raises(ValueError, match="str_width"):
+            view.all_slots_by_reg("ABCDEFG")
+        with pytest.raises(ValueError, match="str_width"):
+            view.all_regnums_by_color("Red")
+        assert view.all_regnums_by_color("Blue") == ["ABCD"]
+        svc.leave(1)
+        assert view.all_regnums_by_color("Red") == []
+        assert view.snapshot()["truncated"].tolist()[0] == 0
+    finally:
+        view.close()
+        lot.close()
+
+
+def _worker_counts(name, rounds):
+    """Read while the parent parks and leaves; every read must be self-consistent."""
+    view = SharedLotView(name, timeout_s=5.0)
+    seen = set()
+    try:
+        for _ in range(rounds):
+            occupied, named = view.read(
+                lambda cols: (int(cols["occupied"].sum()), int((cols["regnum"] != b"").sum()))
+            )
+            assert occupied == named  # no torn park/leave
+            seen.add(occupied)
+    finally:
+        view.close()
+    return len(seen)
+
+
+def test_worker_process_reads_consistent_state_while_writer_runs():
+    svc = ParkingService(capacity=200, ev_capacity=0, level=1)
+    lot = SharedLot(svc)
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            future = pool.submit(_worker_counts, lot.name, 20_000)
+            rng = random.Random(3)
+            while not future.done():
+                reg = f"R{rng.randrange(300)}"
+                if not svc.leave_by_reg(reg)["ok"]:
+                    svc.park(VehicleSpec(reg, "VW", "Golf", "Red", "ICE", "CAR"))
+            assert future.result() > 1
+    finally:
+        lot.close()
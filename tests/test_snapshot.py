@@ -0,0 +1,76 @@
+import csv
+import json
+import random
+import threading
+
+from src.allocation import LARGE_VEHICLE_BAYS
+from src.parking_service import ParkingService, VehicleSpec
+from src.snapshot import CHUNK, CowList
+
+
+def test_cow_list_freezes_contents():
+    rng = random.Random(5)
+    n = 3 * CHUNK + 17
+    cow, ref = CowList(n, 0), [0] * n
+    frozen = []
+    for step in range(4000):
+        i = rng.randrange(n)
+        cow[i] = ref[i] = step
+        if step % 500 == 0:
+            frozen.append((cow.freeze(), list(ref)))
+    assert list(cow) == ref and cow[n - 1] == ref[-1]
+    for view, expected in frozen:
+        assert list(view) == expected and len(view) == n
+        assert view[CHUNK + 1] == expected[CHUNK + 1]
+
+    view = cow.freeze()
+    cow[0] = -1  # copies only the written chunk
+    assert view[0] != -1
+    assert cow._chunks[0] is not view._chunks[0] and cow._chunks[1] is view._chunks[1]
+
+
+def _lot():
+    svc = ParkingService(capacity=600, ev_capacity=3, level=2, bays_per_kind=LARGE_VEHICLE_BAYS)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    svc.set_charge(1, 40)
+    return svc
+
+
+def test_snapshot_exports_ignore_later_changes(tmp_path):
+    svc = _lot()
+    snap = svc.snapshot()
+    expected, rows = svc.to_dict(), svc.to_csv_rows()
+    assert snap.to_dict() == expected and snap.version == svc.version
+
+    svc.leave(1)
+    svc.park(VehicleSpec("C2", "Ford", "Puma", "Blue", "ICE", "CAR"))
+    svc.set_charge(1, 90)
+    svc.park(VehicleSpec("E2", "Zero", "FXE", "Black", "EV", "MOTORCYCLE"))
+    assert snap.to_dict() == expected and snap.to_csv_rows() == rows
+    assert snap.to_dict()["evSlots"][0]["charge"] == 40  # noqa: PLR2004
+    assert svc.snapshot().to_dict() == svc.to_dict()
+
+    snap.save_json(str(tmp_path / "lot.json"))
+    snap.save_csv(str(tmp_path / "lot.csv"))
+    assert json.loads((tmp_path / "lot.json").read_text()) == expected
+    with open(tmp_path / "lot.csv", newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == rows
+    assert ParkingService.load_json(str(tmp_path / "lot.json")).to_dict() == expected
+
+
+def test_export_on_another_thread_while_lot_changes():
+    svc = _lot()
+    snap = svc.snapshot()
+    expected = svc.to_dict()
+    results = []
+    exporter = threading.Thread(target=lambda: results.extend(snap.to_dict() for _ in range(50)))
+    exporter.start()
+    rng = random.Random(2)
+    while exporter.is_alive():
+        reg = f"R{rng.randrange(400)}"
+        if not svc.leave_by_reg(reg)["ok"]:
+            svc.park(VehicleSpec(reg, "VW", "Golf", "Red", "ICE", "CAR"))
+    exporter.join()
+    assert all(r == expected for r in results)
@@ -0,0 +1,37 @@
+from src.parking_service import ParkingService, VehicleSpec
+from src.soak import run_soak, slope_per_kcycle
+
+
+def test_memory_report_splits_components():
+    svc = ParkingService(capacity=10, ev_capacity=2, level=1)
+    empty = svc.memory_report()
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    rep = svc.memory_report()
+    assert rep["slots"] == 12 and rep["vehicles"] == 2  # noqa: PLR2004
+    assert rep["total_bytes"] == sum(rep["bytes"].values())
+    assert rep["bytes"]["vehicles"] > 0 and empty["bytes"]["vehicles"] == 0
+    assert rep["bytes"]["reg_index"] > empty["bytes"]["reg_index"]
+    assert rep["bytes_per_vehicle"] == round(rep["bytes"]["vehicles"] / 2, 1)
+
+
+def test_slope():
+    assert slope_per_kcycle([(0, 100), (1000, 150), (2000, 200)]) == 50  # noqa: PLR2004
+    assert slope_per_kcycle([(0, 5)]) == 0
+
+
+def test_steady_run_passes_and_leak_fails():
+    # short run: warm-up growth is ~3 KB/kcycle, the leak below ~310 KB/kcycle
+    ok = run_soak(cycles=6000, capacity=60, ev_capacity=6, sample_every=500,
+                  reload_every=1000, max_alloc_slope=50_000, max_rss_slope=None)
+    assert ok.ok, ok.failures
+    assert len(ok.samples) == 12  # noqa: PLR2004
+    assert ok.report["slots"] == 66  # noqa: PLR2004
+
+    leaked = []
+    bad = run_soak(cycles=6000, capacity=60, ev_capacity=6, sample_every=500,
+                   max_alloc_slope=50_000, max_rss_slope=None,
+                   on_cycle=lambda svc, cycle: leaked.append(bytearray(256)))
+    assert not bad.ok
+    assert "traced allocations grow" in bad.failures[0]
+    assert any("test_soak.py" in line for line in bad.growth)
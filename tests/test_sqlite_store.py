@@ -0,0 +1,90 @@
+import pytest
+
+from src.allocation import LARGE_VEHICLE_BAYS
+from src.cli import main as cli_main
+from src.parking_service import ParkingService, VehicleSpec
+from src.sqlite_store import SqliteStore
+
+
+def _lot():
+    svc = ParkingService(capacity=6, ev_capacity=2, level=3, bays_per_kind=LARGE_VEHICLE_BAYS)
+    svc.park(VehicleSpec("A1", "Ford", "Focus", "Red", "ICE", "CAR"))
+    svc.park(VehicleSpec("B1", "Volvo", "7900", "White", "ICE", "BUS"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    svc.set_charge(1, 40)
+    return svc
+
+
+def test_snapshot_roundtrip_and_pushdown(tmp_path):
+    svc = _lot()
+    with SqliteStore(tmp_path / "lot.db") as store:
+        assert not store.exists()
+        store.save(svc)
+        assert store.load().to_dict() == svc.to_dict()
+        assert store.find("color", "Red") == [("ICE", 1), ("EV", 1)]
+        assert store.find("make", "Volvo", fuel="ICE") == [("ICE", 2)]
+        assert store.regnums_by_color("Red") == ["A1", "E1"]
+        assert store.status_rows() == svc.status_rows()
+        assert store.status_rows("EV") == svc.ev_status_rows()
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_write_through_keeps_file_in_sync(tmp_path):
+    path = tmp_path / "lot.db"
+    with SqliteStore(path) as store:
+        svc = _lot()
+        store.save(svc)
+        store.attach(svc)
+        svc.leave(3)  # a held bay of the bus frees the whole run
+        svc.park(VehicleSpec("T1", "Ford", "F-150", "Black", "ICE", "TRUCK"))
+        svc.set_charge(1, 90)
+    with SqliteStore(path) as store:
+        assert store.load().to_dict() == svc.to_dict()
+
+
+def test_second_store_cannot_clobber_a_park(tmp_path):
+    path = tmp_path / "lot.db"
+    with SqliteStore(path) as store:
+        store.save(ParkingService(capacity=3, ev_capacity=0, level=1))
+    with SqliteStore(path) as a, SqliteStore(path) as b:
+        svc_a, svc_b = a.load(), b.load()
+        a.attach(svc_a)
+        b.attach(svc_b)
+        assert svc_a.park(VehicleSpec("AAA", "VW", "Up", "Red", "ICE", "CAR"))["slot_ui"] == 1
+        with pytest.raises(RuntimeError, match="slot 1 was taken"):  # lot_file.ConflictError
+            svc_b.park(VehicleSpec("BBB", "VW", "Up", "Blue", "ICE", "CAR"))
+        assert a.find("regnum", "AAA") == [("ICE", 1)] and a.find("regnum", "BBB") == []
+
+        park = {reg: b.update(lambda svc, reg=reg: svc.park(VehicleSpec(reg, "VW", "Up", "Red", "ICE", "CAR")))
+                for reg in ("CCC", "DDD")}
+        assert [park[r]["slot_ui"] for r in ("CCC", "DDD")] == [2, 3]
+        assert [r["regnum"] for r in a.status_rows()] == ["AAA", "CCC", "DDD"]
+        with pytest.raises(ValueError, match="boom"):
+            a.update(lambda svc: (svc.leave(1), int("boom")))
+        assert a.find("regnum", "AAA") == [("ICE", 1)]  # rolled back
+
+
+def test_cli_db_backend(tmp_path, capsys):
+    db = str(tmp_path / "lot.db")
+    assert cli_main(["create", "--capacity", "3", "--ev-capacity", "1", "--level", "1", "--db", db]) == 0
+    assert cli_main(["park", "--db", db, "--reg", "k1", "--make", "VW", "--model", "Up", "--color", "Red"]) == 0
+    assert cli_main(["park", "--db", db, "--reg", "k2", "--make", "VW", "--model", "Up", "--color", "Red"]) == 0
+    assert cli_main(["leave", "--db", db, "--slot-ui", "1"]) == 0
+    capsys.readouterr()
+    assert cli_main(["status", "--db", db]) == 0
+    assert capsys.readouterr().out.splitlines()[1:] == ["2\tL1\tK2\tRed\tVW\tUp"]
+
+
+def test_status_page_matches_service_pages(tmp_path):
+    svc = _lot()
+    svc.park(VehicleSpec("C1", "Audi", "A4", "Blue", "ICE", "CAR"))
+    with SqliteStore(tmp_path / "lot.db") as store:
+        store.save(svc)
+        for sort in ("slot", "make", "color"):
+            after = None
+            while True:
+                page = store.status_page("ICE", sort, after, limit=2)
+                assert page == svc.status_page("ICE", sort, after, limit=2)
+                after = page["next"]
+                if after is None:
+                    break
@@ -0,0 +1,63 @@
+import pytest
+
+from src.cli import main as cli_main
+from src.parking_service import ParkingService, VehicleSpec
+
+MAKES = ["VW", "Audi", "BMW", "Audi", "Ford", "VW", "Audi"]
+
+
+def _lot():
+    svc = ParkingService(capacity=10, ev_capacity=2, level=1)
+    for i, make in enumerate(MAKES):
+        svc.park(VehicleSpec(f"R{i}", make, "X", "Red" if i % 2 else "Blue", "ICE", "CAR"))
+    return svc
+
+
+def _walk(svc, sort, limit):
+    rows, after = [], None
+    while True:
+        page = svc.status_page("ICE", sort, after, limit)
+        rows += page["rows"]
+        after = page["next"]
+        if after is None:
+            return rows
+
+
+def test_pages_cover_sorted_rows_once():
+    svc = _lot()
+    by_make = _walk(svc, "make", limit=3)
+    assert [(r["make"], r["slot_ui"]) for r in by_make] == sorted(
+        (r["make"], r["slot_ui"]) for r in svc.status_rows()
+    )
+    assert _walk(svc, "slot", limit=2) == svc.status_rows()
+    assert svc.status_page("EV", "regnum") == {"rows": [], "next": None}
+
+
+def test_cursor_survives_park_and_leave():
+    svc = _lot()
+    first = svc.status_page("ICE", "make", limit=2)  # Audi@2, Audi@4
+    assert [r["slot_ui"] for r in first["rows"]] == [2, 4]
+    svc.leave(4)  # the cursor's own row leaves
+    svc.park(VehicleSpec("N1", "Audi", "X", "Red", "ICE", "CAR"))  # lands in slot 4 again
+    svc.park(VehicleSpec("N2", "Alfa", "X", "Red", "ICE", "CAR"))  # sorts before the cursor
+    rest = svc.status_page("ICE", "make", first["next"], limit=3)
+    assert [(r["make"], r["slot_ui"]) for r in rest["rows"]] == [("Audi", 7), ("BMW", 3), ("Ford", 5)]
+
+
+def test_bad_sort_or_cursor_rejected():
+    svc = _lot()
+    with pytest.raises(ValueError):
+        svc.status_page("ICE", "owner")
+    with pytest.raises(ValueError):
+        svc.status_page("ICE", "make", after="Audi")
+
+
+def test_cli_status_paging(tmp_path, capsys):
+    path = str(tmp_path / "lot.json")
+    _lot().save_json(path)
+    assert cli_main(["status", "--load", path, "--sort", "make", "--limit", "2"]) == 0
+    out = capsys.readouterr().out
+    assert "next: --after '4:Audi'" in out
+    assert cli_main(["status", "--load", path, "--sort", "make", "--after", "4:Audi", "--limit", "9"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [ln.split("\t")[0] for ln in lines[1:]] == ["7", "3", "5", "1", "6"]
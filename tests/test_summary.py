@@ -0,0 +1,30 @@
+import json
+
+from src.cli import main as cli_main
+from src.parking_service import ParkingService, VehicleSpec
+
+
+def test_summary_counts_follow_park_and_leave():
+    svc = ParkingService(capacity=4, ev_capacity=2, level=1)
+    svc.park(VehicleSpec("R1", "Ford", "F-150", "Red", "ICE", "TRUCK"))
+    svc.park(VehicleSpec("R2", "Ford", "Focus", "Blue", "ICE", "CAR"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    s = svc.summary()
+    assert s["ice"]["occupied"] == 2 and s["ice"]["free"] == 2 and s["ice"]["occupancy_pct"] == 50.0  # noqa: PLR2004
+    assert s["ev"]["free"] == 1 and s["ev"]["by_make"] == {"Tesla": 1}
+    assert s["ice"]["by_kind"] == {"TRUCK": 1, "CAR": 1} and s["ice"]["by_make"] == {"Ford": 2}
+    assert s["total"] == {"capacity": 6, "occupied": 3, "free": 3, "occupancy_pct": 50.0}
+
+    svc.leave(1, fuel="ICE")
+    s = svc.summary()
+    assert s["ice"]["occupied"] == 1 and s["ice"]["by_kind"] == {"CAR": 1}
+    assert s["ice"]["by_color"] == {"Blue": 1}
+
+def test_summary_counts_only_and_cli(tmp_path, capsys):
+    svc = ParkingService(capacity=1, ev_capacity=0, level=2)
+    assert "by_make" not in svc.summary(histograms=False)["ice"]
+    p = tmp_path / "lot.json"
+    svc.save_json(str(p))
+    assert cli_main(["summary", "--load", str(p), "--counts-only"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["level"] == 2 and out["ev"]["occupancy_pct"] == 0.0  # noqa: PLR2004
@@ -0,0 +1,53 @@
+import importlib
+
+import pytest  # type: ignore
+
+from src.parking_service import ParkingService, VehicleSpec
+from src.vehicle_codec import codec_for, codec_for_spec, decode, encode
+
+EV = importlib.import_module("ElectricVehicle")
+V = importlib.import_module("Vehicle")
+
+
+@pytest.mark.parametrize(
+    "cls,fuel,kind",
+    [
+        (V.Car, "ICE", "CAR"),
+        (V.Motorcycle, "ICE", "MOTORCYCLE"),
+        (V.Bus, "ICE", "BUS"),
+        (V.Truck, "ICE", "TRUCK"),
+        (EV.ElectricCar, "EV", "CAR"),
+        (EV.ElectricBike, "EV", "MOTORCYCLE"),
+    ],
+)
+def test_codec_roundtrip_per_class(cls, fuel, kind):
+    v = cls("R1", "Make", "Model", "Red")
+    d = encode(v)
+    assert d["fuel"] == fuel and d["kind"] == kind
+    assert list(d) == list(codec_for(v).fields)
+    back = decode(d)
+    assert type(back) is cls and encode(back) == d
+
+def test_ev_charge_survives_roundtrip():
+    v = EV.ElectricCar("E1", "Tesla", "3", "Red")
+    v.charge = 42
+    assert decode(encode(v)).charge == 42  # noqa: PLR2004
+
+def test_unknown_spec_and_class_are_rejected():
+    with pytest.raises(ValueError):
+        codec_for_spec("EV", "BUS")
+    with pytest.raises(TypeError):
+        codec_for(object())
+
+def test_exports_reflect_changes_after_first_save():
+    svc = ParkingService(2, 1, 1)
+    svc.park(VehicleSpec("R1", "Honda", "Civic", "Blue", "ICE", "CAR"))
+    svc.park(VehicleSpec("E1", "Tesla", "3", "Red", "EV", "CAR"))
+    first = svc.to_dict()
+    svc.leave(1, fuel="ICE")
+    svc.park(VehicleSpec("T1", "Ford", "F-150", "Black", "ICE", "TRUCK"))
+    svc.evSlots[0].vehicle.charge = 55
+    d = svc.to_dict()
+    assert first["slots"][0]["regnum"] == "R1"  # earlier export is not mutated
+    assert d["slots"][0]["kind"] == "TRUCK" and d["evSlots"][0]["charge"] == 55  # noqa: PLR2004
+    assert [r[2] for r in svc.to_csv_rows()[1:]] == ["T1", "E1"]